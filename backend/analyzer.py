@@ -1,25 +1,91 @@
-import re
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
+from itertools import chain, islice
+from backend.profiling import NULL_PROFILER
 
-def analyze_cvs(filepaths, job_requirements):
-    # Extract text from files
-    from backend.file_handler import extract_text_from_files
-    texts = extract_text_from_files(filepaths)
+DEFAULT_NGRAM_RANGE = (1, 2)
+DEFAULT_N_FEATURES = 2 ** 20
+DEFAULT_CHUNK_SIZE = 1000
 
-    # Include job requirements in the analysis
-    all_texts = [job_requirements] + texts
+def chunked(items, size):
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
-    # Vectorize the texts
-    vectorizer = CountVectorizer().fit_transform(all_texts)
-    vectors = vectorizer.toarray()
+def make_vectorizer(ngram_range=DEFAULT_NGRAM_RANGE, n_features=DEFAULT_N_FEATURES):
+    # A hashing vectorizer needs no fitted vocabulary, so texts can be
+    # vectorized chunk by chunk and the matrices always stay sparse (CSR)
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(ngram_range=ngram_range, n_features=n_features, alternate_sign=False, norm=None)
 
-    # Compute similarity scores
-    similarity_matrix = cosine_similarity(vectors)
-    scores = similarity_matrix[0][1:]  # Compare job requirements with each CV
+def document_frequencies(vectorizer, texts, chunk_size=DEFAULT_CHUNK_SIZE):
+    df = np.zeros(vectorizer.n_features, dtype=np.int64)
+    n_docs = 0
+    for chunk in chunked(texts, chunk_size):
+        counts = vectorizer.transform(chunk)
+        # Each (row, column) pair is stored once in CSR, so this counts documents per term
+        df += np.bincount(counts.indices, minlength=vectorizer.n_features)
+        n_docs += counts.shape[0]
+    return df, n_docs
 
-    # Rank candidates
-    candidates = [filepath.split("/")[-1] for filepath in filepaths]
-    ranked_results = sorted(zip(candidates, scores), key=lambda x: x[1], reverse=True)
+def idf_weights(df, n_docs):
+    # Smoothed IDF, as in sklearn's TfidfTransformer
+    return np.log((1 + n_docs) / (1 + df)) + 1
 
-    return ranked_results
+def tfidf_matrix(vectorizer, texts, idf, sublinear_tf=True):
+    from sklearn.preprocessing import normalize
+    matrix = vectorizer.transform(texts).astype(np.float64)
+    if sublinear_tf:
+        matrix.data = 1 + np.log(matrix.data)
+    matrix.data *= idf[matrix.indices]
+    return normalize(matrix, norm="l2", copy=False)
+
+def score_texts(job_requirements, texts, ngram_range=DEFAULT_NGRAM_RANGE, n_features=DEFAULT_N_FEATURES,
+                chunk_size=DEFAULT_CHUNK_SIZE, sublinear_tf=True):
+    # Cosine similarity of every text to the job requirements under TF-IDF
+    # weighting. texts is read twice (document frequencies, then scoring) and
+    # only chunk_size CVs are vectorized at a time, so peak memory does not
+    # grow with the number of CVs beyond the 1 x N score vector.
+    if iter(texts) is texts:
+        # A one-shot iterator would be used up by the first pass; keep its texts
+        texts = list(texts)
+    vectorizer = make_vectorizer(ngram_range, n_features)
+    df, n_docs = document_frequencies(vectorizer, chain([job_requirements], texts), chunk_size)
+    idf = idf_weights(df, n_docs)
+    job_vector = tfidf_matrix(vectorizer, [job_requirements], idf, sublinear_tf).T.tocsc()
+
+    scores = []
+    for chunk in chunked(texts, chunk_size):
+        cv_vectors = tfidf_matrix(vectorizer, chunk, idf, sublinear_tf)
+        scores.append((cv_vectors @ job_vector).toarray().ravel())
+    return np.concatenate(scores) if scores else np.zeros(0)
+
+def top_k_indices(scores, k=None):
+    # Indices of the k best scores, best first and ties by index, as a
+    # stable sort would order them; partitioning avoids sorting every
+    # candidate when only a shortlist is needed
+    if k is None or k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    kth = np.partition(-scores, k - 1)[k - 1]
+    best = np.flatnonzero(-scores < kth)
+    best = np.concatenate([best, np.flatnonzero(-scores == kth)[:k - len(best)]])
+    return best[np.argsort(-scores[best], kind="stable")]
+
+def analyze_cvs(filepaths, job_requirements, cache=None, top_k=None, profiler=NULL_PROFILER, **options):
+    # [(candidate, score)] best first, scored by the backend engine so the
+    # ranking matches the GUI and CLI. cache is an optional FeatureCache;
+    # without one nothing is cached. options are those of
+    # backend.engine.analyze. The TF-IDF functions above serve the tfidf
+    # scorer (scorers=[TfidfScorer()]) and the persistent candidate index
+    # (backend/index.py).
+    from backend.engine import rank
+    if cache is not None:
+        options["cache_path"] = cache.path
+    else:
+        options.setdefault("cache_path", None)
+    ranked = rank(filepaths, job_requirements, top_k, profiler=profiler, **options)
+    return [(candidate, score) for _, candidate, score, _ in ranked]
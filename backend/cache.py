@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import numpy as np
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "CV_ANALYZER_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "cv-analyzer", "features.sqlite3"),
+)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+EVICT_EVERY = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    text BLOB,
+    skills TEXT,
+    tokens TEXT,
+    vector BLOB,
+    nbytes INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+"""
+
+
+def file_digest(filepath, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    # Content-addressed store of extracted CV text and parsed features.
+    # Entries are keyed by the SHA-256 of the file plus a version string owned
+    # by whoever produced them, so changing an extractor only needs a version
+    # bump. Least recently used entries are evicted past max_bytes.
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Several pool workers share one cache file
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._puts = 0
+
+    def content_hash(self, filepath):
+        # Only re-hash files whose size or modification time changed
+        path = os.path.abspath(filepath)
+        stat = os.stat(path)
+        row = self.conn.execute("SELECT mtime_ns, size, digest FROM files WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            return row[2]
+        digest = file_digest(path)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, digest) VALUES (?, ?, ?, ?)",
+                (path, stat.st_mtime_ns, stat.st_size, digest),
+            )
+        return digest
+
+    def _get(self, key, columns):
+        row = self.conn.execute(f"SELECT {columns} FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            with self.conn:
+                self.conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row
+
+    def _put(self, key, text=None, skills=None, tokens=None, vector=None):
+        nbytes = sum(len(value) for value in (text, skills, tokens, vector) if value is not None)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (key, text, skills, tokens, vector, nbytes, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, text, skills, tokens, vector, nbytes, time.time()),
+            )
+        self._puts += 1
+        if self._puts % EVICT_EVERY == 0:
+            self.evict()
+
+    def get_text(self, digest, version):
+        row = self._get(f"text:{digest}:{version}", "text")
+        if row is None:
+            return None
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put_text(self, digest, version, text):
+        self._put(f"text:{digest}:{version}", text=zlib.compress(text.encode("utf-8")))
+
+    def get_features(self, digest, version):
+        row = self._get(f"features:{digest}:{version}", "skills, tokens, vector")
+        if row is None:
+            return None
+        skills, tokens, vector = row
+        return {
+            "skills": json.loads(skills),
+            "tokens": set(json.loads(tokens)),
+            "vector": np.frombuffer(vector, dtype=np.float32),
+        }
+
+    def put_features(self, digest, version, skills, tokens, vector):
+        self._put(
+            f"features:{digest}:{version}",
+            skills=json.dumps(skills),
+            tokens=json.dumps(sorted(tokens)),
+            vector=np.asarray(vector, dtype=np.float32).tobytes(),
+        )
+
+    def get_signature(self, digest, version):
+        row = self._get(f"minhash:{digest}:{version}", "vector")
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.uint32)
+
+    def put_signature(self, digest, version, signature):
+        self._put(f"minhash:{digest}:{version}", vector=np.asarray(signature, dtype=np.uint32).tobytes())
+
+    def forget(self, filepath):
+        # Drops a deleted or replaced file, and its cached entries unless
+        # another file has the same content
+        path = os.path.abspath(filepath)
+        row = self.conn.execute("SELECT digest FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return
+        digest = row[0]
+        with self.conn:
+            self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            if self.conn.execute("SELECT 1 FROM files WHERE digest = ?", (digest,)).fetchone() is None:
+                for kind in ("text", "features", "minhash"):
+                    # Every "<kind>:<digest>:<version>" key, as a range scan on the primary key
+                    self.conn.execute("DELETE FROM entries WHERE key >= ? AND key < ?",
+                                      (f"{kind}:{digest}:", f"{kind}:{digest};"))
+
+    def evict(self):
+        total = 0
+        stale = []
+        for key, nbytes in self.conn.execute("SELECT key, nbytes FROM entries ORDER BY last_used DESC"):
+            total += nbytes
+            if total > self.max_bytes:
+                stale.append((key,))
+        if stale:
+            with self.conn:
+                self.conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def close(self):
+        self.evict()
+        self.conn.close()
@@ -0,0 +1,401 @@
+import os
+import sys
+import csv
+import json
+import time
+import heapq
+import bisect
+import argparse
+
+from backend.file_handler import (
+    find_cv_files, ExtractionLimits, DEFAULT_MAX_PAGES, DEFAULT_MAX_CHARS, DEFAULT_MAX_FILE_BYTES, DEFAULT_TIMEOUT
+)
+from backend.engine import analyze, iter_watch, warm_up, parse_scorers, WorkerError, DEFAULT_BATCH_SIZE
+from backend.matching import MatchMatrix, read_job_postings
+from backend.cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES
+from backend.skills import load_taxonomy, DEFAULT_SKILLS_PATH
+from backend.prefilter import SkillFilter, PruneStats
+from backend.profiling import Profiler, NULL_PROFILER
+from backend.report_generator import generate_report, report_format
+from backend.watch import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL
+from backend.dedup import DEFAULT_THRESHOLD
+
+OUTPUT_FIELDS = ["rank", "candidate", "score", "skills", "path"]
+SHORTLIST_FIELDS = ["job", "rank", "candidate", "score", "skills", "path"]
+BEST_FIT_FIELDS = ["candidate", "rank", "job", "score", "path"]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.cli",
+        description="Rank CVs against job requirements without the GUI.",
+    )
+    parser.add_argument("cvs", nargs="+", help="CV files, directories (searched recursively) or glob patterns")
+    jobs = parser.add_mutually_exclusive_group(required=True)
+    jobs.add_argument("-r", "--requirements", help="text file with the job requirements")
+    jobs.add_argument("-J", "--jobs", action="append",
+                      help="match against several job postings at once: a .txt file, directory or glob pattern, "
+                           "one posting per file; repeat for more")
+    parser.add_argument("-o", "--output", default="-",
+                        help="ranked results as .csv or .jsonl (default: JSON lines on stdout); "
+                             "with --jobs, the shortlist of every posting")
+    parser.add_argument("-k", "--top-k", type=int, default=None,
+                        help="only keep the K best candidates in memory and in the output (per posting with --jobs)")
+    parser.add_argument("--best-fit", default=None,
+                        help="with --jobs, also write every candidate's best-fitting postings as .csv or .jsonl")
+    parser.add_argument("--best-fit-count", type=int, default=1, help="postings listed per candidate in --best-fit")
+    parser.add_argument("--report", default=None,
+                        help="also write a report of the ranked results (.pdf, .docx, .csv or .xlsx)")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="score only one CV of each group of near-duplicates (the same CV as PDF and DOCX, or "
+                             "lightly edited); the others are listed in its duplicates field")
+    parser.add_argument("--dedupe-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="with --dedupe, similarity (0-1, share of shared word shingles) from which CVs "
+                             "count as duplicates")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and rescore CVs as they are added to, changed in or deleted from the given "
+                             "directories; the output file is rewritten after every batch, or changes are printed "
+                             "as JSON lines on stdout")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="with --watch, seconds without file changes before a batch is scored")
+    parser.add_argument("--poll", action="store_true",
+                        help="with --watch, rescan the directories instead of using filesystem events")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="with --poll, or when watchdog is not installed, seconds between rescans")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPUs - 1)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="CVs per spaCy batch")
+    parser.add_argument("--model", default="en_core_web_sm",
+                        help="spaCy model to load in each worker; en_core_web_md/lg add word vectors for semantic scoring")
+    parser.add_argument("--embedding-model", default=None,
+                        help="directory of a local sentence-transformers model to embed CVs with instead of spaCy")
+    parser.add_argument("--skills", default=DEFAULT_SKILLS_PATH, help="skill taxonomy file")
+    parser.add_argument("--scorers", default="semantic,keywords",
+                        help="comma-separated scorers whose points are added up, each optionally with :weight "
+                             "(semantic, keywords, skills, tfidf); tfidf@DIR weights terms by a candidate index")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="feature cache file")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="evict least recently used cache entries past this size")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the feature cache")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES, help="PDF pages read per CV")
+    parser.add_argument("--max-chars", type=int, default=DEFAULT_MAX_CHARS, help="characters of text kept per CV")
+    parser.add_argument("--max-file-mb", type=float, default=DEFAULT_MAX_FILE_BYTES / (1024 * 1024),
+                        help="skip CV files larger than this")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="seconds allowed for extracting one CV before it is skipped (0 disables)")
+    parser.add_argument("--profile", default=None,
+                        help="write per-file and per-stage timings as JSON (Chrome trace format for *.trace.json)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="with --profile, also record peak Python allocations per stage (slower)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress output on stderr")
+    return parser.parse_args(argv)
+
+
+class Ranking:
+    # Keeps either every result or, with top_k, only the best top_k in a
+    # min-heap, so memory stays bounded however many CVs are screened. Ties
+    # go to the first path, as in engine.rank, so the shortlist does not
+    # depend on which worker finished first.
+
+    def __init__(self, top_k=None):
+        self.top_k = top_k
+        self.heap = []
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, filepath, result):
+        candidate, score, skills = result
+        entry = (score, _LaterFirst(filepath), candidate, skills)
+        self.count += 1
+        if self.top_k is None or len(self.heap) < self.top_k:
+            heapq.heappush(self.heap, entry)
+        elif entry[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, entry)
+
+    def ranked(self):
+        entries = sorted(self.heap, key=lambda entry: entry[:2], reverse=True)
+        for rank, (score, path, candidate, skills) in enumerate(entries, start=1):
+            yield {"rank": rank, "candidate": candidate, "score": score, "skills": skills, "path": path.value}
+
+
+class _LaterFirst:
+    # Inverts path comparison, so of two equal scores the later path is the
+    # heap's root, the first to be dropped
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+
+class LiveRanking:
+    # Ranking kept current while watching folders. Entries stay sorted by
+    # (-score, path), so a new or rescored CV is placed by binary search
+    # instead of re-sorting everyone, and each path is in it at most once.
+
+    def __init__(self):
+        self.entries = []
+        self.by_path = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, filepath, result):
+        # Returns the rank of the CV
+        self.remove(filepath)
+        candidate, score, skills = result
+        entry = (-score, filepath, candidate, skills)
+        self.by_path[filepath] = entry
+        position = bisect.bisect_left(self.entries, entry)
+        self.entries.insert(position, entry)
+        return position + 1
+
+    def remove(self, filepath):
+        entry = self.by_path.pop(filepath, None)
+        if entry is None:
+            return False
+        del self.entries[bisect.bisect_left(self.entries, entry)]
+        return True
+
+    def ranked(self, top_k=None):
+        for rank, (score, filepath, candidate, skills) in enumerate(self.entries[:top_k], start=1):
+            yield {"rank": rank, "candidate": candidate, "score": -score, "skills": skills, "path": filepath}
+
+
+def write_results(rows, output, fields=OUTPUT_FIELDS):
+    stream = sys.stdout if output == "-" else open(output, "w", newline="", encoding="utf-8")
+    try:
+        if output.endswith(".csv"):
+            writer = csv.DictWriter(stream, fieldnames=fields)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({key: "; ".join(value) if isinstance(value, list) else value
+                                 for key, value in row.items()})
+        else:
+            for row in rows:
+                stream.write(json.dumps(row) + "\n")
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+
+def with_duplicates(rows, duplicates):
+    # Adds the paths of the near-duplicates linked to each scored CV
+    linked = {}
+    for duplicate, representative in duplicates.items():
+        linked.setdefault(representative, []).append(duplicate)
+    for row in rows:
+        yield dict(row, duplicates=linked.get(row["path"], []))
+
+
+def watch_folders(args, job_requirements, options):
+    # Ranks the CVs in the watched directories and keeps the ranking current
+    # until interrupted
+    ranking = LiveRanking()
+    to_stdout = args.output == "-"
+    base, extension = os.path.splitext(args.output)
+    if not args.quiet:
+        print(f"watching {', '.join(args.cvs)}; press Ctrl+C to stop", file=sys.stderr)
+    events = iter_watch(args.cvs, job_requirements, debounce=args.debounce, poll_interval=args.poll_interval,
+                        polling=args.poll, **options)
+    try:
+        for event, filepath, value in events:
+            if event == "scored":
+                rank = ranking.add(filepath, value)
+                if to_stdout:
+                    candidate, score, skills = value
+                    print(json.dumps({"event": "scored", "rank": rank, "candidate": candidate, "score": score,
+                                      "skills": skills, "path": filepath}), flush=True)
+            elif event in ("removed", "failed"):
+                # A file that can no longer be read keeps no stale result either
+                if ranking.remove(filepath) and to_stdout:
+                    print(json.dumps({"event": "removed", "path": filepath}), flush=True)
+                if event == "failed":
+                    print(f"warning: failed to read {filepath}: {value}", file=sys.stderr)
+            elif event in ("duplicate", "filtered"):
+                # Still there, just not ranked: drop any earlier result quietly
+                ranking.remove(filepath)
+                if to_stdout:
+                    detail = {"of": value} if event == "duplicate" else {"stage": value}
+                    print(json.dumps({"event": event, "path": filepath, **detail}), flush=True)
+            else:
+                if not to_stdout:
+                    # Readers of the output never see a half-written file
+                    partial = f"{base}.partial{extension}"
+                    write_results(ranking.ranked(args.top_k), partial)
+                    os.replace(partial, args.output)
+                if not args.quiet:
+                    updated, deleted = value
+                    print(f"{time.strftime('%H:%M:%S')} {updated} CVs scored, {deleted} removed; "
+                          f"{len(ranking)} ranked", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    except WorkerError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        events.close()
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.jobs:
+        postings = read_job_postings(args.jobs)
+        if not postings:
+            print("error: no non-empty .txt job postings found", file=sys.stderr)
+            return 2
+        if args.report:
+            print("error: --report needs a single posting (--requirements)", file=sys.stderr)
+            return 2
+        if args.watch:
+            print("error: --watch needs a single posting (--requirements)", file=sys.stderr)
+            return 2
+    else:
+        with open(args.requirements, "r", encoding="utf-8") as file:
+            job_requirements = file.read()
+        if not job_requirements.strip():
+            print(f"error: {args.requirements} is empty", file=sys.stderr)
+            return 2
+        if args.report:
+            try:
+                report_format(args.report)
+            except ValueError as e:
+                print(f"error: {e}", file=sys.stderr)
+                return 2
+
+    if args.watch:
+        if args.report:
+            print("error: --report cannot be combined with --watch", file=sys.stderr)
+            return 2
+        missing = [path for path in args.cvs if not os.path.isdir(path)]
+        if missing:
+            print(f"error: --watch needs directories, not {', '.join(missing)}", file=sys.stderr)
+            return 2
+        files = []
+    else:
+        files = list(find_cv_files(args.cvs))
+        if not files:
+            print("error: no .pdf, .docx or .txt CVs found", file=sys.stderr)
+            return 2
+
+    try:
+        scorers = parse_scorers(args.scorers)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    skill_filter = SkillFilter([requirements for _, requirements in postings] if args.jobs else [job_requirements],
+                               load_taxonomy(args.skills))
+    if skill_filter.unknown:
+        print(f"warning: {skill_filter.format_unknown()}", file=sys.stderr)
+
+    profiler = Profiler(trace_memory=args.trace_memory) if args.profile else NULL_PROFILER
+    options = dict(
+        max_workers=args.workers,
+        batch_size=args.batch_size,
+        model_name=args.model,
+        cache_path=None if args.no_cache else args.cache,
+        cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+        skills_path=args.skills,
+        limits=ExtractionLimits(
+            max_pages=args.max_pages,
+            max_chars=args.max_chars,
+            max_file_bytes=int(args.max_file_mb * 1024 * 1024),
+            timeout=args.timeout,
+        ),
+        embedding_model=args.embedding_model,
+        scorers=scorers,
+        dedupe=args.dedupe,
+        dedupe_threshold=args.dedupe_threshold,
+        profiler=profiler,
+    )
+    if args.watch:
+        # Forked pool workers of every batch inherit the loaded model
+        try:
+            warm_up(args.model)
+        except Exception as e:
+            print(f"error: cannot load the spaCy model {args.model!r}: {e}", file=sys.stderr)
+            return 1
+        status = watch_folders(args, job_requirements, options)
+        if profiler.enabled:
+            profiler.dump(args.profile)
+        return status
+
+    if args.jobs:
+        # Every CV is extracted and embedded once and scored against all postings
+        ranking = MatchMatrix([title for title, _ in postings])
+        jobs = [requirements for _, requirements in postings]
+    else:
+        ranking = Ranking(args.top_k)
+        jobs = job_requirements
+    failed = 0
+    done = 0
+    duplicates = {}
+    prune_stats = PruneStats()
+    started = time.perf_counter()
+    # Whether the cursor is at the end of the progress line
+    in_progress = False
+    outcomes = analyze(files, jobs, duplicates=duplicates, prune_stats=prune_stats, **options)
+    try:
+        for filepath, result, error in outcomes:
+            done += 1
+            if error is not None:
+                failed += 1
+                if in_progress:
+                    print(file=sys.stderr)
+                    in_progress = False
+                print(f"warning: failed to read {filepath}: {error}", file=sys.stderr)
+            elif result is not None:
+                ranking.add(filepath, result)
+            if not args.quiet:
+                elapsed = time.perf_counter() - started
+                print(f"\r{done}/{len(files)} CVs analyzed ({done / elapsed:.1f} CVs/s)", end="", file=sys.stderr)
+                in_progress = True
+    except WorkerError as e:
+        if in_progress:
+            print(file=sys.stderr)
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    if in_progress:
+        print(file=sys.stderr)
+
+    if args.jobs:
+        rows = ranking.shortlist_rows(args.top_k)
+        fields = SHORTLIST_FIELDS
+    else:
+        rows = list(ranking.ranked())
+        fields = OUTPUT_FIELDS
+    if args.dedupe:
+        rows = list(with_duplicates(rows, duplicates))
+        fields = fields + ["duplicates"]
+    with profiler.stage("write"):
+        write_results(rows, args.output, fields)
+        if args.jobs and args.best_fit:
+            write_results(ranking.best_fit_rows(args.best_fit_count), args.best_fit, BEST_FIT_FIELDS)
+
+    if args.report:
+        with profiler.stage("report"):
+            generate_report(args.report, [(row["candidate"], row["score"], row["skills"]) for row in rows])
+
+    if profiler.enabled:
+        profiler.dump(args.profile)
+        if not args.quiet:
+            print(profiler.format_summary(), file=sys.stderr)
+
+    if not args.quiet:
+        skipped = f", {len(duplicates)} duplicates skipped" if args.dedupe else ""
+        if skill_filter.active:
+            print(prune_stats.format_summary(), file=sys.stderr)
+        print(f"{len(ranking)} CVs scored{skipped}, {failed} failed in {time.perf_counter() - started:.1f}s",
+              file=sys.stderr)
+    return 0 if len(ranking) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
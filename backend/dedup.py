@@ -0,0 +1,112 @@
+import re
+import zlib
+import numpy as np
+
+# Near-duplicate detection for CVs submitted more than once (as PDF and
+# DOCX, or lightly edited). Each text is reduced to a MinHash signature of
+# its word shingles; the share of equal signature entries estimates the
+# Jaccard similarity of two texts. Locality-sensitive hashing buckets the
+# signatures by bands, so only texts sharing a bucket are ever compared.
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 3
+# 16 bands of 8 rows make pairs above ~0.7 similarity likely to share a bucket
+DEFAULT_BANDS = 16
+DEFAULT_THRESHOLD = 0.8
+MINHASH_VERSION = "1"
+# Hashes are 32-bit and the permutation coefficients below 2**31, so
+# a * hash + b never overflows uint64
+PRIME = (1 << 31) - 1
+BLOCK_SIZE = 4096
+
+
+def shingle_hashes(text, size=DEFAULT_SHINGLE_SIZE):
+    # Distinct crc32 hashes of every run of size consecutive words
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64,
+                       count=len(shingles))
+
+
+class MinHasher:
+    # Signatures must be comparable across processes and runs, so the hash
+    # permutations come from a fixed seed and never from Python's hash()
+
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, shingle_size=DEFAULT_SHINGLE_SIZE, seed=1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, PRIME, num_perm, dtype=np.uint64)[:, None]
+        self.b = rng.integers(0, PRIME, num_perm, dtype=np.uint64)[:, None]
+        self.shingle_size = shingle_size
+        self.version = f"minhash-{MINHASH_VERSION}:{num_perm}:{shingle_size}:{seed}"
+
+    def signature(self, text):
+        signature = np.full(len(self.a), PRIME, dtype=np.uint64)
+        hashes = shingle_hashes(text, self.shingle_size)
+        # Blocks keep the (permutations x shingles) matrix small for very long texts
+        for start in range(0, len(hashes), BLOCK_SIZE):
+            block = hashes[start:start + BLOCK_SIZE]
+            np.minimum(signature, ((self.a * block + self.b) % PRIME).min(axis=1), out=signature)
+        return signature.astype(np.uint32)
+
+
+class LSHIndex:
+    # Signatures share a bucket when every row of one of their bands agrees
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS):
+        self.rows = num_perm // bands
+        self.buckets = [{} for _ in range(bands)]
+
+    def _keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(len(self.buckets))]
+
+    def candidates(self, signature):
+        found = set()
+        for buckets, key in zip(self.buckets, self._keys(signature)):
+            found.update(buckets.get(key, ()))
+        return found
+
+    def add(self, item, signature):
+        for buckets, key in zip(self.buckets, self._keys(signature)):
+            buckets.setdefault(key, []).append(item)
+
+
+def similarity(a, b):
+    # Estimated Jaccard similarity of the shingles behind two signatures
+    return float(np.mean(a == b))
+
+
+def find_duplicates(items, threshold=DEFAULT_THRESHOLD, bands=DEFAULT_BANDS):
+    # items: [(key, signature)] in order of preference. Returns the keys to
+    # keep, in order, and {duplicate key: kept key}. Clusters are the
+    # connected components of pairs at least threshold similar; the first
+    # key of each cluster represents it.
+    items = list(items)
+    if not items:
+        return [], {}
+    index = LSHIndex(len(items[0][1]), bands)
+    parent = list(range(len(items)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, (_, signature) in enumerate(items):
+        for j in index.candidates(signature):
+            if similarity(signature, items[j][1]) >= threshold:
+                # The lower index, i.e. the earlier key, becomes the root
+                low, high = sorted((root(i), root(j)))
+                parent[high] = low
+        index.add(i, signature)
+
+    kept, duplicates = [], {}
+    for i, (key, _) in enumerate(items):
+        representative = root(i)
+        if representative == i:
+            kept.append(key)
+        else:
+            duplicates[key] = items[representative][0]
+    return kept, duplicates
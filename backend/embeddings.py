@@ -0,0 +1,82 @@
+import os
+import hashlib
+import numpy as np
+
+
+def normalize_rows(vectors):
+    # L2-normalized float32 copy; all-zero rows stay zero
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def similarity_matrix(cv_vectors, job_vectors):
+    # Cosine similarity of every CV (rows) to every job (columns) as one
+    # matrix-matrix product; both sides must already be normalized
+    return np.asarray(cv_vectors, dtype=np.float32) @ np.asarray(job_vectors, dtype=np.float32).T
+
+
+class SpacyEmbedder:
+    # Document vectors from the analysis pipeline itself: the average static
+    # word vector for models that ship vectors (en_core_web_md/lg), otherwise
+    # the average tok2vec tensor (en_core_web_sm), which is a much weaker
+    # semantic signal.
+
+    def __init__(self, nlp, model_name):
+        self.has_vectors = nlp.vocab.vectors.size > 0
+        self.needs_tensors = not self.has_vectors
+        self.name = f"spacy:{model_name}"
+
+    def embed(self, texts, docs):
+        if not docs:
+            return np.zeros((0, 0), dtype=np.float32)
+        return normalize_rows(np.stack([doc.vector for doc in docs]))
+
+
+class SentenceEmbedder:
+    # A sentence-transformers model loaded from a local directory, so
+    # analysis never needs network access. Texts are embedded in batches and
+    # the pipeline's spaCy Docs are not used.
+
+    needs_tensors = False
+
+    def __init__(self, path, batch_size=32):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError(f"embedding model {path} needs the sentence-transformers package") from None
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"embedding model directory {path} does not exist")
+        self.model = SentenceTransformer(path)
+        self.batch_size = batch_size
+        # Cached vectors are invalidated when any model file (config, weights,
+        # tokenizer) is added, removed or rewritten, even in place
+        self.name = f"sentence:{os.path.basename(os.path.normpath(path))}:{model_files_digest(path)}"
+
+    def embed(self, texts, docs=None):
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        vectors = self.model.encode(list(texts), batch_size=self.batch_size, convert_to_numpy=True,
+                                    show_progress_bar=False)
+        return normalize_rows(vectors)
+
+
+def model_files_digest(path):
+    # Hash of the relative path, size and mtime of every file under a model
+    # directory; cheap, as no file is read
+    digest = hashlib.sha1()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            filepath = os.path.join(root, name)
+            stat = os.stat(filepath)
+            digest.update(f"{os.path.relpath(filepath, path)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def load_embedder(nlp, model_name, embedding_model=None):
+    # embedding_model is a local sentence-transformers directory; without
+    # one, vectors come from the spaCy model
+    if embedding_model:
+        return SentenceEmbedder(embedding_model)
+    return SpacyEmbedder(nlp, model_name)
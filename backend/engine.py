@@ -0,0 +1,57 @@
+# Entry point of the analysis backend. The GUI, the CLI and the benchmarks
+# all go through analyze(), or iter_watch() for watched folders, so
+# caching, parallelism and instrumentation live in one place
+# (backend/pipeline.py). File formats are added with register_extractor and
+# scoring is configured with the scorers in backend/scorers.py and the
+# skill requirements of backend/prefilter.py.
+import numpy as np
+from backend.pipeline import iter_analysis, iter_matching, warm_up, WorkerError, DEFAULT_BATCH_SIZE
+from backend.file_handler import register_extractor, supported_extensions, find_cv_files
+from backend.watch import iter_watch, DirectoryWatcher
+from backend.scorers import SemanticScorer, KeywordScorer, SkillScorer, TfidfScorer, DEFAULT_SCORERS, parse_scorers
+from backend.prefilter import SkillFilter, PruneStats
+
+__all__ = [
+    "analyze", "rank", "iter_analysis", "iter_matching", "warm_up", "WorkerError", "DEFAULT_BATCH_SIZE",
+    "register_extractor", "supported_extensions", "find_cv_files", "iter_watch", "DirectoryWatcher",
+    "SemanticScorer", "KeywordScorer", "SkillScorer", "TfidfScorer", "DEFAULT_SCORERS", "parse_scorers",
+    "SkillFilter", "PruneStats",
+]
+
+
+def analyze(paths, job, **options):
+    # Yields (path, result, error) for every path as soon as it is analyzed,
+    # in completion order. result is None for files without text and error
+    # is None unless the file could not be read.
+    #
+    # job is either one posting's text, and result is (candidate, score,
+    # skills), or a list of posting texts, and result is (candidate,
+    # [score per posting], skills). options are those of
+    # pipeline.iter_matching: max_workers, batch_size, model_name,
+    # embedding_model, cache_path, cache_max_bytes, skills_path, limits,
+    # scorers, dedupe, dedupe_threshold, duplicates, prune_stats, should_stop
+    # and profiler. CVs dropped for lacking must-have skills (see
+    # backend/prefilter.py) have no result either. Raises WorkerError when
+    # the worker processes cannot be set up, e.g. the model does not load.
+    if isinstance(job, str):
+        return iter_analysis(paths, job, **options)
+    return iter_matching(paths, job, **options)
+
+
+def rank(paths, job, top_k=None, **options):
+    # [(path, candidate, score, skills)] for one posting, best first and ties
+    # broken by path; files that failed or had no text are left out
+    ranked = [
+        (path, result[0], result[1], result[2])
+        for path, result, error in analyze(paths, job, **options)
+        if result is not None
+    ]
+    if top_k is not None and 0 < top_k < len(ranked):
+        # Partition out everything scoring at least the k-th best score
+        # instead of sorting every CV; only the shortlist, plus any ties at
+        # the cut, is sorted below
+        scores = np.array([item[2] for item in ranked])
+        cutoff = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+        ranked = [ranked[i] for i in np.flatnonzero(scores >= cutoff)]
+    ranked.sort(key=lambda item: (-item[2], item[0]))
+    return ranked if top_k is None else ranked[:max(top_k, 0)]
@@ -1,29 +1,202 @@
-from PyPDF2 import PdfReader
-import docx
+import os
+import glob
+import signal
+import threading
+from backend.profiling import NULL_PROFILER
 
-def extract_text_from_pdf(filepath):
-    reader = PdfReader(filepath)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text()
-    return text
+# Bump when the text produced by the built-in extractors changes, to invalidate cached text
+EXTRACTOR_VERSION = "file_handler-2"
 
-def extract_text_from_docx(filepath):
+# CVs rarely need more than their first few pages; the budgets also bound the
+# cost of pathological inputs such as long scanned documents
+DEFAULT_MAX_PAGES = 10
+DEFAULT_MAX_CHARS = 200000
+DEFAULT_MAX_FILE_BYTES = 25 * 1024 * 1024
+DEFAULT_TIMEOUT = 30
+
+class ExtractionError(Exception):
+    pass
+
+class ExtractionTimeout(ExtractionError):
+    pass
+
+class ExtractionLimits:
+    def __init__(self, max_pages=DEFAULT_MAX_PAGES, max_chars=DEFAULT_MAX_CHARS,
+                 max_file_bytes=DEFAULT_MAX_FILE_BYTES, timeout=DEFAULT_TIMEOUT):
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.max_file_bytes = max_file_bytes
+        self.timeout = timeout
+
+    @property
+    def cache_version(self):
+        # Only the page and character budgets change the extracted text
+        return f"{extractor_version()}:{self.max_pages}:{self.max_chars}"
+
+DEFAULT_LIMITS = ExtractionLimits()
+
+def iter_pdf_pages(filepath):
+    # Pages are only parsed when the consumer asks for them
+    from PyPDF2 import PdfReader
+    with open(filepath, "rb") as file:
+        reader = PdfReader(file)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
+def iter_docx_paragraphs(filepath):
+    import docx
     doc = docx.Document(filepath)
-    text = " ".join([para.text for para in doc.paragraphs])
-    return text
+    for para in doc.paragraphs:
+        yield para.text
 
-def extract_text_from_txt(filepath):
+def iter_txt_chunks(filepath, chunk_size=64 * 1024):
     with open(filepath, "r", encoding="utf-8") as file:
-        return file.read()
+        yield from iter(lambda: file.read(chunk_size), "")
+
+def join_within_budget(parts, separator, max_chars, max_parts=None):
+    # Joins once at the end and stops pulling parts once the budget is spent
+    pieces = []
+    total = 0
+    try:
+        for part in parts:
+            if max_parts is not None and len(pieces) >= max_parts:
+                break
+            pieces.append(part)
+            total += len(part) + len(separator)
+            if max_chars is not None and total >= max_chars:
+                break
+    finally:
+        parts.close()
+    text = separator.join(pieces)
+    return text[:max_chars] if max_chars is not None else text
+
+def extract_text_from_pdf(filepath, limits=DEFAULT_LIMITS):
+    return join_within_budget(iter_pdf_pages(filepath), "\n", limits.max_chars, limits.max_pages)
+
+def extract_text_from_docx(filepath, limits=DEFAULT_LIMITS):
+    return join_within_budget(iter_docx_paragraphs(filepath), "\n", limits.max_chars)
+
+def extract_text_from_txt(filepath, limits=DEFAULT_LIMITS):
+    return join_within_budget(iter_txt_chunks(filepath), "", limits.max_chars)
+
+# Text extractor for each supported file extension, called as
+# extractor(filepath, limits); add formats with register_extractor
+EXTRACTORS = {
+    ".pdf": extract_text_from_pdf,
+    ".docx": extract_text_from_docx,
+    ".txt": extract_text_from_txt,
+}
+# Versions of the extractors registered on top of the built-in ones
+_registered_versions = {}
 
-def extract_text_from_files(filepaths):
+def register_extractor(extension, extractor, version=None):
+    # Pool workers started with the "spawn" method re-import modules instead
+    # of inheriting this registry, so register at import time of a module
+    # the workers also import. version goes into the text cache key; bump it
+    # whenever the extractor's output changes.
+    extension = extension.lower()
+    EXTRACTORS[extension] = extractor
+    _registered_versions[extension] = version or f"{extractor.__module__}.{extractor.__qualname__}"
+
+def extractor_version():
+    registered = ",".join(f"{extension}={version}" for extension, version in sorted(_registered_versions.items()))
+    return f"{EXTRACTOR_VERSION}+{registered}" if registered else EXTRACTOR_VERSION
+
+def supported_extensions():
+    return tuple(EXTRACTORS)
+
+def get_extractor(filepath):
+    # None for unsupported file types
+    return EXTRACTORS.get(os.path.splitext(filepath)[1].lower())
+
+def extract_text(filepath, limits=DEFAULT_LIMITS):
+    # Returns None for unsupported file types
+    extractor = get_extractor(filepath)
+    if extractor is None:
+        return None
+    size = os.path.getsize(filepath)
+    if limits.max_file_bytes is not None and size > limits.max_file_bytes:
+        raise ExtractionError(
+            f"file is {size / 1048576:.1f} MB, over the {limits.max_file_bytes / 1048576:.0f} MB limit")
+    return extractor(filepath, limits)
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+def extract_text_with_timeout(filepath, limits=DEFAULT_LIMITS):
+    # Gives up on files that take longer than limits.timeout seconds so a
+    # single malformed CV cannot stall a whole batch
+    if not limits.timeout:
+        return extract_text(filepath, limits)
+
+    if hasattr(signal, "SIGALRM") and threading.current_thread() is threading.main_thread():
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        # Keep firing every second in case a parser swallows the first alarm
+        signal.setitimer(signal.ITIMER_REAL, limits.timeout, 1.0)
+        try:
+            return extract_text(filepath, limits)
+        except ExtractionTimeout:
+            raise ExtractionTimeout(f"timed out after {limits.timeout}s") from None
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+    # No SIGALRM (Windows) or not on the main thread: run in a daemon thread
+    # and abandon it if it overruns
+    outcome = {}
+
+    def target():
+        try:
+            outcome["text"] = extract_text(filepath, limits)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(limits.timeout)
+    if thread.is_alive():
+        raise ExtractionTimeout(f"timed out after {limits.timeout}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["text"]
+
+def extract_text_from_files(filepaths, cache=None, limits=DEFAULT_LIMITS, errors=None, profiler=NULL_PROFILER):
+    # Returns one text per filepath, in order; unsupported or unreadable files
+    # yield "" and, when an errors list is given, a (filepath, message) entry.
+    # cache is an optional backend.cache.FeatureCache; unchanged files are then
+    # served from it instead of being parsed again
     extracted_texts = []
     for filepath in filepaths:
-        if filepath.endswith(".pdf"):
-            extracted_texts.append(extract_text_from_pdf(filepath))
-        elif filepath.endswith(".docx"):
-            extracted_texts.append(extract_text_from_docx(filepath))
-        elif filepath.endswith(".txt"):
-            extracted_texts.append(extract_text_from_txt(filepath))
+        try:
+            with profiler.stage("extract", filepath):
+                digest = cache.content_hash(filepath) if cache is not None else None
+                text = cache.get_text(digest, limits.cache_version) if digest is not None else None
+                if text is None:
+                    text = extract_text_with_timeout(filepath, limits)
+                    if text is None:
+                        text = ""
+                    elif digest is not None:
+                        cache.put_text(digest, limits.cache_version, text)
+        except Exception as e:
+            if errors is not None:
+                errors.append((filepath, str(e)))
+            text = ""
+        extracted_texts.append(text)
     return extracted_texts
+
+def find_cv_files(patterns):
+    # Expands directories (recursively) and glob patterns into supported CV
+    # files, each reported once, in a stable order
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = sorted(glob.iglob(os.path.join(pattern, "**", "*"), recursive=True))
+        else:
+            candidates = sorted(glob.iglob(pattern, recursive=True))
+        for filepath in candidates:
+            if get_extractor(filepath) is None or not os.path.isfile(filepath):
+                continue
+            key = os.path.abspath(filepath)
+            if key not in seen:
+                seen.add(key)
+                yield filepath
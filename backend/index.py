@@ -0,0 +1,266 @@
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import scipy.sparse as sp
+
+from backend.analyzer import (
+    make_vectorizer, idf_weights, top_k_indices, DEFAULT_NGRAM_RANGE, DEFAULT_N_FEATURES
+)
+from backend.file_handler import extract_text_with_timeout, find_cv_files, DEFAULT_LIMITS
+
+INDEX_FORMAT = 1
+META_FILE = "meta.json"
+DF_FILE = "df.npy"
+
+
+def is_index(path):
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+class CandidateIndex:
+    # Persistent TF-IDF index of candidate CVs stored in a directory.
+    #
+    # Term counts are hashed into a fixed feature space, so new CVs are
+    # appended without refitting anything. Each flush writes the pending CVs
+    # as a new immutable CSR segment (three .npy files that are memory-mapped
+    # on open); removals only tombstone the row and update the document
+    # frequencies, and compact() rewrites the live rows into one segment.
+    # Querying a job posting is a sparse matrix-vector product per segment.
+    # With create=False a directory that holds no index is an error instead
+    # of a new, empty index.
+
+    def __init__(self, path, ngram_range=DEFAULT_NGRAM_RANGE, n_features=DEFAULT_N_FEATURES, create=True):
+        self.path = path
+        if not create and not is_index(path):
+            raise FileNotFoundError(f"{path} is not a candidate index (no {META_FILE})")
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as file:
+                self.meta = json.load(file)
+            if self.meta["format"] != INDEX_FORMAT:
+                raise ValueError(f"{path} uses index format {self.meta['format']}, expected {INDEX_FORMAT}")
+            self.df = np.load(os.path.join(path, DF_FILE))
+        else:
+            self.meta = {
+                "format": INDEX_FORMAT,
+                "ngram_range": list(ngram_range),
+                "n_features": n_features,
+                "next_segment": 0,
+                "segments": [],
+                # One entry per stored row: [candidate_id, name, mtime_ns, size], or None once removed
+                "rows": [],
+            }
+            self.df = np.zeros(n_features, dtype=np.int64)
+        self.vectorizer = make_vectorizer(tuple(self.meta["ngram_range"]), self.meta["n_features"])
+        self.rows = self.meta["rows"]
+        self.positions = {row[0]: i for i, row in enumerate(self.rows) if row is not None}
+        self.segments = [self._load_segment(name) for name in self.meta["segments"]]
+        self.pending = []
+        self.dirty = False
+        self._norms = None
+
+    def __len__(self):
+        return len(self.positions) + len(self.pending)
+
+    def __contains__(self, candidate_id):
+        return candidate_id in self.positions or any(item[0] == candidate_id for item in self.pending)
+
+    def _segment_path(self, name, part):
+        return os.path.join(self.path, f"{name}.{part}.npy")
+
+    def _load_segment(self, name):
+        data, indices, indptr = (np.load(self._segment_path(name, part), mmap_mode="r")
+                                 for part in ("data", "indices", "indptr"))
+        return sp.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, self.meta["n_features"]), copy=False)
+
+    def _write_segment(self, matrix):
+        name = f"seg-{self.meta['next_segment']:06d}"
+        self.meta["next_segment"] += 1
+        for part in ("data", "indices", "indptr"):
+            np.save(self._segment_path(name, part), getattr(matrix, part))
+        return name
+
+    def _locate(self, row):
+        for segment in self.segments:
+            if row < segment.shape[0]:
+                return segment, row
+            row -= segment.shape[0]
+        raise IndexError(row)
+
+    def term_frequencies(self, texts):
+        # Sublinear term frequencies; IDF weighting is applied at query time
+        # because document frequencies change as candidates come and go
+        matrix = self.vectorizer.transform(texts).astype(np.float32)
+        matrix.data = 1 + np.log(matrix.data)
+        matrix.sort_indices()
+        return matrix
+
+    def add(self, candidate_id, text, name=None, mtime_ns=None, size=None):
+        # Adds a candidate, replacing any stored version with the same id
+        self.remove(candidate_id)
+        self.pending.append((candidate_id, name or os.path.basename(candidate_id), mtime_ns, size, text))
+
+    def remove(self, candidate_id):
+        self.pending = [item for item in self.pending if item[0] != candidate_id]
+        row = self.positions.pop(candidate_id, None)
+        if row is None:
+            return False
+        segment, local = self._locate(row)
+        terms = segment.indices[segment.indptr[local]:segment.indptr[local + 1]]
+        self.df[terms] -= 1
+        self.rows[row] = None
+        self.dirty = True
+        self._norms = None
+        return True
+
+    def is_current(self, filepath):
+        row = self.positions.get(os.path.abspath(filepath))
+        if row is None:
+            return False
+        stat = os.stat(filepath)
+        return self.rows[row][2] == stat.st_mtime_ns and self.rows[row][3] == stat.st_size
+
+    def add_file(self, filepath, limits=DEFAULT_LIMITS):
+        # Returns False when the stored copy is already up to date
+        if self.is_current(filepath):
+            return False
+        stat = os.stat(filepath)
+        text = extract_text_with_timeout(filepath, limits) or ""
+        self.add(os.path.abspath(filepath), text, os.path.basename(filepath), stat.st_mtime_ns, stat.st_size)
+        return True
+
+    def flush(self):
+        if self.pending:
+            matrix = self.term_frequencies([item[4] for item in self.pending])
+            self.segments.append(self._append_segment(matrix))
+            self.df += np.bincount(matrix.indices, minlength=self.meta["n_features"])
+            for candidate_id, name, mtime_ns, size, _ in self.pending:
+                self.positions[candidate_id] = len(self.rows)
+                self.rows.append([candidate_id, name, mtime_ns, size])
+            self.pending = []
+            self.dirty = True
+            self._norms = None
+        if self.dirty:
+            self._save_meta()
+            self.dirty = False
+
+    def _append_segment(self, matrix):
+        name = self._write_segment(matrix)
+        self.meta["segments"].append(name)
+        return self._load_segment(name)
+
+    def _save_meta(self):
+        np.save(os.path.join(self.path, DF_FILE), self.df)
+        tmp_path = os.path.join(self.path, META_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.meta, file)
+        os.replace(tmp_path, os.path.join(self.path, META_FILE))
+
+    def compact(self):
+        # Rewrites the live rows into a single segment and drops tombstones
+        self.flush()
+        live = [i for i, row in enumerate(self.rows) if row is not None]
+        old_segments = self.meta["segments"]
+        if self.segments:
+            matrix = sp.vstack(self.segments, format="csr")[live]
+        else:
+            matrix = sp.csr_matrix((0, self.meta["n_features"]), dtype=np.float32)
+        self.segments = []
+        self.meta["segments"] = []
+        self.meta["rows"] = self.rows = [self.rows[i] for i in live]
+        self.positions = {row[0]: i for i, row in enumerate(self.rows)}
+        if live:
+            self.segments.append(self._append_segment(matrix))
+        self._save_meta()
+        self._norms = None
+        for name in old_segments:
+            for part in ("data", "indices", "indptr"):
+                os.remove(self._segment_path(name, part))
+
+    def _row_norms(self, idf):
+        # L2 norms of the TF-IDF rows; cached until the document frequencies change
+        if self._norms is None:
+            squared_idf = idf ** 2
+            self._norms = np.sqrt(np.concatenate([
+                sp.csr_matrix((np.square(segment.data), segment.indices, segment.indptr), shape=segment.shape)
+                @ squared_idf
+                for segment in self.segments
+            ]))
+        return self._norms
+
+    def query(self, job_requirements, top_k=None):
+        # [(candidate_id, name, score)] best first; scores are TF-IDF cosine similarities
+        self.flush()
+        if not self.positions:
+            return []
+        idf = idf_weights(self.df, len(self.positions))
+        job = self.term_frequencies([job_requirements])
+        job_weights = job.data * idf[job.indices]
+        job_norm = np.linalg.norm(job_weights)
+
+        # cos(d, q) = sum(tf_d * idf^2 * tf_q) / (|tf_d * idf| * |tf_q * idf|)
+        weights = np.zeros(self.meta["n_features"], dtype=np.float64)
+        weights[job.indices] = job_weights * idf[job.indices]
+        dots = np.concatenate([segment @ weights for segment in self.segments])
+        norms = self._row_norms(idf)
+
+        live = np.fromiter((row is not None for row in self.rows), dtype=bool, count=len(self.rows))
+        live_rows = np.flatnonzero(live)
+        denominators = norms[live_rows] * job_norm
+        scores = np.divide(dots[live_rows], denominators, out=np.zeros(len(live_rows)), where=denominators > 0)
+        return [
+            (self.rows[live_rows[i]][0], self.rows[live_rows[i]][1], float(scores[i]))
+            for i in top_k_indices(scores, top_k)
+        ]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.index", description="Maintain and query a candidate index.")
+    parser.add_argument("index", help="index directory (created by add if missing)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="add new or changed CVs")
+    add.add_argument("cvs", nargs="+", help="CV files, directories or glob patterns")
+    remove = commands.add_parser("remove", help="remove CVs from the index")
+    remove.add_argument("cvs", nargs="+", help="paths of the CVs to remove")
+    query = commands.add_parser("query", help="rank the indexed candidates against a job posting")
+    query.add_argument("-r", "--requirements", required=True, help="text file with the job requirements")
+    query.add_argument("-k", "--top-k", type=int, default=20, help="number of candidates to list")
+    commands.add_parser("compact", help="drop removed candidates from disk")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        index = CandidateIndex(args.index, create=args.command == "add")
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if args.command == "add":
+        added = 0
+        for filepath in find_cv_files(args.cvs):
+            try:
+                added += index.add_file(filepath)
+            except Exception as e:
+                print(f"warning: failed to read {filepath}: {e}", file=sys.stderr)
+        index.flush()
+        print(f"{added} CVs added or updated, {len(index)} in the index", file=sys.stderr)
+    elif args.command == "remove":
+        removed = sum(index.remove(os.path.abspath(filepath)) for filepath in args.cvs)
+        index.flush()
+        print(f"{removed} CVs removed, {len(index)} in the index", file=sys.stderr)
+    elif args.command == "query":
+        with open(args.requirements, "r", encoding="utf-8") as file:
+            job_requirements = file.read()
+        for rank, (candidate_id, name, score) in enumerate(index.query(job_requirements, args.top_k), start=1):
+            print(json.dumps({"rank": rank, "candidate": name, "score": round(score, 4), "path": candidate_id}))
+    elif args.command == "compact":
+        index.compact()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
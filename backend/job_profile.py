@@ -0,0 +1,84 @@
+import numpy as np
+from backend.embeddings import normalize_rows, similarity_matrix
+
+TOKEN_PUNCTUATION = ".,;:!?()[]{}<>\"'`"
+
+def keyword_tokens(text):
+    tokens = (token.strip(TOKEN_PUNCTUATION) for token in text.lower().split())
+    return [token for token in tokens if token]
+
+class JobProfile:
+    # Everything derived from the job requirements, computed once per analysis
+    # run and shared by every CV scored against it.
+
+    def __init__(self, nlp, job_requirements, embedder=None):
+        self.requirements = job_requirements
+        self.doc = nlp(job_requirements.lower())
+        # Unit length, so similarity against normalized CV vectors is a dot product
+        if embedder is not None:
+            self.vector = embedder.embed([job_requirements], [self.doc])[0]
+        else:
+            self.vector = normalize_rows(self.doc.vector)
+        self.keywords = keyword_tokens(job_requirements)
+        self.keyword_set = frozenset(self.keywords)
+        self.keyword_total = max(len(job_requirements.split()), 1)
+
+    def keyword_matches(self, cv_tokens):
+        return sum(1 for keyword in self.keywords if keyword in cv_tokens)
+
+    def keyword_score(self, cv_tokens):
+        return (self.keyword_matches(cv_tokens) / self.keyword_total) * 50
+
+class JobSet:
+    # Several job postings scored together. Semantic similarity of a batch of
+    # CVs to every posting is one matrix-matrix product, and keyword and
+    # skill overlap are products of the CVs' presence matrices with a
+    # term x posting weight matrix, so scoring cost barely grows with the
+    # number of postings. Used by the scorers in backend/scorers.py.
+
+    def __init__(self, nlp, job_postings, embedder=None, skill_index=None, skill_filter=None):
+        self.profiles = [JobProfile(nlp, posting, embedder) for posting in job_postings]
+        self.vectors = np.stack([profile.vector for profile in self.profiles])
+        vocabulary = sorted({keyword for profile in self.profiles for keyword in profile.keyword_set})
+        self.keyword_positions = {keyword: i for i, keyword in enumerate(vocabulary)}
+        self.keyword_weights = np.zeros((len(vocabulary), len(self.profiles)))
+        for j, profile in enumerate(self.profiles):
+            for keyword in profile.keywords:
+                self.keyword_weights[self.keyword_positions[keyword], j] += 50 / profile.keyword_total
+        # Taxonomy skills named in each posting, each worth an equal share of it.
+        # A posting that lists nice-to-have skills is rated on those alone:
+        # every CV that reaches scoring has its must-have skills anyway.
+        skill_sets = [set(skill_index.counts(profile.doc)) if skill_index else set() for profile in self.profiles]
+        if skill_filter is not None:
+            skill_sets = [set(nice_to_have) or skills
+                          for skills, nice_to_have in zip(skill_sets, skill_filter.nice_to_have)]
+        self.skill_positions = {skill: i for i, skill in enumerate(sorted(set().union(*skill_sets)))}
+        self.skill_weights = np.zeros((len(self.skill_positions), len(self.profiles)))
+        for j, skills in enumerate(skill_sets):
+            for skill in skills:
+                self.skill_weights[self.skill_positions[skill], j] = 1 / len(skills)
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def similarities(self, cv_vectors):
+        # (CVs x postings) cosine similarities, 0-100
+        cv_vectors = np.asarray(cv_vectors, dtype=np.float32)
+        if cv_vectors.size == 0 or cv_vectors.shape[-1] != self.vectors.shape[1]:
+            return np.zeros((len(cv_vectors), len(self.profiles)))
+        return similarity_matrix(cv_vectors, self.vectors).astype(np.float64) * 100
+
+    def keyword_scores(self, cv_token_sets):
+        # (CVs x postings), 0-50; JobProfile.keyword_score for every pair
+        return presence_matrix(cv_token_sets, self.keyword_positions) @ self.keyword_weights
+
+    def skill_coverage(self, cv_skill_counts):
+        # (CVs x postings), 0-1 share of each posting's skills found in the CV
+        return presence_matrix(cv_skill_counts, self.skill_positions) @ self.skill_weights
+
+def presence_matrix(term_sets, positions):
+    # (len(term_sets) x len(positions)) 0/1 matrix of which terms each set contains
+    presence = np.zeros((len(term_sets), len(positions)))
+    for i, terms in enumerate(term_sets):
+        presence[i, [positions[term] for term in positions.keys() & terms]] = 1
+    return presence
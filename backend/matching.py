@@ -0,0 +1,74 @@
+import os
+import numpy as np
+
+from backend.analyzer import top_k_indices
+from backend.file_handler import find_cv_files
+
+
+def read_job_postings(patterns):
+    # [(title, requirements)] from .txt files, directories or glob patterns;
+    # each file is one posting titled after its file name
+    postings = []
+    for filepath in find_cv_files(patterns):
+        if not filepath.lower().endswith(".txt"):
+            continue
+        with open(filepath, "r", encoding="utf-8", errors="ignore") as file:
+            requirements = file.read()
+        if requirements.strip():
+            postings.append((os.path.splitext(os.path.basename(filepath))[0], requirements))
+    return postings
+
+
+class MatchMatrix:
+    # Candidate x posting score matrix filled in as matching results stream
+    # in. Rows are stored in a growing float32 array, so shortlists and
+    # best-fit roles are column and row arg-partitions over it.
+
+    def __init__(self, titles, capacity=1024):
+        self.titles = list(titles)
+        self.scores = np.zeros((capacity, len(self.titles)), dtype=np.float32)
+        self.candidates = []
+        self.paths = []
+        self.skills = []
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def add(self, filepath, result):
+        candidate, scores, skills = result
+        row = len(self.candidates)
+        if row == len(self.scores):
+            self.scores = np.resize(self.scores, (2 * row, len(self.titles)))
+        self.scores[row] = scores
+        self.candidates.append(candidate)
+        self.paths.append(filepath)
+        self.skills.append(skills)
+        return row
+
+    def matrix(self):
+        return self.scores[:len(self.candidates)]
+
+    def shortlist(self, job, top_k=None):
+        # [(row, score)] of the best candidates for one posting, best first
+        column = self.matrix()[:, job]
+        return [(int(row), float(column[row])) for row in top_k_indices(column, top_k)]
+
+    def shortlists(self, top_k=None):
+        return {title: self.shortlist(j, top_k) for j, title in enumerate(self.titles)}
+
+    def best_fits(self, row, n=1):
+        # [(title, score)] of the postings a candidate fits best, best first
+        scores = self.matrix()[row]
+        return [(self.titles[j], float(scores[j])) for j in top_k_indices(scores, n)]
+
+    def shortlist_rows(self, top_k=None):
+        for j, title in enumerate(self.titles):
+            for rank, (row, score) in enumerate(self.shortlist(j, top_k), start=1):
+                yield {"job": title, "rank": rank, "candidate": self.candidates[row], "score": round(score, 2),
+                       "skills": self.skills[row], "path": self.paths[row]}
+
+    def best_fit_rows(self, n=1):
+        for row, candidate in enumerate(self.candidates):
+            for rank, (title, score) in enumerate(self.best_fits(row, n), start=1):
+                yield {"candidate": candidate, "rank": rank, "job": title, "score": round(score, 2),
+                       "path": self.paths[row]}
@@ -0,0 +1,369 @@
+import os
+import math
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from backend.job_profile import JobSet, keyword_tokens
+from backend.embeddings import load_embedder
+from backend.scorers import DEFAULT_SCORERS, combine_scores
+from backend.dedup import MinHasher, find_duplicates, DEFAULT_THRESHOLD
+from backend.prefilter import SkillFilter, PruneStats
+from backend.cache import FeatureCache, DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES
+from backend.skills import SkillIndex, ranked_skills, DEFAULT_SKILLS_PATH
+from backend.file_handler import extract_text_with_timeout, DEFAULT_LIMITS
+from backend.profiling import Profiler, NULL_PROFILER
+
+# Analysis only reads tokens (skill matching) and document vectors (tok2vec
+# tensors), so every component producing anything else is switched off
+UNUSED_PIPES = ["tagger", "parser", "attribute_ruler", "senter", "ner", "lemmatizer"]
+DEFAULT_BATCH_SIZE = 16
+
+# Bump when the cached features change shape or content
+FEATURES_VERSION = "3"
+
+# spaCy model, embedder, compiled job postings, skill requirements, skill
+# index and feature cache owned by the current worker process, built once by
+# init_worker
+_nlp = None
+_embedder = None
+_jobs = None
+_filter = None
+_scorers = DEFAULT_SCORERS
+_skill_index = None
+_cache = None
+_limits = DEFAULT_LIMITS
+_features_version = None
+_minhasher = None
+_signature_version = None
+# Why init_worker failed in this worker, raised by every task it is given
+_init_error = None
+# Loaded spaCy models by name. Pool workers forked after warm_up() inherit
+# them instead of loading the model again.
+_models = {}
+
+def load_nlp(model_name="en_core_web_sm"):
+    nlp = _models.get(model_name)
+    if nlp is None:
+        import spacy
+        nlp = spacy.load(model_name)
+        nlp.select_pipes(disable=[name for name in UNUSED_PIPES if name in nlp.pipe_names])
+        _models[model_name] = nlp
+    return nlp
+
+def warm_up(model_name="en_core_web_sm"):
+    # Imports spaCy and loads the model ahead of the first analysis
+    return load_nlp(model_name)
+
+def init_worker(job_postings, model_name="en_core_web_sm", cache_path=DEFAULT_CACHE_PATH,
+                cache_max_bytes=DEFAULT_MAX_BYTES, skills_path=DEFAULT_SKILLS_PATH, limits=DEFAULT_LIMITS,
+                embedding_model=None, scorers=None):
+    global _nlp, _embedder, _jobs, _filter, _scorers, _skill_index, _cache, _limits, _features_version, _minhasher, \
+        _signature_version
+    _nlp = load_nlp(model_name)
+    _embedder = load_embedder(_nlp, model_name, embedding_model)
+    # With static word vectors or a sentence model, tok2vec output is never read
+    if not _embedder.needs_tensors and "tok2vec" in _nlp.pipe_names:
+        _nlp.disable_pipe("tok2vec")
+    _skill_index = SkillIndex(_nlp, skills_path)
+    _filter = SkillFilter(job_postings, _skill_index.taxonomy)
+    _jobs = JobSet(_nlp, job_postings, _embedder, _skill_index, _filter)
+    _scorers = scorers or DEFAULT_SCORERS
+    _cache = FeatureCache(cache_path, cache_max_bytes) if cache_path else None
+    _limits = limits
+    _features_version = f"{FEATURES_VERSION}:{_embedder.name}:{_skill_index.version}:{limits.cache_version}"
+    _minhasher = MinHasher()
+    _signature_version = f"{_minhasher.version}:{limits.cache_version}"
+
+class WorkerError(RuntimeError):
+    # The pool workers could not be set up, or one of them died; unlike a
+    # file that cannot be read, this ends the whole analysis
+    pass
+
+def start_worker(*args):
+    # Pool initializer. An exception raised here only marks the pool broken
+    # and loses its message, so it is kept and raised by every task instead.
+    global _init_error
+    try:
+        init_worker(*args)
+    except Exception as e:
+        _init_error = WorkerError(f"worker setup failed: {e}")
+
+def check_worker():
+    if _init_error is not None:
+        raise _init_error
+
+def parse_texts(nlp, texts, batch_size=DEFAULT_BATCH_SIZE, n_process=1):
+    return nlp.pipe((text.lower() for text in texts), batch_size=batch_size, n_process=n_process)
+
+def extract_skills(doc):
+    # {skill: mention count}; use _skill_index.find for character positions
+    return _skill_index.counts(doc)
+
+def calculate_match_scores(cv_vectors, cv_token_sets, cv_skill_counts, jobs, scorers=DEFAULT_SCORERS, texts=None):
+    # (CVs x postings) score matrix for a batch of normalized CV vectors;
+    # texts are only needed by scorers that set needs_text
+    batch = {"vectors": np.asarray(cv_vectors, dtype=np.float32), "tokens": cv_token_sets, "skills": cv_skill_counts}
+    if texts is not None:
+        batch["texts"] = texts
+    return combine_scores(scorers, jobs, batch)
+
+def load_text(filepath, digest):
+    if digest is not None:
+        text = _cache.get_text(digest, _limits.cache_version)
+        if text is not None:
+            return text
+    text = extract_text_with_timeout(filepath, _limits) or ""
+    if digest is not None:
+        _cache.put_text(digest, _limits.cache_version, text)
+    return text
+
+def analyze_files(filepaths, batch_size=DEFAULT_BATCH_SIZE, profile=False, trace_memory=False):
+    # Runs inside a pool worker. CVs whose features are cached skip extraction,
+    # parsing and embedding; the rest are parsed exactly once through nlp.pipe,
+    # the Doc is shared by skill extraction and the embedder, and their vectors
+    # are embedded as one batch. The scorers then rate every CV of the chunk
+    # against every job posting, each with a matrix product. When postings
+    # have must-have skills, CVs missing them are dropped before parsing and
+    # again before embedding (backend/prefilter.py), and a CV scores 0 for
+    # postings whose must-haves it lacks. Returns the (filepath, result,
+    # error) outcome of every file, where result is (candidate, [score per
+    # posting], skills) or None for files without extractable text or
+    # pruned, the profiler events recorded when profile is set, and the
+    # chunk's PruneStats.
+    check_worker()
+    profiler = Profiler(trace_memory) if profile else NULL_PROFILER
+    stats = PruneStats()
+    outcomes = []
+    parsed = []
+    # (filepath, vector, tokens, skill counts) of every CV ready to score
+    features = []
+    # filepath -> text, kept for scorers that rate the text itself; cached
+    # CVs read it back from the text cache
+    needs_text = any(getattr(scorer, "needs_text", False) for scorer in _scorers)
+    texts = {}
+    for filepath in filepaths:
+        try:
+            with profiler.stage("cache", filepath):
+                digest = _cache.content_hash(filepath) if _cache is not None else None
+                cached = _cache.get_features(digest, _features_version) if digest is not None else None
+            if cached is not None:
+                if needs_text:
+                    with profiler.stage("extract", filepath):
+                        texts[filepath] = load_text(filepath, digest)
+                features.append((filepath, cached["vector"], cached["tokens"], cached["skills"]))
+                continue
+            with profiler.stage("extract", filepath):
+                text = load_text(filepath, digest)
+            if needs_text:
+                texts[filepath] = text
+        except Exception as e:
+            outcomes.append((filepath, None, str(e)))
+            continue
+        if text:
+            parsed.append((filepath, digest, text))
+        else:
+            outcomes.append((filepath, None, None))
+
+    if _filter.active and parsed:
+        with profiler.stage("prefilter", docs=len(parsed)), stats.timed("tokens", len(parsed)):
+            keep = _filter.qualified([_filter.possible_skills(text) for _, _, text in parsed]).any(axis=1)
+        for (filepath, _, _), kept in zip(parsed, keep):
+            if not kept:
+                stats.prune(filepath, "tokens")
+                outcomes.append((filepath, None, None))
+        parsed = [item for item, kept in zip(parsed, keep) if kept]
+
+    # (filepath, digest, text, doc, skill counts, tokens) of every CV parsed
+    pending = []
+    with stats.timed("parse", len(parsed)):
+        with profiler.stage("parse", docs=len(parsed)):
+            docs = list(parse_texts(_nlp, [text for _, _, text in parsed], batch_size=batch_size))
+        for (filepath, digest, text), doc in zip(parsed, docs):
+            with profiler.stage("skills", filepath):
+                pending.append((filepath, digest, text, doc, extract_skills(doc), set(keyword_tokens(text))))
+
+    qualified = None
+    if _filter.active:
+        with profiler.stage("prefilter", docs=len(features) + len(pending)), \
+                stats.timed("skills", len(features) + len(pending)):
+            qualified = _filter.qualified([item[3] for item in features] + [item[4] for item in pending])
+        keep = qualified.any(axis=1)
+        for item, kept in zip(features + pending, keep):
+            if not kept:
+                stats.prune(item[0], "skills")
+                outcomes.append((item[0], None, None))
+        pending = [item for item, kept in zip(pending, keep[len(features):]) if kept]
+        features = [item for item, kept in zip(features, keep) if kept]
+        qualified = qualified[keep]
+
+    with stats.timed("embed", len(pending)):
+        with profiler.stage("embed", docs=len(pending)):
+            vectors = _embedder.embed([item[2] for item in pending], [item[3] for item in pending])
+    for (filepath, digest, _, _, skill_counts, tokens), vector in zip(pending, vectors):
+        if digest is not None:
+            with profiler.stage("cache", filepath):
+                _cache.put_features(digest, _features_version, skill_counts, tokens, vector)
+        features.append((filepath, vector, tokens, skill_counts))
+
+    if features:
+        with profiler.stage("score", docs=len(features)), stats.timed("score", len(features)):
+            scores = calculate_match_scores(
+                np.stack([vector for _, vector, _, _ in features]),
+                [tokens for _, _, tokens, _ in features],
+                [skill_counts for _, _, _, skill_counts in features],
+                _jobs, _scorers,
+                [texts[filepath] for filepath, _, _, _ in features] if needs_text else None,
+            )
+            if qualified is not None:
+                scores[~qualified] = 0
+        for (filepath, _, _, skill_counts), row in zip(features, scores.tolist()):
+            outcomes.append((filepath, (os.path.basename(filepath), row, ranked_skills(skill_counts)), None))
+    return outcomes, list(profiler.events), stats
+
+def sketch_files(filepaths, profile=False, trace_memory=False):
+    # Runs inside a pool worker: the MinHash signature of every file's text,
+    # for near-duplicate detection before scoring. Returns (filepath,
+    # signature, error) outcomes, with no signature for files without text,
+    # plus profiler events. Extracted texts go to the cache, so scoring the
+    # files that are kept does not extract them again.
+    check_worker()
+    profiler = Profiler(trace_memory) if profile else NULL_PROFILER
+    outcomes = []
+    for filepath in filepaths:
+        try:
+            with profiler.stage("cache", filepath):
+                digest = _cache.content_hash(filepath) if _cache is not None else None
+                signature = _cache.get_signature(digest, _signature_version) if digest is not None else None
+            if signature is None:
+                with profiler.stage("extract", filepath):
+                    text = load_text(filepath, digest)
+                if not text:
+                    outcomes.append((filepath, None, None))
+                    continue
+                with profiler.stage("sketch", filepath):
+                    signature = _minhasher.signature(text)
+                if digest is not None:
+                    _cache.put_signature(digest, _signature_version, signature)
+        except Exception as e:
+            outcomes.append((filepath, None, str(e)))
+            continue
+        outcomes.append((filepath, signature, None))
+    return outcomes, list(profiler.events), None
+
+def run_chunks(executor, function, chunks, args, profiler, should_stop, prune_stats=None):
+    # Yields the outcomes of function(chunk, *args) for every chunk as soon as
+    # it finishes, after merging its PruneStats, if any, into prune_stats;
+    # returns True if should_stop() ended it early. Raises WorkerError when
+    # the workers could not be set up or the pool broke.
+    futures = {executor.submit(function, chunk, *args): chunk for chunk in chunks}
+    pending = set(futures)
+    while pending and not should_stop():
+        # Poll so a stop request is honoured even while a slow CV is still being processed
+        finished, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+        for future in finished:
+            try:
+                outcomes, events, stats = future.result()
+            except WorkerError:
+                raise
+            except BrokenProcessPool as e:
+                raise WorkerError(f"a worker process died: {e}") from e
+            except Exception as e:
+                outcomes, events, stats = [(filepath, None, str(e)) for filepath in futures[future]], [], None
+            profiler.merge(events)
+            if stats is not None and prune_stats is not None:
+                prune_stats.merge(stats)
+            yield from outcomes
+    return bool(pending)
+
+def default_worker_count():
+    return max(1, (os.cpu_count() or 2) - 1)
+
+def chunk_files(filepaths, batch_size, max_workers):
+    # Small enough that every worker gets a share, large enough for nlp.pipe to batch
+    size = max(1, min(batch_size, math.ceil(len(filepaths) / max_workers)))
+    return [filepaths[i:i + size] for i in range(0, len(filepaths), size)]
+
+def iter_analysis(filepaths, job_requirements, **options):
+    # Single-posting form of iter_matching: results are (candidate, score, skills)
+    outcomes = iter_matching(filepaths, [job_requirements], **options)
+    try:
+        for filepath, result, error in outcomes:
+            if result is not None:
+                candidate, scores, skills = result
+                result = (candidate, scores[0], skills)
+            yield filepath, result, error
+    finally:
+        outcomes.close()
+
+def iter_matching(filepaths, job_postings, max_workers=None, batch_size=DEFAULT_BATCH_SIZE,
+                  model_name="en_core_web_sm", cache_path=DEFAULT_CACHE_PATH, cache_max_bytes=DEFAULT_MAX_BYTES,
+                  skills_path=DEFAULT_SKILLS_PATH, limits=DEFAULT_LIMITS, embedding_model=None, scorers=None,
+                  dedupe=False, dedupe_threshold=DEFAULT_THRESHOLD, duplicates=None, prune_stats=None, should_stop=None,
+                  profiler=None):
+    # Scores CVs against every job posting in a process pool and yields
+    # (filepath, (candidate, [score per posting], skills), error) for every
+    # file as soon as its chunk finishes, in completion order. Each CV is
+    # extracted, parsed and embedded once however many postings there are.
+    # Stops early once should_stop() returns True or the generator is
+    # closed. Stage timings recorded by the workers are merged into profiler.
+    # Raises WorkerError when the workers cannot load the model or die; a
+    # file that cannot be read is only yielded with an error.
+    #
+    # With dedupe, near-duplicate CVs (estimated Jaccard similarity of their
+    # word shingles at least dedupe_threshold) are found first and only the
+    # first file of each cluster, in filepaths order, is scored. The others
+    # are yielded with no result and, when a duplicates dict is given, added
+    # to it as {duplicate filepath: scored filepath}.
+    #
+    # CVs lacking the must-have skills listed in every posting are yielded
+    # with no result; prune_stats, a prefilter.PruneStats, collects which
+    # stage dropped them and the time that saved.
+    filepaths = list(filepaths)
+    job_postings = list(job_postings)
+    profiler = profiler or NULL_PROFILER
+    max_workers = max_workers or default_worker_count()
+    should_stop = should_stop or (lambda: False)
+    chunks = chunk_files(filepaths, batch_size, max_workers)
+    if not chunks:
+        return
+    scratch = None
+    if dedupe and not cache_path:
+        # Texts extracted for the signatures are kept until scoring in a cache for this run only
+        scratch = tempfile.TemporaryDirectory(ignore_cleanup_errors=True)
+        cache_path = os.path.join(scratch.name, "features.sqlite3")
+    executor = ProcessPoolExecutor(
+        max_workers=min(max_workers, len(chunks)),
+        initializer=start_worker,
+        initargs=(job_postings, model_name, cache_path, cache_max_bytes, skills_path, limits, embedding_model,
+                  scorers),
+    )
+    stopped = True
+    try:
+        if dedupe:
+            signatures = {}
+            sketches = run_chunks(executor, sketch_files, chunks, (profiler.enabled, profiler.trace_memory),
+                                  profiler, should_stop)
+            for filepath, signature, error in sketches:
+                if signature is None:
+                    yield filepath, None, error
+                else:
+                    signatures[filepath] = signature
+            if should_stop():
+                return
+            ordered = [filepath for filepath in dict.fromkeys(filepaths) if filepath in signatures]
+            with profiler.stage("dedupe", docs=len(ordered)):
+                kept, linked = find_duplicates([(filepath, signatures[filepath]) for filepath in ordered],
+                                               dedupe_threshold)
+            if duplicates is not None:
+                duplicates.update(linked)
+            for filepath in linked:
+                yield filepath, None, None
+            chunks = chunk_files(kept, batch_size, max_workers)
+        stopped = yield from run_chunks(executor, analyze_files, chunks,
+                                        (batch_size, profiler.enabled, profiler.trace_memory), profiler, should_stop,
+                                        prune_stats)
+    finally:
+        executor.shutdown(wait=not stopped, cancel_futures=True)
+        if scratch is not None:
+            scratch.cleanup()
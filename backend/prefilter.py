@@ -0,0 +1,161 @@
+import re
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Hard skill requirements. A job posting may list them on lines of exactly
+# this form
+#
+#   Must have: Python, SQL
+#   Nice to have: Docker, Kubernetes
+#
+# naming skills of the taxonomy (canonical names or synonyms). Free-text
+# lines such as "Must have experience with AWS: EC2" are left alone, and
+# listed terms that are not taxonomy skills ("3+ years of experience") are
+# skipped and reported in SkillFilter.unknown. CVs that miss
+# a must-have skill of every posting are dropped before the expensive
+# stages, in two passes that both look CVs up in an inverted index from
+# skill to the CVs of the batch:
+#   tokens  before spaCy runs: the lowercase word set of the text must hold
+#           every word of one of the skill's surface forms
+#   skills  before embedding and scoring: the skills extract_skills found
+# The first pass is a necessary condition for the second (short of the
+# tokenizer splitting a word that a surface form does not), so it only
+# drops CVs the second would drop anyway. Nice-to-have skills never drop a
+# CV; they are what the skills scorer rates.
+
+# An optional list bullet, "must have" or "nice to have" (words joined by spaces or hyphens), then a colon
+REQUIREMENT_LINE = re.compile(r"^[ \t*\u2022-]*(must[ -]have|nice[ -]to[ -]have)[ \t]*:(.*)$",
+                              re.IGNORECASE | re.MULTILINE)
+STAGES = ("tokens", "skills")
+
+
+def words(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def skill_requirements(job_requirements):
+    # ([must-have terms], [nice-to-have terms]) as written, lowercased
+    must_have, nice_to_have = [], []
+    for match in REQUIREMENT_LINE.finditer(job_requirements):
+        terms = must_have if match.group(1).lower().startswith("must") else nice_to_have
+        for term in re.split(r"[,;]", match.group(2)):
+            term = " ".join(term.lower().split()).strip(" .")
+            if term and term not in terms:
+                terms.append(term)
+    return must_have, nice_to_have
+
+
+def resolve_skills(terms, taxonomy):
+    # (canonical taxonomy names of terms, terms that are not taxonomy skills)
+    canonical = {form: skill for skill, forms in taxonomy.items() for form in forms}
+    skills = list(dict.fromkeys(canonical[term] for term in terms if term in canonical))
+    return skills, [term for term in terms if term not in canonical]
+
+
+class SkillFilter:
+    # Must-have and nice-to-have skills of every posting, compiled once per
+    # analysis run. Inactive (every CV qualifies) when no posting lists
+    # must-have skills.
+
+    def __init__(self, job_postings, taxonomy):
+        self.must_have = []
+        self.nice_to_have = []
+        # Listed terms that were skipped, as they are not taxonomy skills
+        self.unknown = []
+        for posting in job_postings:
+            for terms, skills in zip(skill_requirements(posting), (self.must_have, self.nice_to_have)):
+                resolved, unknown = resolve_skills(terms, taxonomy)
+                skills.append(resolved)
+                self.unknown.extend(term for term in unknown if term not in self.unknown)
+        # Word sets of the surface forms of every must-have skill
+        self.forms = {
+            skill: [frozenset(words(form)) for form in taxonomy[skill]]
+            for skill in sorted(set().union(*self.must_have))
+        }
+
+    @property
+    def active(self):
+        return bool(self.forms)
+
+    def format_unknown(self):
+        return (f"ignoring {', '.join(map(repr, self.unknown))} in the must-have and nice-to-have lists: "
+                f"not a skill of the taxonomy")
+
+    def possible_skills(self, text):
+        # Must-have skills whose surface forms could occur in the text
+        present = set(words(text))
+        return {skill for skill, forms in self.forms.items() if any(form <= present for form in forms)}
+
+    def qualified(self, skill_sets):
+        # (CVs x postings) bool matrix of the postings whose must-have skills
+        # each CV has; skill_sets are sets or {skill: count} dicts
+        index = {skill: set() for skill in self.forms}
+        for row, skills in enumerate(skill_sets):
+            for skill in self.forms.keys() & skills:
+                index[skill].add(row)
+        qualified = np.zeros((len(skill_sets), len(self.must_have)), dtype=bool)
+        for j, must_have in enumerate(self.must_have):
+            rows = range(len(skill_sets))
+            # Intersect the rarest skills first, so the candidate set shrinks fastest
+            for skill in sorted(must_have, key=lambda skill: len(index[skill])):
+                rows = index[skill].intersection(rows)
+            qualified[list(rows), j] = True
+        return qualified
+
+
+class PruneStats:
+    # CVs dropped by each prefilter stage, and worker seconds spent per
+    # stage: tokens and skills are the filters themselves, parse, embed and
+    # score the stages they spare. Each pool worker fills one per chunk and
+    # the parent merges them.
+
+    def __init__(self):
+        # filepath -> stage that dropped it
+        self.pruned = {}
+        self.seconds = {}
+        self.docs = {}
+
+    @contextmanager
+    def timed(self, stage, docs):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + time.perf_counter() - started
+            self.docs[stage] = self.docs.get(stage, 0) + docs
+
+    def prune(self, filepath, stage):
+        self.pruned[filepath] = stage
+
+    def merge(self, other):
+        self.pruned.update(other.pruned)
+        for stage, seconds in other.seconds.items():
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+            self.docs[stage] = self.docs.get(stage, 0) + other.docs[stage]
+
+    def counts(self):
+        counts = dict.fromkeys(STAGES, 0)
+        for stage in self.pruned.values():
+            counts[stage] += 1
+        return counts
+
+    def per_doc(self, stage):
+        return self.seconds[stage] / self.docs[stage] if self.docs.get(stage) else 0.0
+
+    def time_saved(self):
+        # Estimated worker seconds saved: what the skipped stages cost per CV
+        # on the CVs that did go through them, times the CVs pruned, less the
+        # time spent filtering
+        counts = self.counts()
+        later = self.per_doc("embed") + self.per_doc("score")
+        saved = counts["tokens"] * (self.per_doc("parse") + later) + counts["skills"] * later
+        return saved - sum(self.seconds.get(stage, 0.0) for stage in STAGES)
+
+    def format_summary(self):
+        counts = self.counts()
+        saved = self.time_saved()
+        outcome = f"~{saved:.1f}s of worker time saved" if saved >= 0 else f"~{-saved:.1f}s more worker time spent"
+        return (f"prefilter: {counts['tokens']} CVs pruned on word tokens, {counts['skills']} on extracted skills; "
+                f"{outcome}")
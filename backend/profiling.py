@@ -0,0 +1,158 @@
+import os
+import sys
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss():
+    # Peak resident set size of this process in bytes, or None where unavailable
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Profiler:
+    # Records wall time, CPU time and memory for every analysis stage, per
+    # file where one applies. Events are plain dicts so pool workers can
+    # send theirs back to the parent process, which merges them.
+    #
+    # With trace_memory, each stage also records its peak Python allocation
+    # through tracemalloc; that is precise but slows analysis noticeably, so
+    # by default only the process peak RSS is recorded.
+
+    enabled = True
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.events = []
+        self._lock = threading.Lock()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, file=None, **details):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        started = time.time()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            event = {
+                "stage": name,
+                "file": file,
+                "start": started,
+                "wall": time.perf_counter() - wall_start,
+                "cpu": time.thread_time() - cpu_start,
+                "peak_rss": peak_rss(),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            }
+            if self.trace_memory:
+                event["peak_alloc"] = tracemalloc.get_traced_memory()[1]
+            if details:
+                event["details"] = details
+            self.record(event)
+
+    def record(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def merge(self, events):
+        with self._lock:
+            self.events.extend(events)
+
+    def clear(self):
+        with self._lock:
+            self.events = []
+
+    def summary(self):
+        # {stage: {"count", "wall", "cpu", "peak_rss"}} with wall and CPU summed across events
+        totals = {}
+        for event in self.events:
+            total = totals.setdefault(event["stage"], {"count": 0, "wall": 0.0, "cpu": 0.0, "peak_rss": None})
+            total["count"] += 1
+            total["wall"] += event["wall"]
+            total["cpu"] += event["cpu"]
+            if event["peak_rss"] is not None:
+                total["peak_rss"] = max(total["peak_rss"] or 0, event["peak_rss"])
+        return totals
+
+    def slowest_files(self, n=5):
+        # [(file, seconds)] summed over every stage that ran for the file
+        per_file = {}
+        for event in self.events:
+            if event["file"] is not None:
+                per_file[event["file"]] = per_file.get(event["file"], 0.0) + event["wall"]
+        return sorted(per_file.items(), key=lambda item: item[1], reverse=True)[:n]
+
+    def format_summary(self):
+        lines = []
+        for name, total in self.summary().items():
+            line = f"{name}: {total['wall']:.2f}s wall, {total['cpu']:.2f}s CPU over {total['count']} calls"
+            if total["peak_rss"]:
+                line += f", peak RSS {total['peak_rss'] / 1048576:.0f} MB"
+            lines.append(line)
+        slowest = self.slowest_files()
+        if slowest:
+            lines.append("slowest files: " + ", ".join(
+                f"{os.path.basename(file)} ({seconds:.2f}s)" for file, seconds in slowest))
+        return "\n".join(lines)
+
+    def to_chrome_trace(self):
+        # Complete ("X") events, viewable in chrome://tracing or Perfetto
+        trace_events = []
+        for event in self.events:
+            args = {key: value for key, value in event.items()
+                    if key not in ("stage", "start", "wall", "pid", "tid") and value is not None}
+            trace_events.append({
+                "name": event["stage"],
+                "cat": "analysis",
+                "ph": "X",
+                "ts": event["start"] * 1e6,
+                "dur": event["wall"] * 1e6,
+                "pid": event["pid"],
+                "tid": event["tid"],
+                "args": args,
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def dump(self, path):
+        # Chrome trace format for *.trace.json, otherwise raw events plus summary
+        if path.endswith(".trace.json"):
+            payload = self.to_chrome_trace()
+        else:
+            payload = {"summary": self.summary(), "events": self.events}
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(payload, file, indent=1)
+
+
+class NullProfiler:
+    # Stand-in used when instrumentation is off; every call is a no-op
+
+    enabled = False
+    trace_memory = False
+    events = ()
+
+    def stage(self, name, file=None, **details):
+        return nullcontext()
+
+    def record(self, event):
+        pass
+
+    def merge(self, events):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -1,25 +1,219 @@
-from fpdf import FPDF
+import os
+import csv
+from io import BytesIO
+
+from backend.analyzer import chunked
+
+# One writer per report format. Writers consume the ranked rows lazily, a
+# page or chunk at a time, so a report on tens of thousands of CVs never
+# builds one huge table. Rows are (candidate, score, skills), best first.
+
+FORMATS = (".pdf", ".docx", ".csv", ".xlsx")
+TABLE_HEADER = ["Candidate", "Match Score", "Top Skills"]
+EXPORT_HEADER = ["Rank", "Candidate", "Match Score", "Skills"]
+TOP_SKILLS = 5
+# Every PDF page and every DOCX table starts with the header row
+PDF_ROWS_PER_PAGE = 32
+DOCX_ROWS_PER_TABLE = 500
+EXPORT_CHUNK_ROWS = 1000
+PDF_COLUMN_WIDTHS = [190, 80, 242]
+
+
+class ReportCancelled(Exception):
+    pass
+
+
+def report_format(filepath):
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"unsupported report format {extension or filepath!r}; use {', '.join(FORMATS)}")
+    return extension
+
+
+def summarize(results, job=None):
+    # Summary of ranked results that are already in memory (any sequence)
+    summary = {"total": len(results), "job": job}
+    if len(results):
+        candidate, score = results[0][0], results[0][1]
+        summary["best"] = (candidate, score)
+    return summary
+
+
+def summary_lines(summary):
+    lines = []
+    if summary.get("job"):
+        lines.append(f"Job posting: {summary['job']}")
+    if "total" in summary:
+        lines.append(f"Total CVs analyzed: {summary['total']}")
+    if summary.get("best"):
+        candidate, score = summary["best"]
+        lines.append(f"Best Candidate: {candidate} (Score: {score}%)")
+    return lines
+
+
+def table_row(candidate, score, skills):
+    return [candidate, f"{score}%", ", ".join(skills[:TOP_SKILLS])]
+
+
+def fit_text(text, width, font, size):
+    # Trims text to one line of the given width, so every PDF row has the same height
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    if stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + "...", font, size) > width:
+        text = text[:-1]
+    return text + "..."
+
+
+def write_pdf(filepath, rows, summary, charts, on_chunk):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.platypus import Table, TableStyle
+    width, height = letter
+    margin = 50
+    pdf = Canvas(filepath, pagesize=letter)
+
+    y = height - margin - 20
+    pdf.setFont("Helvetica-Bold", 20)
+    pdf.drawCentredString(width / 2, y, "CV Analysis Report")
+    y -= 40
+    pdf.setFont("Helvetica-Bold", 14)
+    pdf.drawString(margin, y, "Analysis Summary")
+    pdf.setFont("Helvetica", 11)
+    for line in summary_lines(summary):
+        y -= 18
+        pdf.drawString(margin, y, line)
+    for chart in charts:
+        image = ImageReader(BytesIO(chart))
+        image_width, image_height = image.getSize()
+        scale = min(1.0, (width - 2 * margin) / image_width)
+        if y - 12 - image_height * scale < margin:
+            pdf.showPage()
+            y = height - margin
+        y -= 12 + image_height * scale
+        pdf.drawImage(image, margin, y, image_width * scale, image_height * scale)
+    pdf.showPage()
+
+    style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#0E6CFF")),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor("#E9ECEF")),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ])
+    # Each page is its own small table drawn straight onto the canvas, so
+    # layout work and memory stay constant per page
+    for page in chunked(rows, PDF_ROWS_PER_PAGE):
+        pdf.setFont("Helvetica-Bold", 14)
+        pdf.drawString(margin, height - margin, "Detailed Results")
+        data = [TABLE_HEADER] + [
+            [fit_text(value, column_width - 8, "Helvetica", 9)
+             for value, column_width in zip(table_row(*row), PDF_COLUMN_WIDTHS)]
+            for row in page
+        ]
+        table = Table(data, colWidths=PDF_COLUMN_WIDTHS, style=style)
+        _, table_height = table.wrapOn(pdf, width - 2 * margin, height - 2 * margin - 24)
+        table.drawOn(pdf, margin, height - margin - 12 - table_height)
+        pdf.showPage()
+        on_chunk(len(page))
+    pdf.save()
+
+
+def write_docx(filepath, rows, summary, charts, on_chunk):
+    from docx import Document
+    from docx.oxml import OxmlElement
+    from docx.shared import Inches
+    from docx.table import _Cell
+    doc = Document()
+    doc.add_heading('CV Analysis Report', 0)
+    doc.add_heading('Analysis Summary', level=2)
+    for line in summary_lines(summary):
+        doc.add_paragraph(line)
+    for chart in charts:
+        doc.add_picture(BytesIO(chart), width=Inches(6))
+    doc.add_heading('Detailed Results', level=2)
+
+    # table.add_row() and table.rows[i].cells rescan the whole table on every
+    # call, which is quadratic. Each chunk gets a table sized up front and its
+    # cells are filled by walking the row elements once.
+    for chunk in chunked(rows, DOCX_ROWS_PER_TABLE):
+        table = doc.add_table(rows=len(chunk) + 1, cols=len(TABLE_HEADER))
+        table.style = 'Table Grid'
+        values = [TABLE_HEADER] + [table_row(*row) for row in chunk]
+        for tr, row_values in zip(table._tbl.tr_lst, values):
+            for tc, value in zip(tr.tc_lst, row_values):
+                _Cell(tc, table).text = value
+        # Repeat the header row when the table spans several pages
+        table._tbl.tr_lst[0].get_or_add_trPr().append(OxmlElement('w:tblHeader'))
+        on_chunk(len(chunk))
+    doc.save(filepath)
+
+
+def export_rows(rows):
+    for rank, (candidate, score, skills) in enumerate(rows, start=1):
+        yield [rank, candidate, float(score), "; ".join(skills)]
+
+
+def write_csv(filepath, rows, summary, charts, on_chunk):
+    with open(filepath, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(EXPORT_HEADER)
+        for chunk in chunked(export_rows(rows), EXPORT_CHUNK_ROWS):
+            writer.writerows(chunk)
+            on_chunk(len(chunk))
+
+
+def write_xlsx(filepath, rows, summary, charts, on_chunk):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ImportError("Excel export needs openpyxl (pip install openpyxl)")
+    # Write-only workbooks stream rows to a temporary file instead of keeping cells in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Results")
+    sheet.append(EXPORT_HEADER)
+    for chunk in chunked(export_rows(rows), EXPORT_CHUNK_ROWS):
+        for row in chunk:
+            sheet.append(row)
+        on_chunk(len(chunk))
+    workbook.save(filepath)
+
+
+WRITERS = {".pdf": write_pdf, ".docx": write_docx, ".csv": write_csv, ".xlsx": write_xlsx}
+
+
+def write_report(filepath, rows, summary=None, charts=(), progress=None, should_stop=None):
+    # Writes rows in the format given by the file extension. summary is a dict
+    # like summarize() returns and charts are PNG images placed under it (PDF
+    # and DOCX only). progress(rows written) is called after every chunk and
+    # should_stop() is polled there too; a cancelled report is removed.
+    writer = WRITERS[report_format(filepath)]
+    done = 0
+
+    def on_chunk(count):
+        nonlocal done
+        done += count
+        if progress is not None:
+            progress(done)
+        if should_stop is not None and should_stop():
+            raise ReportCancelled()
+
+    try:
+        writer(filepath, rows, summary or {}, list(charts), on_chunk)
+    except ReportCancelled:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        raise
+    return done
+
 
 def generate_report(filepath, results):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-
-    # Title
-    pdf.set_font("Arial", size=16, style="B")
-    pdf.cell(200, 10, txt="CV Analysis Report", ln=True, align="C")
-    pdf.ln(10)
-
-    # Table Header
-    pdf.set_font("Arial", size=12)
-    pdf.cell(100, 10, txt="Candidate", border=1, align="C")
-    pdf.cell(40, 10, txt="Score", border=1, align="C")
-    pdf.ln()
-
-    # Table Rows
-    for candidate, score in results:
-        pdf.cell(100, 10, txt=candidate, border=1)
-        pdf.cell(40, 10, txt=str(round(score, 2)), border=1, align="C")
-        pdf.ln()
-
-    pdf.output(filepath)
+    # results: [(candidate, score)] or [(candidate, score, skills)], best first
+    rows = [(result[0], result[1], result[2] if len(result) > 2 else []) for result in results]
+    return write_report(filepath, rows, summarize(rows))
@@ -0,0 +1,110 @@
+import numpy as np
+
+# Scorers turn a batch of CV features into a (CVs x postings) matrix of
+# points. The match score is the sum over the configured scorers, capped at
+# 100. A batch is a dict with "vectors" (normalized embeddings, one row per
+# CV), "tokens" (sets of keyword tokens) and "skills" ({skill: count} dicts),
+# plus "texts" (the extracted CV texts) when a scorer sets needs_text.
+# Scorers are sent to the pool workers, so they must be picklable.
+
+
+class SemanticScorer:
+    # Cosine similarity of the CV and posting embeddings, 0-100 points
+    name = "semantic"
+
+    def __init__(self, weight=1.0):
+        self.weight = weight
+
+    def score(self, jobs, batch):
+        return jobs.similarities(batch["vectors"]) * self.weight
+
+
+class KeywordScorer:
+    # Share of the posting's words that appear in the CV, 0-50 points
+    name = "keywords"
+
+    def __init__(self, weight=1.0):
+        self.weight = weight
+
+    def score(self, jobs, batch):
+        return jobs.keyword_scores(batch["tokens"]) * self.weight
+
+
+class SkillScorer:
+    # Share of the taxonomy skills named in the posting that the CV
+    # mentions, 0-weight points
+    name = "skills"
+
+    def __init__(self, weight=50.0):
+        self.weight = weight
+
+    def score(self, jobs, batch):
+        return jobs.skill_coverage(batch["skills"]) * self.weight
+
+
+class TfidfScorer:
+    # TF-IDF cosine similarity of the CV and posting texts over hashed word
+    # unigrams and bigrams (backend/analyzer.py), 0-100 points. With
+    # index_path, a candidate index directory (backend/index.py), terms are
+    # weighted by their document frequencies over the indexed CVs; without
+    # one every term weighs the same.
+    name = "tfidf"
+    needs_text = True
+
+    def __init__(self, weight=1.0, index_path=None):
+        self.weight = weight
+        self.index_path = index_path
+        self._vectorizer = None
+        self._idf = None
+
+    def weights(self):
+        # Built on first use in each worker rather than sent with the scorer
+        if self._vectorizer is None:
+            from backend.analyzer import make_vectorizer, idf_weights
+            if self.index_path:
+                from backend.index import CandidateIndex
+                index = CandidateIndex(self.index_path, create=False)
+                self._vectorizer = index.vectorizer
+                self._idf = idf_weights(index.df, len(index.positions))
+            else:
+                self._vectorizer = make_vectorizer()
+                self._idf = np.ones(self._vectorizer.n_features)
+        return self._vectorizer, self._idf
+
+    def score(self, jobs, batch):
+        from backend.analyzer import tfidf_matrix
+        vectorizer, idf = self.weights()
+        cvs = tfidf_matrix(vectorizer, batch["texts"], idf)
+        postings = tfidf_matrix(vectorizer, [profile.requirements for profile in jobs.profiles], idf)
+        return (cvs @ postings.T).toarray() * 100 * self.weight
+
+
+SCORERS = {scorer.name: scorer for scorer in (SemanticScorer, KeywordScorer, SkillScorer, TfidfScorer)}
+DEFAULT_SCORERS = (SemanticScorer(), KeywordScorer())
+
+
+def parse_scorers(spec):
+    # "semantic,keywords:0.5,tfidf@pool/" -> scorer instances; ":weight"
+    # overrides the default weight and "@directory" gives tfidf a candidate
+    # index, which must already exist
+    scorers = []
+    for item in spec.split(","):
+        item, _, index_path = item.strip().partition("@")
+        name, _, weight = item.partition(":")
+        if name not in SCORERS:
+            raise ValueError(f"unknown scorer {name!r}; choose from {', '.join(SCORERS)}")
+        options = {"weight": float(weight)} if weight else {}
+        if index_path:
+            from backend.index import is_index, META_FILE
+            if name != TfidfScorer.name:
+                raise ValueError(f"scorer {name!r} does not use a candidate index")
+            if not is_index(index_path):
+                raise ValueError(f"{index_path} is not a candidate index (no {META_FILE})")
+            options["index_path"] = index_path
+        scorers.append(SCORERS[name](**options))
+    return scorers
+
+
+def combine_scores(scorers, jobs, batch):
+    total = sum(scorer.score(jobs, batch) for scorer in scorers)
+    return np.minimum(np.round(total, 2), 100)
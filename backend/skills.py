@@ -0,0 +1,59 @@
+import os
+import hashlib
+
+DEFAULT_SKILLS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skills.txt")
+
+
+def load_taxonomy(path=DEFAULT_SKILLS_PATH):
+    # Returns {canonical skill: [surface forms]}; the canonical name is always
+    # one of its own surface forms
+    taxonomy = {}
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            canonical, _, synonyms = line.partition(":")
+            canonical = canonical.strip().lower()
+            terms = taxonomy.setdefault(canonical, [canonical])
+            for synonym in synonyms.split(","):
+                synonym = synonym.strip().lower()
+                if synonym and synonym not in terms:
+                    terms.append(synonym)
+    return taxonomy
+
+
+class SkillIndex:
+    # Skill taxonomy compiled once into a PhraseMatcher, so extraction is a
+    # single pass over each Doc regardless of the number of skills or
+    # synonyms, and multi-word skills match as phrases.
+
+    def __init__(self, nlp, path=DEFAULT_SKILLS_PATH):
+        # spaCy is imported here so the GUI process can import this module cheaply
+        from spacy.matcher import PhraseMatcher
+        from spacy.util import filter_spans
+        self.filter_spans = filter_spans
+        with open(path, "rb") as file:
+            self.version = hashlib.sha1(file.read()).hexdigest()[:12]
+        self.taxonomy = load_taxonomy(path)
+        self.matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        for canonical, terms in self.taxonomy.items():
+            self.matcher.add(canonical, list(nlp.tokenizer.pipe(terms)))
+        self.strings = nlp.vocab.strings
+
+    def find(self, doc):
+        # {skill: [(start_char, end_char), ...]} in document order. Overlapping
+        # matches keep the longest span, so "sql server" is not also "sql".
+        spans = self.filter_spans(self.matcher(doc, as_spans=True))
+        positions = {}
+        for span in sorted(spans, key=lambda span: span.start):
+            positions.setdefault(span.label_, []).append((span.start_char, span.end_char))
+        return positions
+
+    def counts(self, doc):
+        return {skill: len(found) for skill, found in self.find(doc).items()}
+
+
+def ranked_skills(counts):
+    # Most frequently mentioned skills first, ties broken alphabetically
+    return [skill for skill, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
@@ -0,0 +1,230 @@
+import os
+import time
+import queue
+
+from backend.cache import FeatureCache, DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES
+from backend.file_handler import find_cv_files, get_extractor
+from backend.pipeline import iter_analysis, iter_matching
+from backend.prefilter import PruneStats
+
+DEFAULT_DEBOUNCE = 1.0
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+def file_signature(filepath):
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DirectoryWatcher:
+    # Reports CV files added, changed or removed under a set of directories,
+    # in batches. Change notifications come from watchdog (inotify on Linux)
+    # when it is installed; otherwise the directories are rescanned every
+    # poll_interval seconds. A batch is only released once no file has
+    # changed size or modification time for debounce seconds, so a burst of
+    # new CVs is scored together and a file still being copied is not read
+    # half written.
+
+    def __init__(self, directories, debounce=DEFAULT_DEBOUNCE, poll_interval=DEFAULT_POLL_INTERVAL, polling=False):
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        # path -> (mtime_ns, size) of the files already reported
+        self.known = {}
+        # path -> last seen signature (None once deleted) of files not reported yet
+        self.dirty = {}
+        self.last_change = 0.0
+        self.last_scan = 0.0
+        self.events = queue.SimpleQueue()
+        self.observer = None if polling else self._start_observer()
+
+    @property
+    def polling(self):
+        return self.observer is None
+
+    def _start_observer(self):
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            return None
+        events = self.events
+
+        class Handler(FileSystemEventHandler):
+            # Runs on watchdog's thread; the watcher drains the queue
+            def on_any_event(self, event):
+                events.put(event)
+
+        observer = Observer()
+        for directory in self.directories:
+            observer.schedule(Handler(), directory, recursive=True)
+        observer.start()
+        return observer
+
+    def stop(self):
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+
+    def scan(self):
+        return {os.path.abspath(filepath): file_signature(filepath) for filepath in find_cv_files(self.directories)}
+
+    def _mark(self, path, now):
+        if get_extractor(path) is None:
+            return
+        signature = file_signature(path)
+        if path in self.dirty:
+            if self.dirty[path] == signature:
+                return
+        elif signature == self.known.get(path):
+            # Opened or touched without changes, or deleted before it was ever reported
+            return
+        self.dirty[path] = signature
+        self.last_change = now
+
+    def _rescan(self, now):
+        current = self.scan()
+        for path in current.keys() | self.known.keys():
+            if current.get(path) != self.known.get(path):
+                self._mark(path, now)
+        self.last_scan = now
+
+    def _collect(self, timeout):
+        now = time.monotonic()
+        if self.observer is None:
+            if now - self.last_scan >= self.poll_interval:
+                self._rescan(now)
+            time.sleep(timeout)
+            return
+        try:
+            events = [self.events.get(timeout=timeout)]
+        except queue.Empty:
+            return
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        now = time.monotonic()
+        # A directory created, moved or deleted as a whole may hide many file
+        # events, so that case falls back to one rescan
+        if any(event.is_directory and event.event_type != "modified" for event in events):
+            self._rescan(now)
+        for event in events:
+            if not event.is_directory:
+                for path in (event.src_path, getattr(event, "dest_path", None)):
+                    if path:
+                        self._mark(os.path.abspath(os.fsdecode(path)), now)
+
+    def _settled(self, now):
+        # Re-checks pending files; any that still change restart the wait
+        for path, signature in self.dirty.items():
+            current = file_signature(path)
+            if current != signature:
+                self.dirty[path] = current
+                self.last_change = now
+        if not self.dirty or now - self.last_change < self.debounce:
+            return [], []
+        updated, deleted = [], []
+        for path, signature in self.dirty.items():
+            if signature is None:
+                if self.known.pop(path, None) is not None:
+                    deleted.append(path)
+            elif signature != self.known.get(path):
+                self.known[path] = signature
+                updated.append(path)
+        self.dirty = {}
+        return sorted(updated), sorted(deleted)
+
+    def changes(self, should_stop=None, timeout=0.2):
+        # Yields (updated paths, deleted paths) until should_stop() returns
+        # True; the first batch lists every CV already in the directories
+        should_stop = should_stop or (lambda: False)
+        try:
+            self.known = self.scan()
+            self.last_scan = time.monotonic()
+            yield sorted(self.known), []
+            while not should_stop():
+                self._collect(timeout)
+                updated, deleted = self._settled(time.monotonic())
+                if updated or deleted:
+                    yield updated, deleted
+        finally:
+            self.stop()
+
+
+def iter_watch(directories, job, debounce=DEFAULT_DEBOUNCE, poll_interval=DEFAULT_POLL_INTERVAL, polling=False,
+               should_stop=None, **options):
+    # Scores the CVs in directories and then every CV added or changed, until
+    # should_stop() returns True. Yields (event, path, value):
+    #   ("scored", path, result)   new or updated result, as engine.analyze()
+    #   ("duplicate", path, scored path)  near-duplicate of a CV of the same
+    #                              batch, which was scored instead (dedupe)
+    #   ("filtered", path, stage)  dropped for lacking must-have skills, by
+    #                              the prefilter stage named
+    #   ("removed", path, None)    file deleted, or changed and now without text
+    #   ("failed", path, error)    file could not be read
+    #   ("batch", None, (updated, deleted)) after each batch of changes
+    # A path that was scored before has no result after any but a "scored"
+    # event. Only changed files are analyzed; cached features of deleted and
+    # changed files are dropped. The duplicates skipped in favour of a CV are
+    # analyzed again, with the next batch, once that CV is deleted or
+    # changed. options are those of engine.analyze(), except duplicates and
+    # prune_stats, which are kept per batch.
+    should_stop = should_stop or (lambda: False)
+    analyze = iter_analysis if isinstance(job, str) else iter_matching
+    cache_path = options.get("cache_path", DEFAULT_CACHE_PATH)
+    cache = FeatureCache(cache_path, options.get("cache_max_bytes", DEFAULT_MAX_BYTES)) if cache_path else None
+    watcher = DirectoryWatcher(directories, debounce, poll_interval, polling)
+    seen = set()
+    # Scored path -> paths skipped as its near-duplicates, and the reverse
+    linked = {}
+    representatives = {}
+    try:
+        for updated, deleted in watcher.changes(should_stop):
+            changed = set(updated) | set(deleted)
+            requeued = set()
+            for filepath in changed:
+                representative = representatives.pop(filepath, None)
+                if representative is not None:
+                    linked[representative].discard(filepath)
+                for duplicate in linked.pop(filepath, ()):
+                    del representatives[duplicate]
+                    requeued.add(duplicate)
+            updated = list(updated) + sorted(requeued - changed)
+            for filepath in deleted:
+                seen.discard(filepath)
+                if cache is not None:
+                    cache.forget(filepath)
+                yield "removed", filepath, None
+            if cache is not None:
+                for filepath in updated:
+                    if filepath in seen:
+                        cache.forget(filepath)
+            duplicates = {}
+            prune_stats = PruneStats()
+            outcomes = analyze(updated, job, duplicates=duplicates, prune_stats=prune_stats, should_stop=should_stop,
+                               **options)
+            for filepath, result, error in outcomes:
+                seen.add(filepath)
+                if error is not None:
+                    yield "failed", filepath, error
+                elif result is not None:
+                    yield "scored", filepath, result
+                elif filepath in duplicates:
+                    representatives[filepath] = duplicates[filepath]
+                    linked.setdefault(duplicates[filepath], set()).add(filepath)
+                    yield "duplicate", filepath, duplicates[filepath]
+                elif filepath in prune_stats.pruned:
+                    yield "filtered", filepath, prune_stats.pruned[filepath]
+                else:
+                    yield "removed", filepath, None
+            yield "batch", None, (len(updated), len(deleted))
+    finally:
+        watcher.stop()
+        if cache is not None:
+            cache.close()
@@ -0,0 +1,230 @@
+import os
+import sys
+import json
+import random
+import hashlib
+import argparse
+from itertools import accumulate
+
+from backend.skills import load_taxonomy, DEFAULT_SKILLS_PATH
+
+# Bump when the generated documents change, so cached corpora are rebuilt
+CORPUS_VERSION = 2
+FORMATS = ("txt", "pdf", "docx")
+MANIFEST_FILE = "manifest.json"
+
+FIRST_NAMES = ["alex", "sam", "jordan", "taylor", "morgan", "casey", "riley", "jamie", "avery", "quinn",
+               "robin", "drew", "kai", "noa", "sasha", "eli", "mika", "remy", "ari", "lee"]
+LAST_NAMES = ["smith", "garcia", "chen", "novak", "okafor", "silva", "kowalski", "haddad", "ivanova", "tanaka",
+              "murphy", "rossi", "nguyen", "khan", "larsen", "mendes", "fischer", "costa", "park", "dubois"]
+ROLES = ["software engineer", "data scientist", "backend developer", "frontend developer", "devops engineer",
+         "machine learning engineer", "data engineer", "qa engineer", "site reliability engineer", "product analyst"]
+COMPANIES = ["acme", "globex", "initech", "umbrella", "hooli", "stark industries", "wayne enterprises", "tyrell",
+             "cyberdyne", "soylent"]
+# Filler vocabulary; none of these words is a skill in the default taxonomy
+FILLER = ("worked closely with the team to deliver features on time and improve reliability for customers "
+          "led the design of internal services reviewed code mentored junior colleagues and wrote documentation "
+          "owned releases coordinated with stakeholders reduced costs and improved performance across projects "
+          "built tooling migrated legacy systems handled incidents and supported product launches in several "
+          "markets while collaborating with design research and operations").split()
+
+
+def skill_weights(count, distribution):
+    # "zipf" makes a few skills very common and most rare, like real CVs;
+    # "uniform" gives every skill the same chance
+    if distribution == "uniform":
+        return [1.0] * count
+    return [1.0 / (rank + 1) for rank in range(count)]
+
+
+class CorpusGenerator:
+    # Deterministic synthetic CVs and job postings. Every document is derived
+    # from its own seeded random generator, so the same parameters always
+    # produce the same texts regardless of format or generation order.
+
+    def __init__(self, seed=0, min_words=300, max_words=900, min_skills=5, max_skills=15,
+                 distribution="zipf", skills_path=DEFAULT_SKILLS_PATH):
+        self.seed = seed
+        self.min_words = min_words
+        self.max_words = max_words
+        self.min_skills = min_skills
+        self.max_skills = max_skills
+        self.distribution = distribution
+        taxonomy = load_taxonomy(skills_path)
+        self.skills = sorted(taxonomy)
+        self.surface_forms = taxonomy
+        # Shuffle which skills are common so the ranking does not follow the taxonomy order
+        random.Random(seed).shuffle(self.skills)
+        self.cum_weights = list(accumulate(skill_weights(len(self.skills), distribution)))
+
+    def params(self):
+        return {
+            "version": CORPUS_VERSION,
+            "seed": self.seed,
+            "min_words": self.min_words,
+            "max_words": self.max_words,
+            "min_skills": self.min_skills,
+            "max_skills": self.max_skills,
+            "distribution": self.distribution,
+        }
+
+    def _random(self, kind, index):
+        return random.Random(f"{self.seed}:{kind}:{index}")
+
+    def _pick_skills(self, rng, count):
+        picked = []
+        while len(picked) < min(count, len(self.skills)):
+            skill = rng.choices(self.skills, cum_weights=self.cum_weights)[0]
+            if skill not in picked:
+                picked.append(skill)
+        return picked
+
+    def _sentence(self, rng, skills):
+        words = rng.sample(FILLER, rng.randint(8, 16))
+        if skills:
+            skill = rng.choice(skills)
+            words.insert(rng.randrange(len(words) + 1), f"using {rng.choice(self.surface_forms[skill])}")
+        return " ".join(words).capitalize() + "."
+
+    def cv(self, index):
+        # (name, [paragraphs], [canonical skills]) of the index-th CV
+        rng = self._random("cv", index)
+        name = f"{rng.choice(FIRST_NAMES).title()} {rng.choice(LAST_NAMES).title()}"
+        skills = self._pick_skills(rng, rng.randint(self.min_skills, self.max_skills))
+        target_words = rng.randint(self.min_words, self.max_words)
+        paragraphs = [name, f"{rng.choice(ROLES).title()}", "Skills: " + ", ".join(skills)]
+        words = sum(len(paragraph.split()) for paragraph in paragraphs)
+        while words < target_words:
+            years = rng.randint(1, 8)
+            header = f"{rng.choice(ROLES).title()} at {rng.choice(COMPANIES).title()} ({years} years)"
+            body = " ".join(self._sentence(rng, skills) for _ in range(rng.randint(3, 6)))
+            paragraphs.extend([header, body])
+            words += len(header.split()) + len(body.split())
+        return name, paragraphs, skills
+
+    def posting(self, index):
+        # (title, requirements text) of the index-th job posting
+        rng = self._random("job", index)
+        title = rng.choice(ROLES)
+        skills = self._pick_skills(rng, rng.randint(4, 10))
+        lines = [
+            f"We are hiring a {title} to join our team.",
+            "Requirements: " + ", ".join(skills) + ".",
+            " ".join(self._sentence(rng, skills) for _ in range(3)),
+        ]
+        return f"{title.replace(' ', '-')}-{index:04d}", "\n".join(lines)
+
+
+def write_txt(filepath, paragraphs):
+    with open(filepath, "w", encoding="utf-8") as file:
+        file.write("\n\n".join(paragraphs))
+
+
+def write_pdf(filepath, paragraphs):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfgen.canvas import Canvas
+    width, height = A4
+    margin = 50
+    # invariant leaves out the creation date, so the same text gives the same file
+    pdf = Canvas(filepath, pagesize=A4, invariant=1)
+    text = pdf.beginText(margin, height - margin)
+    text.setFont("Helvetica", 11)
+    for paragraph in paragraphs:
+        for line in simpleSplit(paragraph, "Helvetica", 11, width - 2 * margin) + [""]:
+            if text.getY() < margin:
+                pdf.drawText(text)
+                pdf.showPage()
+                text = pdf.beginText(margin, height - margin)
+                text.setFont("Helvetica", 11)
+            text.textLine(line)
+    pdf.drawText(text)
+    pdf.save()
+
+
+def write_docx(filepath, paragraphs):
+    import docx
+    doc = docx.Document()
+    for paragraph in paragraphs:
+        doc.add_paragraph(paragraph)
+    doc.save(filepath)
+
+
+WRITERS = {"txt": write_txt, "pdf": write_pdf, "docx": write_docx}
+
+
+def generate_corpus(directory, count, formats=FORMATS, postings=5, generator=None):
+    # Writes count CVs, cycling through formats, plus job postings under
+    # directory/jobs, and a manifest recording the parameters and a digest of
+    # every text. An existing corpus with the same manifest is reused.
+    generator = generator or CorpusGenerator()
+    params = dict(generator.params(), count=count, formats=list(formats), postings=postings)
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest["params"] == params:
+            return manifest
+    for subdirectory in ("cvs", "jobs"):
+        os.makedirs(os.path.join(directory, subdirectory), exist_ok=True)
+        # Drop documents left over from a corpus generated with other parameters
+        for filename in os.listdir(os.path.join(directory, subdirectory)):
+            os.remove(os.path.join(directory, subdirectory, filename))
+
+    digest = hashlib.sha256()
+    cvs = []
+    for i in range(count):
+        name, paragraphs, skills = generator.cv(i)
+        fmt = formats[i % len(formats)]
+        filepath = os.path.join(directory, "cvs", f"cv-{i:06d}.{fmt}")
+        WRITERS[fmt](filepath, paragraphs)
+        digest.update("\n\n".join(paragraphs).encode("utf-8"))
+        cvs.append({"path": os.path.relpath(filepath, directory), "name": name, "skills": skills})
+    jobs = []
+    for i in range(postings):
+        title, requirements = generator.posting(i)
+        filepath = os.path.join(directory, "jobs", f"{title}.txt")
+        write_txt(filepath, [requirements])
+        digest.update(requirements.encode("utf-8"))
+        jobs.append({"path": os.path.relpath(filepath, directory), "title": title})
+
+    manifest = {"params": params, "digest": digest.hexdigest(), "cvs": cvs, "jobs": jobs}
+    with open(manifest_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=1)
+    return manifest
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.corpus",
+                                     description="Generate a deterministic synthetic CV corpus.")
+    parser.add_argument("directory", help="output directory (cvs/, jobs/ and manifest.json)")
+    parser.add_argument("-n", "--count", type=int, default=100, help="number of CVs")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS), help="CV file formats")
+    parser.add_argument("--postings", type=int, default=5, help="number of job postings")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-words", type=int, default=300)
+    parser.add_argument("--max-words", type=int, default=900)
+    parser.add_argument("--min-skills", type=int, default=5)
+    parser.add_argument("--max-skills", type=int, default=15)
+    parser.add_argument("--distribution", choices=["zipf", "uniform"], default="zipf",
+                        help="how often each skill appears across CVs")
+    parser.add_argument("--skills", default=DEFAULT_SKILLS_PATH, help="skill taxonomy to draw skills from")
+    return parser.parse_args(argv)
+
+
+def generator_from_args(args):
+    return CorpusGenerator(seed=args.seed, min_words=args.min_words, max_words=args.max_words,
+                           min_skills=args.min_skills, max_skills=args.max_skills,
+                           distribution=args.distribution, skills_path=args.skills)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    manifest = generate_corpus(args.directory, args.count, args.formats, args.postings, generator_from_args(args))
+    print(f"{len(manifest['cvs'])} CVs and {len(manifest['jobs'])} postings in {args.directory} "
+          f"(digest {manifest['digest'][:12]})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
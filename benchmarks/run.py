@@ -0,0 +1,225 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+
+from benchmarks.corpus import generate_corpus, CorpusGenerator, FORMATS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_SCHEMA = 1
+ENGINES = ("pipeline", "matching", "tfidf")
+DEFAULT_SIZES = [10, 1000, 10000]
+DEFAULT_CORPUS_ROOT = os.path.join(os.path.expanduser("~"), ".cache", "cv-analyzer", "benchmarks")
+
+
+def children_peak_rss():
+    # Peak RSS of the largest finished child process (pool workers) in bytes
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def stage_latencies(events):
+    # {stage: {"count", "total", "mean", "p50", "p95", "max"}} in seconds
+    walls = {}
+    for event in events:
+        walls.setdefault(event["stage"], []).append(event["wall"])
+    return {
+        stage: {
+            "count": len(values),
+            "total": float(np.sum(values)),
+            "mean": float(np.mean(values)),
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+            "max": float(np.max(values)),
+        }
+        for stage, values in walls.items()
+    }
+
+
+def run_engine(engine, files, postings, workers, cache_path, profiler):
+    # Returns (CVs scored, CVs failed)
+    if engine == "tfidf":
+        # The TF-IDF scoring used by the candidate index, on freshly extracted text
+        from backend.analyzer import score_texts
+        from backend.cache import FeatureCache
+        from backend.file_handler import extract_text_from_files
+        cache = FeatureCache(cache_path) if cache_path else None
+        texts = extract_text_from_files(files, cache=cache, profiler=profiler)
+        with profiler.stage("score", docs=len(texts)):
+            return len(score_texts(postings[0], texts)), 0
+    from backend.engine import analyze
+    job = postings if engine == "matching" else postings[0]
+    outcomes = analyze(files, job, max_workers=workers, cache_path=cache_path, profiler=profiler)
+    scored = failed = 0
+    for _, result, error in outcomes:
+        scored += result is not None
+        failed += error is not None
+    return scored, failed
+
+
+def measure(engine, corpus_dir, workers=None, warm=False):
+    # One measurement in the current process; run() starts a fresh
+    # interpreter for each so peak RSS is not inherited from earlier runs
+    from backend.profiling import Profiler, peak_rss
+    with open(os.path.join(corpus_dir, "manifest.json"), "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+    files = [os.path.join(corpus_dir, cv["path"]) for cv in manifest["cvs"]]
+    postings = []
+    for job in manifest["jobs"]:
+        with open(os.path.join(corpus_dir, job["path"]), "r", encoding="utf-8") as file:
+            postings.append(file.read())
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = os.path.join(cache_dir, "features.sqlite3") if warm else None
+        if warm:
+            # Fill the feature cache first; only the second, cached run is recorded
+            run_engine(engine, files, postings, workers, cache_path, Profiler())
+        profiler = Profiler()
+        started = time.perf_counter()
+        scored, failed = run_engine(engine, files, postings, workers, cache_path, profiler)
+        seconds = time.perf_counter() - started
+
+    return {
+        "engine": engine,
+        "size": len(files),
+        "warm": warm,
+        "postings": len(postings) if engine == "matching" else 1,
+        "scored": scored,
+        "failed": failed,
+        "seconds": seconds,
+        "throughput": len(files) / seconds if seconds > 0 else None,
+        "stages": stage_latencies(profiler.events),
+        "peak_rss": peak_rss(),
+        "peak_rss_children": children_peak_rss(),
+    }
+
+
+def run_measurement(engine, corpus_dir, workers, warm):
+    command = [sys.executable, "-m", "benchmarks.run", "--measure", engine, corpus_dir]
+    if workers:
+        command += ["--workers", str(workers)]
+    if warm:
+        command.append("--warm")
+    output = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def compare(results, baseline):
+    # Prints throughput and per-stage changes against a previous results file;
+    # returns the largest throughput drop in percent
+    previous = {(r["engine"], r["size"], r["warm"]): r for r in baseline["results"]}
+    worst = 0.0
+    for result in results["results"]:
+        old = previous.get((result["engine"], result["size"], result["warm"]))
+        if old is None or not old["throughput"] or not result["throughput"]:
+            continue
+        change = (result["throughput"] / old["throughput"] - 1) * 100
+        worst = min(worst, change)
+        label = f"{result['engine']} n={result['size']}{' warm' if result['warm'] else ''}"
+        print(f"{label}: {old['throughput']:.1f} -> {result['throughput']:.1f} CVs/s ({change:+.1f}%)",
+              file=sys.stderr)
+        for stage, latency in result["stages"].items():
+            if stage in old["stages"] and old["stages"][stage]["p50"] > 0:
+                stage_change = (latency["p50"] / old["stages"][stage]["p50"] - 1) * 100
+                print(f"  {stage}: p50 {old['stages'][stage]['p50'] * 1000:.2f} -> {latency['p50'] * 1000:.2f} ms "
+                      f"({stage_change:+.1f}%)", file=sys.stderr)
+    return -worst
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run",
+                                     description="Benchmark CV screening on synthetic corpora.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="corpus sizes to measure")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=["pipeline", "tfidf"],
+                        help="pipeline: the backend engine; matching: the engine against every posting; "
+                             "tfidf: the TF-IDF scoring behind the candidate index")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS), help="CV file formats")
+    parser.add_argument("--postings", type=int, default=5, help="job postings per corpus (used by matching)")
+    parser.add_argument("--seed", type=int, default=0, help="corpus generator seed")
+    parser.add_argument("--distribution", choices=["zipf", "uniform"], default="zipf")
+    parser.add_argument("--corpus-root", default=DEFAULT_CORPUS_ROOT,
+                        help="where generated corpora are kept and reused between runs")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes for the pipeline")
+    parser.add_argument("--warm", action="store_true", help="also measure runs served from the feature cache")
+    parser.add_argument("-o", "--output", default=None, help="write the results as JSON to this file")
+    parser.add_argument("--compare", default=None, help="results file of an earlier run to compare against")
+    parser.add_argument("--fail-on-regression", type=float, default=None, metavar="PERCENT",
+                        help="with --compare, exit with status 1 if any throughput dropped by more than PERCENT")
+    parser.add_argument("--measure", nargs=2, metavar=("ENGINE", "CORPUS"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.measure:
+        engine, corpus_dir = args.measure
+        print(json.dumps(measure(engine, corpus_dir, args.workers, args.warm)))
+        return 0
+
+    generator = CorpusGenerator(seed=args.seed, distribution=args.distribution)
+    results = {
+        "schema": RESULTS_SCHEMA,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment(),
+        "params": {"workers": args.workers, "formats": args.formats, "postings": args.postings},
+        "corpora": {},
+        "results": [],
+    }
+    for size in args.sizes:
+        corpus_dir = os.path.join(args.corpus_root, f"{args.distribution}-seed{args.seed}-n{size}-{'-'.join(args.formats)}")
+        print(f"preparing {size} CVs in {corpus_dir}", file=sys.stderr)
+        manifest = generate_corpus(corpus_dir, size, args.formats, args.postings, generator)
+        results["corpora"][str(size)] = {"params": manifest["params"], "digest": manifest["digest"]}
+        for engine in args.engines:
+            for warm in ([False, True] if args.warm else [False]):
+                result = run_measurement(engine, corpus_dir, args.workers, warm)
+                results["results"].append(result)
+                print(f"{engine} n={size}{' warm' if warm else ''}: {result['throughput']:.1f} CVs/s, "
+                      f"{result['seconds']:.2f}s", file=sys.stderr)
+
+    text = json.dumps(results, indent=1)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            drop = compare(results, json.load(file))
+        if args.fail_on_regression is not None and drop > args.fail_on_regression:
+            print(f"regression: throughput dropped by {drop:.1f}%", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that must stay off the path to the first window
+HEAVY_MODULES = ["spacy", "pandas", "matplotlib", "reportlab", "docx", "PyPDF2", "sklearn", "torch"]
+
+# Runs in a fresh interpreter so nothing is already imported
+PROBE = """
+import sys, time, json
+started = time.perf_counter()
+from PyQt5.QtWidgets import QApplication, QMessageBox
+app = QApplication(sys.argv)
+# A modal dialog, e.g. the one shown when the model fails to load, would
+# block the event loop below forever; record its text instead
+dialogs = []
+def record_dialog(parent, title, text, *args, **kwargs):
+    dialogs.append(f"{title}: {text}")
+    return QMessageBox.Ok
+QMessageBox.critical = QMessageBox.warning = QMessageBox.information = QMessageBox.question = record_dialog
+import main
+imported = time.perf_counter()
+window = main.MainWindow()
+window.show()
+# The model loader starts with the event loop, so this is what the window itself imported
+loaded_early = sorted(name for name in HEAVY_MODULES if name in sys.modules)
+app.processEvents()
+shown = time.perf_counter()
+while not window.model_ready and not window.model_loader.isFinished() and time.perf_counter() - shown < TIMEOUT:
+    app.processEvents()
+    time.sleep(0.01)
+app.processEvents()
+print(json.dumps({
+    "import": imported - started,
+    "window": shown - started,
+    "model_ready": time.perf_counter() - started if window.model_ready else None,
+    "heavy_modules_before_window": loaded_early,
+    "dialogs": dialogs,
+}))
+window.close()
+"""
+
+
+def run_probe(timeout):
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    code = f"HEAVY_MODULES = {HEAVY_MODULES!r}\nTIMEOUT = {timeout!r}\n" + PROBE
+    output = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env, capture_output=True,
+                            text=True, check=True, timeout=timeout + 60).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup",
+                                     description="Measure how long the GUI takes to appear and to become ready.")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="fresh interpreter launches to take the median of")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds to wait for the model to load")
+    parser.add_argument("--max-window-seconds", type=float, default=None,
+                        help="exit with status 1 when the median time to the first window exceeds this")
+    parser.add_argument("-o", "--output", default=None, help="also write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    runs = [run_probe(args.timeout) for _ in range(args.runs)]
+    ready = [run["model_ready"] for run in runs if run["model_ready"] is not None]
+    results = {
+        "benchmark": "startup",
+        "runs": runs,
+        "median": {
+            "import": statistics.median(run["import"] for run in runs),
+            "window": statistics.median(run["window"] for run in runs),
+            "model_ready": statistics.median(ready) if ready else None,
+        },
+        "heavy_modules_before_window": sorted({name for run in runs for name in run["heavy_modules_before_window"]}),
+    }
+    print(json.dumps(results, indent=1))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=1)
+
+    failed = False
+    if results["heavy_modules_before_window"]:
+        print(f"regression: imported before the window appeared: {', '.join(results['heavy_modules_before_window'])}",
+              file=sys.stderr)
+        failed = True
+    if args.max_window_seconds is not None and results["median"]["window"] > args.max_window_seconds:
+        print(f"regression: window took {results['median']['window']:.2f}s (limit {args.max_window_seconds}s)",
+              file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
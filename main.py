@@ -1,24 +1,41 @@
 import sys
-import spacy
-import pandas as pd
-import matplotlib.pyplot as plt
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QFileDialog, QMessageBox, QTableWidget, QTableWidgetItem,
-    QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QTextEdit, QListWidget, QLabel, QTabWidget
+    QApplication, QMainWindow, QFileDialog, QMessageBox, QTableView, QAbstractItemView,
+    QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QTextEdit, QListWidget, QLabel, QTabWidget,
+    QProgressBar, QSpinBox, QComboBox
 )
-from PyQt5.QtGui import QPalette, QColor, QFont, QLinearGradient, QGradient
-from PyQt5.QtCore import Qt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-import docx
-import PyPDF2
-from docx import Document
-import uuid
-import re
+from PyQt5.QtGui import QPalette, QColor, QFont
+from PyQt5.QtCore import Qt, QTimer
+import os
 from io import BytesIO
+from ui.workers import AnalysisWorker, ModelLoader, ReportWorker, FolderWatchWorker
+from ui.charts import CandidateChartPanel, make_canvas
+from ui.result_model import ResultTableModel, RankedResults
+from backend.matching import read_job_postings
+from backend.engine import parse_scorers, supported_extensions, SkillFilter
+from backend.skills import load_taxonomy, DEFAULT_SKILLS_PATH
+from backend.report_generator import summarize
+from backend.profiling import Profiler
+
+# Set to a file path to dump the timings of every run (Chrome trace format for *.trace.json)
+PROFILE_PATH = os.environ.get("CV_ANALYZER_PROFILE")
+# spaCy model used for analysis, and optionally a local sentence-transformers model directory for embeddings
+SPACY_MODEL = os.environ.get("CV_ANALYZER_MODEL", "en_core_web_sm")
+EMBEDDING_MODEL = os.environ.get("CV_ANALYZER_EMBEDDING_MODEL")
+# Scorers added up into the match score, e.g. "semantic,keywords:0.5,skills" (see backend/scorers.py)
+SCORERS = os.environ.get("CV_ANALYZER_SCORERS", "semantic,keywords")
+# Skill taxonomy file, "canonical: synonym, ..." per line (see backend/data/skills.txt)
+SKILLS_PATH = os.environ.get("CV_ANALYZER_SKILLS", DEFAULT_SKILLS_PATH)
+# Score only one CV of each group of near-duplicates; set to 0 to score every file
+DEDUPE = os.environ.get("CV_ANALYZER_DEDUPE", "1") != "0"
+# The summary chart shows the best candidates and the most common skills,
+# with the remaining skills in one "Others" slice
+SUMMARY_CANDIDATES = 20
+SUMMARY_SKILLS = 8
+# While watching a folder the summary is redrawn at most this often
+WATCH_REDRAW_MS = 3000
+# Results streamed in during an analysis are added to the table this often
+RESULT_FLUSH_MS = 100
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -26,22 +43,42 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("CV Analyzer Pro")
         self.setGeometry(100, 100, 1200, 800)
 
-        # Load spaCy model
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load spaCy model: {str(e)}", QMessageBox.Ok)
-            sys.exit(1)
-
         # Initialize data
         self.files = []
-        self.results = []
-        self.skills_data = {}
+        # [(title, requirements)]; when set, CVs are matched against every posting instead of the typed requirements
+        self.job_postings = []
+        self.result_model = ResultTableModel()
+        self.results = RankedResults(self.result_model)
+        self.failed_files = []
+        self.worker = None
+        self.report_worker = None
+        self.watch_worker = None
+        self.redraw_timer = QTimer(self)
+        self.redraw_timer.setSingleShot(True)
+        self.redraw_timer.setInterval(WATCH_REDRAW_MS)
+        self.redraw_timer.timeout.connect(self.redraw_watched_graphs)
+        self.pending_results = []
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(RESULT_FLUSH_MS)
+        self.flush_timer.timeout.connect(self.flush_results)
+        self.duplicate_count = 0
+        self.profiler = Profiler()
         self.candidate_colors = ['#0E6CFF', '#28A745', '#6F42C1', '#FF5733', '#FFC107', '#17A2B8', '#DC3545', '#6610F2']
 
         # Setup UI
         self.setup_ui()
 
+        # Load the spaCy model in the background once the event loop runs, so
+        # the window is shown first; Analyze stays disabled until it is ready
+        self.model_ready = False
+        self.analyze_button.setEnabled(False)
+        self.analyze_button.setText("Loading language model...")
+        self.model_loader = ModelLoader(SPACY_MODEL, parent=self)
+        self.model_loader.loaded.connect(self.on_model_loaded)
+        self.model_loader.failed.connect(self.on_model_failed)
+        QTimer.singleShot(0, self.model_loader.start)
+
     def setup_ui(self):
         # Set modern dark theme with vibrant accents
         palette = QPalette()
@@ -88,6 +125,46 @@ class MainWindow(QMainWindow):
         self.requirements_input.setFixedHeight(150)
         left_layout.addWidget(self.requirements_input)
 
+        # Job postings for matching CVs against several roles in one run
+        postings_layout = QHBoxLayout()
+        self.load_postings_button = QPushButton("Load Job Postings")
+        self.load_postings_button.setFont(QFont("Segoe UI", 10, QFont.Bold))
+        self.load_postings_button.setStyleSheet("""
+            QPushButton {
+                background-color: #17A2B8;
+                color: white;
+                border-radius: 5px;
+                padding: 8px;
+            }
+            QPushButton:hover {
+                background-color: #3FC5DA;
+            }
+        """)
+        self.load_postings_button.clicked.connect(self.load_job_postings)
+        postings_layout.addWidget(self.load_postings_button)
+        self.clear_postings_button = QPushButton("Clear")
+        self.clear_postings_button.setFont(QFont("Segoe UI", 10, QFont.Bold))
+        self.clear_postings_button.setStyleSheet("""
+            QPushButton {
+                background-color: #4A4A5E;
+                color: white;
+                border-radius: 5px;
+                padding: 8px;
+            }
+            QPushButton:hover {
+                background-color: #6A6A7E;
+            }
+        """)
+        self.clear_postings_button.clicked.connect(lambda: self.set_job_postings([]))
+        postings_layout.addWidget(self.clear_postings_button)
+        left_layout.addLayout(postings_layout)
+
+        self.postings_label = QLabel("")
+        self.postings_label.setFont(QFont("Segoe UI", 10))
+        self.postings_label.setStyleSheet("color: #9FA6B2;")
+        self.postings_label.setWordWrap(True)
+        left_layout.addWidget(self.postings_label)
+
         # Upload button
         self.upload_button = QPushButton("Upload CVs")
         self.upload_button.setFont(QFont("Segoe UI", 12, QFont.Bold))
@@ -128,6 +205,76 @@ class MainWindow(QMainWindow):
         self.analyze_button.clicked.connect(self.analyze_cvs)
         left_layout.addWidget(self.analyze_button)
 
+        # Watch button; keeps ranking CVs as they arrive in a folder
+        self.watch_button = QPushButton("Watch Folder")
+        self.watch_button.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        self.watch_button.setStyleSheet("""
+            QPushButton {
+                background-color: #17A2B8;
+                color: white;
+                border-radius: 5px;
+                padding: 12px;
+            }
+            QPushButton:hover {
+                background-color: #3FC5DA;
+            }
+        """)
+        self.watch_button.setEnabled(False)
+        self.watch_button.clicked.connect(self.toggle_watch)
+        left_layout.addWidget(self.watch_button)
+
+        # Cancel button (enabled while an analysis is running)
+        self.cancel_button = QPushButton("Cancel Analysis")
+        self.cancel_button.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        self.cancel_button.setStyleSheet("""
+            QPushButton {
+                background-color: #DC3545;
+                color: white;
+                border-radius: 5px;
+                padding: 12px;
+            }
+            QPushButton:hover {
+                background-color: #F0606D;
+            }
+            QPushButton:disabled {
+                background-color: #4A4A5E;
+            }
+        """)
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_analysis)
+        left_layout.addWidget(self.cancel_button)
+
+        # Analysis progress and throughput
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFont(QFont("Segoe UI", 10))
+        self.progress_bar.setStyleSheet("""
+            QProgressBar {
+                background: #2A2A3E;
+                color: #F5F6FA;
+                border: 1px solid #0E6CFF;
+                border-radius: 5px;
+                text-align: center;
+            }
+            QProgressBar::chunk {
+                background-color: #00D4FF;
+                border-radius: 5px;
+            }
+        """)
+        self.progress_bar.setValue(0)
+        left_layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("")
+        self.status_label.setFont(QFont("Segoe UI", 10))
+        self.status_label.setStyleSheet("color: #F5F6FA;")
+        left_layout.addWidget(self.status_label)
+
+        # Per-stage timings of the last run
+        self.timing_label = QLabel("")
+        self.timing_label.setFont(QFont("Segoe UI", 9))
+        self.timing_label.setStyleSheet("color: #9FA6B2;")
+        self.timing_label.setWordWrap(True)
+        left_layout.addWidget(self.timing_label)
+
         # Generate report button
         self.generate_report_button = QPushButton("Generate Report")
         self.generate_report_button.setFont(QFont("Segoe UI", 12, QFont.Bold))
@@ -154,13 +301,48 @@ class MainWindow(QMainWindow):
         right_panel.setLayout(right_layout)
         right_panel.setStyleSheet("background: #16213E; border-radius: 10px; padding: 15px;")
 
+        # Result filters
+        filter_layout = QHBoxLayout()
+        filter_style = "background: #2A2A3E; color: #F5F6FA; border: 1px solid #0E6CFF; border-radius: 5px; padding: 3px;"
+        self.job_label = QLabel("Rank for")
+        self.job_label.setStyleSheet("color: #F5F6FA;")
+        filter_layout.addWidget(self.job_label)
+        self.job_input = QComboBox()
+        self.job_input.setMinimumWidth(200)
+        self.job_input.setStyleSheet(filter_style)
+        self.job_input.currentIndexChanged.connect(self.on_job_selected)
+        filter_layout.addWidget(self.job_input)
+        self.job_label.hide()
+        self.job_input.hide()
+        min_score_label = QLabel("Min score")
+        min_score_label.setStyleSheet("color: #F5F6FA;")
+        filter_layout.addWidget(min_score_label)
+        self.min_score_input = QSpinBox()
+        self.min_score_input.setRange(0, 100)
+        self.min_score_input.setSuffix("%")
+        self.min_score_input.setStyleSheet(filter_style)
+        self.min_score_input.valueChanged.connect(self.apply_result_filter)
+        filter_layout.addWidget(self.min_score_input)
+        skill_label = QLabel("Required skill")
+        skill_label.setStyleSheet("color: #F5F6FA;")
+        filter_layout.addWidget(skill_label)
+        self.skill_filter_input = QComboBox()
+        self.skill_filter_input.setMinimumWidth(200)
+        self.skill_filter_input.setStyleSheet(filter_style)
+        self.skill_filter_input.currentIndexChanged.connect(self.apply_result_filter)
+        filter_layout.addWidget(self.skill_filter_input)
+        filter_layout.addStretch()
+        right_layout.addLayout(filter_layout)
+
         # Results table
-        self.result_table = QTableWidget()
-        self.result_table.setColumnCount(4)
-        self.result_table.setHorizontalHeaderLabels(["Candidate", "Match Score", "Top Skills", "Best Fit"])
+        self.result_table = QTableView()
+        self.result_table.setModel(self.result_model)
+        self.result_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.result_table.horizontalHeader().setSortIndicator(1, Qt.DescendingOrder)
+        self.result_table.setSortingEnabled(True)
         self.result_table.setFont(QFont("Segoe UI", 12))
         self.result_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background: #2A2A3E;
                 color: #F5F6FA;
                 gridline-color: #0E6CFF;
@@ -200,138 +382,409 @@ class MainWindow(QMainWindow):
         """)
         right_layout.addWidget(self.tab_widget)
 
-        # Summary graph tab
-        self.summary_figure = plt.Figure(figsize=(6, 4), facecolor="#16213E")
-        self.summary_canvas = FigureCanvas(self.summary_figure)
-        self.summary_canvas.setStyleSheet("background: #16213E;")
+        # Summary graph tab; the canvas is created with the first chart
+        self.summary_canvas = None
+        self.summary_figure = None
+        # PNG of the summary charts for reports, rendered on first use
+        self.summary_png = None
+        self.summary_placeholder = QLabel("Analyze CVs to see the summary charts")
+        self.summary_placeholder.setAlignment(Qt.AlignCenter)
+        self.summary_placeholder.setStyleSheet("color: #F5F6FA;")
         summary_tab = QWidget()
-        summary_layout = QVBoxLayout()
-        summary_layout.addWidget(self.summary_canvas)
-        summary_tab.setLayout(summary_layout)
+        self.summary_layout = QVBoxLayout()
+        self.summary_layout.addWidget(self.summary_placeholder)
+        summary_tab.setLayout(self.summary_layout)
         self.tab_widget.addTab(summary_tab, "Summary")
 
-        main_layout.addWidget(right_panel)
+        # Candidate charts, rendered on demand
+        self.candidate_panel = CandidateChartPanel(self.candidate_colors)
+        self.tab_widget.addTab(self.candidate_panel, "Candidates")
+        self.result_table.selectionModel().currentRowChanged.connect(self.on_result_selected)
 
-    def extract_text_from_file(self, filepath):
-        try:
-            if filepath.endswith('.pdf'):
-                with open(filepath, 'rb') as file:
-                    reader = PyPDF2.PdfReader(file)
-                    text = ""
-                    for page in reader.pages:
-                        text += page.extract_text() or ""
-            elif filepath.endswith('.docx'):
-                doc = Document(filepath)
-                text = "\n".join([para.text for para in doc.paragraphs])
-            elif filepath.endswith('.txt'):
-                with open(filepath, 'r', encoding='utf-8') as file:
-                    text = file.read()
-            else:
-                return ""
-            return text
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to read {filepath}: {str(e)}", QMessageBox.Ok)
-            return ""
-
-    def extract_skills(self, text):
-        doc = self.nlp(text.lower())
-        skills = []
-        skill_keywords = [
-            "python", "java", "javascript", "sql", "machine learning", "data analysis",
-            "project management", "communication", "leadership", "cloud computing",
-            "aws", "azure", "docker", "kubernetes", "react", "angular", "node.js",
-            "typescript", "devops", "agile", "scrum", "database management"
-        ]
-        for token in doc:
-            if token.text in skill_keywords:
-                skills.append(token.text)
-        for chunk in doc.noun_chunks:
-            if chunk.text in skill_keywords:
-                skills.append(chunk.text)
-        return list(set(skills))
-
-    def calculate_match_score(self, cv_text, job_requirements):
-        job_doc = self.nlp(job_requirements.lower())
-        cv_doc = self.nlp(cv_text.lower())
-        similarity = job_doc.similarity(cv_doc) * 100
-        keyword_matches = sum(1 for req in job_requirements.lower().split() if req in cv_text.lower())
-        keyword_score = (keyword_matches / max(len(job_requirements.split()), 1)) * 50
-        return min(round(similarity + keyword_score, 2), 100)
+        main_layout.addWidget(right_panel)
 
     def upload_files(self):
         try:
-            files, _ = QFileDialog.getOpenFileNames(self, "Upload CVs", "", "CV Files (*.pdf *.docx *.txt)")
+            files, _ = QFileDialog.getOpenFileNames(self, "Upload CVs", "", f"CV Files ({' '.join('*' + extension for extension in supported_extensions())})")
             if files:
                 self.files = files
                 self.file_list.clear()
                 self.file_list.addItems([f.split('/')[-1] for f in files])
                 QMessageBox.information(self, "Success", f"{len(files)} CVs uploaded!", QMessageBox.Ok)
-                self.result_table.setRowCount(0)
-                self.tab_widget.clear()
-                self.tab_widget.addTab(QWidget(), "Summary")  # Placeholder until analysis
-                self.summary_figure.clear()
-                self.summary_canvas.draw()
+                self.result_model.clear()
+                self.results = RankedResults(self.result_model)
+                self.update_job_selector()
+                self.update_skill_filter()
+                self.candidate_panel.set_results([])
+                if self.summary_canvas is not None:
+                    self.summary_canvas.figure.clear()
+                    self.summary_canvas.draw()
+                self.summary_png = None
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to upload files: {str(e)}", QMessageBox.Ok)
 
     def analyze_cvs(self):
         try:
+            if self.worker is not None and self.worker.isRunning():
+                return
+
             if not self.files:
                 QMessageBox.warning(self, "No Files", "Please upload CVs before analyzing.", QMessageBox.Ok)
                 return
 
+            titles, postings = self.job_inputs()
+            if not postings:
+                return
+
+            self.result_model.clear(titles)
+            self.results = RankedResults(self.result_model)
+            self.update_job_selector()
+            self.failed_files = []
+            self.progress_bar.setRange(0, len(self.files))
+            self.progress_bar.setValue(0)
+            self.status_label.setText(f"Analyzing {len(self.files)} CVs...")
+            self.timing_label.setText("")
+            self.profiler.clear()
+            self.set_analysis_running(True)
+
+            self.worker = AnalysisWorker(self.files, postings, model_name=SPACY_MODEL, skills_path=SKILLS_PATH,
+                                         embedding_model=EMBEDDING_MODEL, scorers=parse_scorers(SCORERS),
+                                         dedupe=DEDUPE, profiler=self.profiler, parent=self)
+            self.worker.result_ready.connect(self.on_result_ready)
+            self.worker.duplicate_found.connect(self.on_duplicate_found)
+            self.duplicate_count = 0
+            self.worker.file_failed.connect(self.on_file_failed)
+            self.worker.progress.connect(self.on_analysis_progress)
+            self.worker.run_finished.connect(self.on_analysis_finished)
+            self.worker.start()
+        except Exception as e:
+            self.set_analysis_running(False)
+            QMessageBox.critical(self, "Error", f"Analysis failed: {str(e)}", QMessageBox.Ok)
+
+    def job_inputs(self):
+        # (posting titles or None, [posting texts]); no texts after warning about missing requirements
+        if self.job_postings:
+            titles, postings = [title for title, _ in self.job_postings], [text for _, text in self.job_postings]
+        else:
             job_requirements = self.requirements_input.toPlainText()
             if not job_requirements:
                 QMessageBox.warning(self, "No Requirements", "Please provide job requirements.", QMessageBox.Ok)
+                return None, []
+            titles, postings = None, [job_requirements]
+        skill_filter = SkillFilter(postings, load_taxonomy(SKILLS_PATH))
+        if skill_filter.unknown:
+            QMessageBox.warning(self, "Skill Requirements", skill_filter.format_unknown().capitalize(), QMessageBox.Ok)
+        return titles, postings
+
+    def toggle_watch(self):
+        if self.watch_worker is not None:
+            self.watch_worker.cancel()
+            self.watch_button.setEnabled(False)
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Stopping...")
+            return
+        try:
+            titles, postings = self.job_inputs()
+            if not postings:
+                return
+            directory = QFileDialog.getExistingDirectory(self, "Watch Folder")
+            if not directory:
                 return
 
-            self.results = []
-            self.skills_data = {}
-
-            for file in self.files:
-                text = self.extract_text_from_file(file)
-                if not text:
-                    continue
-                skills = self.extract_skills(text)
-                score = self.calculate_match_score(text, job_requirements)
-                self.skills_data[file.split('/')[-1]] = skills
-                self.results.append((file.split('/')[-1], score, skills))
-
-            if not self.results:
+            self.result_model.clear(titles)
+            self.results = RankedResults(self.result_model)
+            self.update_job_selector()
+            self.candidate_panel.set_results(self.results)
+            self.files = []
+            self.file_list.clear()
+            self.failed_files = []
+            self.progress_bar.setRange(0, 0)
+            self.status_label.setText(f"Scanning {directory}...")
+            self.timing_label.setText("")
+            self.profiler.clear()
+            self.set_analysis_running(True)
+            self.watch_button.setText("Stop Watching")
+            self.watch_button.setEnabled(True)
+
+            self.watch_worker = FolderWatchWorker(directory, postings, model_name=SPACY_MODEL,
+                                                  skills_path=SKILLS_PATH, embedding_model=EMBEDDING_MODEL, scorers=parse_scorers(SCORERS),
+                                                  dedupe=DEDUPE, profiler=self.profiler, parent=self)
+            self.watch_worker.file_scored.connect(self.on_watch_scored)
+            self.watch_worker.file_removed.connect(self.on_watch_removed)
+            self.watch_worker.file_duplicate.connect(self.on_watch_duplicate)
+            self.watch_worker.file_filtered.connect(self.on_watch_removed)
+            self.watch_worker.file_failed.connect(self.on_file_failed)
+            self.watch_worker.batch_finished.connect(self.on_watch_batch)
+            self.watch_worker.failed.connect(self.on_watch_failed)
+            self.watch_worker.finished.connect(self.on_watch_finished)
+            self.watch_worker.start()
+        except Exception as e:
+            self.watch_worker = None
+            self.watch_button.setText("Watch Folder")
+            self.set_analysis_running(False)
+            QMessageBox.critical(self, "Error", f"Failed to watch folder: {str(e)}", QMessageBox.Ok)
+
+    def on_watch_scored(self, filepath, result):
+        replaced = filepath in self.result_model.store.rows_by_path
+        self.result_model.set_file_result(filepath, *result)
+        if replaced:
+            self.refresh_watched_results()
+
+    def on_watch_removed(self, filepath):
+        removed = filepath in self.result_model.store.rows_by_path
+        self.result_model.remove_file(filepath)
+        if removed:
+            self.refresh_watched_results()
+
+    def on_watch_duplicate(self, filepath, representative):
+        # A CV changed into a near-duplicate of another loses its own result
+        if filepath in self.result_model.store.rows_by_path:
+            self.result_model.remove(self.result_model.store.rows_by_path[filepath])
+            self.refresh_watched_results()
+        self.result_model.link_duplicate(filepath, representative)
+
+    def refresh_watched_results(self):
+        # Removing a result renumbers the rows after it, so rankings taken
+        # before are replaced by the model's current one
+        self.results = RankedResults(self.result_model)
+        self.candidate_panel.set_results(self.results)
+
+    def on_watch_batch(self, scored, removed):
+        self.results = RankedResults(self.result_model)
+        status = f"Watching: {len(self.results)} CVs ranked (last batch: {scored} scored, {removed} removed"
+        if self.failed_files:
+            status += f", {len(self.failed_files)} unreadable"
+        self.status_label.setText(status + ")")
+        self.failed_files = []
+        try:
+            self.update_skill_filter()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to plot results: {str(e)}", QMessageBox.Ok)
+        # Batches can follow each other quickly; the charts catch up once they pause
+        if not self.redraw_timer.isActive():
+            self.redraw_timer.start()
+        # Timings cover the last batch; starting over keeps a long watch from
+        # piling up events
+        self.show_timings()
+        self.profiler.clear()
+
+    def redraw_watched_graphs(self):
+        try:
+            if self.results:
+                self.display_graphs()
+            else:
+                self.candidate_panel.set_results(self.results)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to plot results: {str(e)}", QMessageBox.Ok)
+
+    def on_watch_failed(self, error):
+        QMessageBox.critical(self, "Error", f"Watching stopped: {error}", QMessageBox.Ok)
+
+    def on_watch_finished(self):
+        self.watch_worker = None
+        self.watch_button.setText("Watch Folder")
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        self.set_analysis_running(False)
+        self.results = RankedResults(self.result_model)
+        self.status_label.setText(f"Stopped watching: {len(self.results)} CVs ranked")
+        if self.redraw_timer.isActive():
+            self.redraw_timer.stop()
+            self.redraw_watched_graphs()
+
+    def load_job_postings(self):
+        try:
+            files, _ = QFileDialog.getOpenFileNames(self, "Select Job Postings", "", "Text Files (*.txt)")
+            if files:
+                postings = read_job_postings(files)
+                if not postings:
+                    QMessageBox.warning(self, "No Postings", "The selected files are empty.", QMessageBox.Ok)
+                    return
+                self.set_job_postings(postings)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to load job postings: {str(e)}", QMessageBox.Ok)
+
+    def set_job_postings(self, postings):
+        self.job_postings = postings
+        self.requirements_input.setEnabled(not postings)
+        if postings:
+            self.postings_label.setText(f"Matching against {len(postings)} postings: "
+                                        + ", ".join(title for title, _ in postings))
+        else:
+            self.postings_label.setText("")
+
+    def update_job_selector(self):
+        titles = self.result_model.store.job_titles
+        self.job_input.blockSignals(True)
+        self.job_input.clear()
+        self.job_input.addItems(titles)
+        self.job_input.setCurrentIndex(self.result_model.store.active_job)
+        self.job_input.blockSignals(False)
+        self.job_label.setVisible(len(titles) > 1)
+        self.job_input.setVisible(len(titles) > 1)
+
+    def on_job_selected(self, job):
+        if job < 0:
+            return
+        self.result_model.set_job(job)
+        self.results = RankedResults(self.result_model)
+        if self.worker is None and self.results:
+            try:
+                self.display_graphs()
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to plot results: {str(e)}", QMessageBox.Ok)
+
+    def cancel_analysis(self):
+        if self.watch_worker is not None:
+            self.toggle_watch()
+        elif self.report_worker is not None and self.report_worker.isRunning():
+            self.report_worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Cancelling report...")
+        elif self.worker is not None and self.worker.isRunning():
+            self.worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Cancelling...")
+
+    def closeEvent(self, event):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.cancel()
+            self.worker.wait()
+        if self.report_worker is not None and self.report_worker.isRunning():
+            self.report_worker.cancel()
+            self.report_worker.wait()
+        if self.watch_worker is not None:
+            self.watch_worker.cancel()
+            self.watch_worker.wait()
+        # Model loading cannot be interrupted, but the thread must finish before the window goes away
+        self.model_loader.wait()
+        super().closeEvent(event)
+
+    def on_model_loaded(self):
+        self.model_ready = True
+        self.analyze_button.setText("Analyze CVs")
+        idle = self.worker is None and self.report_worker is None and self.watch_worker is None
+        self.analyze_button.setEnabled(idle)
+        self.watch_button.setEnabled(idle)
+
+    def on_model_failed(self, error):
+        self.analyze_button.setText("Language model unavailable")
+        QMessageBox.critical(self, "Error", f"Failed to load spaCy model: {error}", QMessageBox.Ok)
+
+    def set_analysis_running(self, running):
+        self.analyze_button.setEnabled(not running and self.model_ready)
+        self.watch_button.setEnabled(not running and self.model_ready)
+        self.upload_button.setEnabled(not running)
+        self.load_postings_button.setEnabled(not running)
+        self.clear_postings_button.setEnabled(not running)
+        self.generate_report_button.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+
+    def on_result_ready(self, filepath, result):
+        self.pending_results.append((*result, filepath))
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush_results(self):
+        self.flush_timer.stop()
+        results, self.pending_results = self.pending_results, []
+        self.result_model.append_many(results)
+
+    def on_duplicate_found(self, filepath, representative):
+        self.duplicate_count += 1
+        self.result_model.link_duplicate(filepath, representative)
+
+    def on_file_failed(self, filepath, error):
+        self.failed_files.append((filepath, error))
+
+    def on_analysis_progress(self, done, total, rate):
+        self.progress_bar.setValue(done)
+        self.status_label.setText(f"{done}/{total} CVs analyzed ({rate:.1f} CVs/s)")
+
+    def on_analysis_finished(self, cancelled):
+        self.flush_results()
+        self.set_analysis_running(False)
+        prune_stats = self.worker.prune_stats
+        error = self.worker.error
+        self.worker = None
+        if error is not None:
+            self.status_label.setText("Analysis failed")
+            QMessageBox.critical(self, "Error", f"Analysis failed: {error}", QMessageBox.Ok)
+            return
+        self.results = RankedResults(self.result_model)
+        processed = len(self.results)
+        skipped = f", {self.duplicate_count} duplicates linked" if self.duplicate_count else ""
+        if prune_stats.pruned:
+            skipped += (f", {len(prune_stats.pruned)} without must-have skills "
+                        f"(~{prune_stats.time_saved():.0f}s saved)")
+        if cancelled:
+            self.status_label.setText(f"Analysis cancelled after {processed} CVs{skipped}")
+        else:
+            self.status_label.setText(f"Analysis complete: {processed} CVs scored{skipped}")
+
+        if self.failed_files:
+            details = "\n".join(f"{os.path.basename(f)}: {e}" for f, e in self.failed_files[:20])
+            QMessageBox.warning(self, "Error", f"Failed to read {len(self.failed_files)} CVs:\n{details}", QMessageBox.Ok)
+
+        if not self.results:
+            if not cancelled:
                 QMessageBox.warning(self, "No Results", "No valid CVs were processed.", QMessageBox.Ok)
-                return
+            return
 
-            self.results.sort(key=lambda x: x[1], reverse=True)
-            best_candidate = self.results[0][0] if self.results else ""
-            self.display_results(best_candidate)
-            self.display_graphs()
+        try:
+            with self.profiler.stage("display"):
+                self.update_skill_filter()
+            with self.profiler.stage("plot"):
+                self.display_graphs()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Analysis failed: {str(e)}", QMessageBox.Ok)
-
-    def display_results(self, best_candidate):
-        self.result_table.setRowCount(len(self.results))
-        for i, (candidate, score, skills) in enumerate(self.results):
-            self.result_table.setItem(i, 0, QTableWidgetItem(candidate))
-            self.result_table.setItem(i, 1, QTableWidgetItem(f"{score}%"))
-            self.result_table.setItem(i, 2, QTableWidgetItem(", ".join(skills[:5])))
-            self.result_table.setItem(i, 3, QTableWidgetItem("Best" if candidate == best_candidate else ""))
+        self.show_timings()
+
+    def show_timings(self):
+        self.timing_label.setText(self.profiler.format_summary())
+        if PROFILE_PATH:
+            try:
+                self.profiler.dump(PROFILE_PATH)
+            except OSError as e:
+                QMessageBox.warning(self, "Error", f"Failed to write timings to {PROFILE_PATH}: {str(e)}", QMessageBox.Ok)
+
+    def update_skill_filter(self):
+        self.skill_filter_input.blockSignals(True)
+        self.skill_filter_input.clear()
+        self.skill_filter_input.addItem("Any")
+        self.skill_filter_input.addItems(sorted(self.result_model.store.skill_names))
+        self.skill_filter_input.blockSignals(False)
+        self.apply_result_filter()
+
+    def apply_result_filter(self):
+        min_score = self.min_score_input.value() or None
+        skill = self.skill_filter_input.currentText() if self.skill_filter_input.currentIndex() > 0 else None
+        self.result_model.set_filter(min_score, skill)
 
     def display_graphs(self):
-        # Clear existing tabs
-        self.tab_widget.clear()
-
         # Summary tab
+        if self.summary_canvas is None:
+            self.summary_canvas = make_canvas()
+            self.summary_layout.replaceWidget(self.summary_placeholder, self.summary_canvas)
+            self.summary_placeholder.deleteLater()
+        self.summary_figure = self.summary_canvas.figure
         self.summary_figure.clear()
         ax1 = self.summary_figure.add_subplot(121)
-        candidates = [r[0] for r in self.results]
-        scores = [r[1] for r in self.results]
-        colors = self.candidate_colors[:len(candidates)]
-        bars = ax1.bar(candidates, scores, color=colors)
+        # Drawing cost grows with every bar and label, so only the best candidates are plotted
+        top = [self.results[i] for i in range(min(SUMMARY_CANDIDATES, len(self.results)))]
+        candidates = [r[0] for r in top]
+        scores = [r[1] for r in top]
+        bars = ax1.bar(range(len(top)), scores, color=self.candidate_colors)
         ax1.set_xlabel('Candidates', color='#F5F6FA', fontsize=12)
         ax1.set_ylabel('Match Score (%)', color='#F5F6FA', fontsize=12)
-        ax1.set_title('Candidate Match Scores', color='#F5F6FA', fontsize=14)
+        store = self.result_model.store
+        title = f"Match Scores: {store.job_titles[store.active_job]}" if len(store.job_titles) > 1 else 'Candidate Match Scores'
+        if len(self.results) > len(top):
+            title += f" (top {len(top)} of {len(self.results)})"
+        ax1.set_title(title, color='#F5F6FA', fontsize=14)
         ax1.set_ylim(0, 100)
         ax1.grid(True, axis='y', linestyle='--', alpha=0.7)
+        ax1.set_xticks(range(len(top)))
         ax1.set_xticklabels(candidates, rotation=45, ha='right', color='#F5F6FA', fontsize=10)
         ax1.tick_params(colors='#F5F6FA')
         for bar in bars:
@@ -339,45 +792,34 @@ class MainWindow(QMainWindow):
             ax1.text(bar.get_x() + bar.get_width()/2, yval + 2, f'{yval}%', ha='center', color='#F5F6FA', fontsize=10)
 
         ax2 = self.summary_figure.add_subplot(122)
-        skill_counts = {}
-        for _, _, skills in self.results:
-            for skill in skills:
-                skill_counts[skill] = skill_counts.get(skill, 0) + 1
-        if skill_counts:
-            skills, counts = zip(*skill_counts.items())
-            ax2.pie(counts, labels=skills, autopct='%1.1f%%', textprops={'color': '#F5F6FA', 'fontsize': 10})
+        counts = store.skill_counts()
+        common = [i for i in sorted(range(len(counts)), key=lambda i: -counts[i])[:SUMMARY_SKILLS] if counts[i]]
+        if common:
+            skills = [store.skill_names[i] for i in common]
+            slices = [int(counts[i]) for i in common]
+            others = int(counts.sum()) - sum(slices)
+            if others:
+                skills.append('Others')
+                slices.append(others)
+            ax2.pie(slices, labels=skills, autopct='%1.1f%%', textprops={'color': '#F5F6FA', 'fontsize': 10})
             ax2.set_title('Skill Distribution', color='#F5F6FA', fontsize=14)
 
         self.summary_figure.tight_layout()
         self.summary_canvas.draw()
-        summary_tab = QWidget()
-        summary_layout = QVBoxLayout()
-        summary_layout.addWidget(self.summary_canvas)
-        summary_tab.setLayout(summary_layout)
-        self.tab_widget.addTab(summary_tab, "Summary")
+        self.summary_png = None
 
-        # Individual candidate tabs
-        for i, (candidate, score, skills) in enumerate(self.results):
-            figure = plt.Figure(figsize=(6, 4), facecolor="#16213E")
-            canvas = FigureCanvas(figure)
-            canvas.setStyleSheet("background: #16213E;")
-            ax = figure.add_subplot(111)
-            skill_counts = {skill: 1 for skill in skills[:5]}  # Show top 5 skills
-            if skill_counts:
-                skills, counts = zip(*skill_counts.items())
-                ax.bar(skills, counts, color=self.candidate_colors[i % len(self.candidate_colors)])
-                ax.set_title(f"{candidate} - Score: {score}%", color='#F5F6FA', fontsize=14)
-                ax.set_ylabel('Skill Presence', color='#F5F6FA', fontsize=12)
-                ax.set_xticklabels(skills, rotation=45, ha='right', color='#F5F6FA', fontsize=10)
-                ax.tick_params(colors='#F5F6FA')
-                ax.set_ylim(0, 2)
-                ax.grid(True, axis='y', linestyle='--', alpha=0.7)
-            figure.tight_layout()
-            tab = QWidget()
-            tab_layout = QVBoxLayout()
-            tab_layout.addWidget(canvas)
-            tab.setLayout(tab_layout)
-            self.tab_widget.addTab(tab, candidate)
+        # Individual candidate charts are drawn when first selected
+        self.candidate_panel.set_results(self.results)
+
+    def on_result_selected(self, current, previous):
+        if current.isValid() and self.worker is None:
+            store_row = self.result_model.store_row(current.row())
+            position = self.results.position(store_row)
+            if position is None:
+                # Streamed in by the folder watcher since the ranking was last taken
+                self.refresh_watched_results()
+                position = self.results.position(store_row)
+            self.candidate_panel.show_candidate(position)
 
     def generate_report(self):
         try:
@@ -385,70 +827,69 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "No Results", "Please analyze CVs before generating a report.", QMessageBox.Ok)
                 return
 
-            filepath, _ = QFileDialog.getSaveFileName(self, "Save Report", "", "PDF Files (*.pdf);;Word Files (*.docx)")
-            if filepath:
-                if filepath.endswith('.pdf'):
-                    self.generate_pdf_report(filepath)
-                else:
-                    self.generate_docx_report(filepath)
-                QMessageBox.information(self, "Success", "Report generated successfully!", QMessageBox.Ok)
+            filepath, selected_filter = QFileDialog.getSaveFileName(
+                self, "Save Report", "", "PDF Files (*.pdf);;Word Files (*.docx);;CSV Files (*.csv);;Excel Files (*.xlsx)")
+            if not filepath:
+                return
+            if not os.path.splitext(filepath)[1]:
+                filepath += selected_filter[selected_filter.index("*") + 1:-1]
+
+            store = self.result_model.store
+            job = store.job_titles[store.active_job] if len(store.job_titles) > 1 else None
+            charts = []
+            if filepath.lower().endswith((".pdf", ".docx")) and self.summary_figure is not None:
+                charts.append(self.summary_chart_png())
+
+            self.report_worker = ReportWorker(filepath, self.results, summarize(self.results, job), charts,
+                                              profiler=self.profiler, parent=self)
+            self.report_worker.progress.connect(self.on_report_progress)
+            self.report_worker.report_finished.connect(self.on_report_finished)
+            self.report_worker.failed.connect(self.on_report_failed)
+            self.progress_bar.setRange(0, len(self.results))
+            self.progress_bar.setValue(0)
+            self.status_label.setText(f"Writing report for {len(self.results)} CVs...")
+            self.set_report_running(True)
+            self.report_worker.start()
         except Exception as e:
+            self.report_worker = None
+            self.set_report_running(False)
             QMessageBox.critical(self, "Error", f"Failed to generate report: {str(e)}", QMessageBox.Ok)
 
-    def generate_pdf_report(self, filepath):
-        doc = SimpleDocTemplate(filepath, pagesize=letter)
-        styles = getSampleStyleSheet()
-        elements = []
-
-        elements.append(Paragraph("CV Analysis Report", styles['Title']))
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Analysis Summary", styles['Heading2']))
-        elements.append(Paragraph(f"Total CVs analyzed: {len(self.results)}", styles['Normal']))
-        elements.append(Paragraph(f"Best Candidate: {self.results[0][0]} (Score: {self.results[0][1]}%)", styles['Normal']))
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph("Detailed Results", styles['Heading2']))
-
-        data = [["Candidate", "Match Score", "Top Skills"]]
-        for candidate, score, skills in self.results:
-            data.append([candidate, f"{score}%", ", ".join(skills[:5])])
-
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#0E6CFF")),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor("#E9ECEF")),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(table)
-
-        doc.build(elements)
-
-    def generate_docx_report(self, filepath):
-        doc = Document()
-        doc.add_heading('CV Analysis Report', 0)
-        doc.add_heading('Analysis Summary', level=2)
-        doc.add_paragraph(f'Total CVs analyzed: {len(self.results)}')
-        doc.add_paragraph(f'Best Candidate: {self.results[0][0]} (Score: {self.results[0][1]}%)')
-        doc.add_heading('Detailed Results', level=2)
-
-        table = doc.add_table(rows=1, cols=3)
-        table.style = 'Table Grid'
-        hdr_cells = table.rows[0].cells
-        hdr_cells[0].text = 'Candidate'
-        hdr_cells[1].text = 'Match Score'
-        hdr_cells[2].text = 'Top Skills'
-
-        for candidate, score, skills in self.results:
-            row_cells = table.add_row().cells
-            row_cells[0].text = candidate
-            row_cells[1].text = f'{score}%'
-            row_cells[2].text = ', '.join(skills[:5])
-
-        doc.save(filepath)
+    def summary_chart_png(self):
+        # matplotlib may only draw on the GUI thread, so the summary charts are
+        # rendered here once and the PNG is reused until they are redrawn
+        if self.summary_png is None:
+            buffer = BytesIO()
+            self.summary_figure.savefig(buffer, format="png", dpi=150, facecolor=self.summary_figure.get_facecolor())
+            self.summary_png = buffer.getvalue()
+        return self.summary_png
+
+    def set_report_running(self, running):
+        # The report reads the results while it is written, so nothing may change them
+        self.set_analysis_running(running)
+        self.job_input.setEnabled(not running)
+        self.cancel_button.setText("Cancel Report" if running else "Cancel Analysis")
+
+    def on_report_progress(self, done):
+        self.progress_bar.setValue(done)
+        self.status_label.setText(f"Report: {done}/{len(self.results)} CVs written")
+
+    def on_report_finished(self, cancelled):
+        filepath = self.report_worker.filepath
+        self.report_worker = None
+        self.set_report_running(False)
+        self.show_timings()
+        if cancelled:
+            self.status_label.setText("Report cancelled")
+        else:
+            self.status_label.setText(f"Report saved to {os.path.basename(filepath)}")
+            QMessageBox.information(self, "Success", "Report generated successfully!", QMessageBox.Ok)
+
+    def on_report_failed(self, error):
+        self.report_worker = None
+        self.set_report_running(False)
+        self.status_label.setText("Report failed")
+        QMessageBox.critical(self, "Error", f"Failed to generate report: {error}", QMessageBox.Ok)
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from backend.analyzer import score_texts, top_k_indices
+
+TEXTS = ["python developer with sql", "pastry chef", "senior python developer", ""]
+
+
+def test_score_texts_ranks_by_similarity():
+    scores = score_texts("python developer", TEXTS)
+    assert scores.shape == (4,)
+    assert scores[1] == scores[3] == 0
+    assert scores[2] > scores[0] > 0
+    assert scores.max() <= 1 + 1e-9
+
+
+def test_score_texts_accepts_an_iterator():
+    expected = score_texts("python developer", TEXTS)
+    np.testing.assert_allclose(score_texts("python developer", (text for text in TEXTS)), expected)
+    np.testing.assert_allclose(score_texts("python developer", iter(TEXTS), chunk_size=1), expected)
+    assert score_texts("python developer", iter([])).shape == (0,)
+
+
+@pytest.mark.parametrize("k", [None, 0, 1, 2, 3, 5, 10])
+def test_top_k_indices(k):
+    scores = np.array([3.0, 9.0, 1.0, 9.0, 5.0])
+    best = top_k_indices(scores, k)
+    assert best.tolist() == [1, 3, 4, 0, 2][:k]
+
+
+def test_top_k_indices_is_a_prefix_of_the_stable_sort():
+    scores = np.random.default_rng(0).integers(0, 5, 200).astype(float)
+    full = np.argsort(-scores, kind="stable")
+    for k in (1, 7, 40, 199):
+        assert top_k_indices(scores, k).tolist() == full[:k].tolist()
@@ -0,0 +1,95 @@
+import os
+import csv
+
+from backend import cli
+from backend.cli import Ranking
+from backend.engine import WorkerError
+
+
+def fake_analyze(files, jobs, **options):
+    # Scores each CV by its position, the same for every posting
+    for i, filepath in enumerate(sorted(files)):
+        scores = [float(10 * i)] * len(jobs) if isinstance(jobs, list) else float(10 * i)
+        yield filepath, (os.path.basename(filepath), scores, ["python"]), None
+
+
+def test_jobs_takes_one_value_per_flag():
+    args = cli.parse_args(["--jobs", "roles/", "cvs/", "--top-k", "10", "--output", "shortlists.csv",
+                           "--best-fit", "best_fit.csv"])
+    assert args.jobs == ["roles/"]
+    assert args.cvs == ["cvs/"]
+    args = cli.parse_args(["cvs/", "-J", "a.txt", "-J", "b.txt"])
+    assert args.jobs == ["a.txt", "b.txt"]
+
+
+def test_documented_jobs_invocation(tmp_path, monkeypatch):
+    # python -m backend.cli --jobs roles/ cvs/ --top-k 10 --output shortlists.csv --best-fit best_fit.csv
+    (tmp_path / "roles").mkdir()
+    (tmp_path / "roles" / "backend.txt").write_text("Python developer")
+    (tmp_path / "roles" / "frontend.txt").write_text("React developer")
+    (tmp_path / "cvs").mkdir()
+    for name in ("ann.txt", "bob.txt"):
+        (tmp_path / "cvs" / name).write_text("Python")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli, "analyze", fake_analyze)
+
+    status = cli.main(["--jobs", "roles/", "cvs/", "--top-k", "10", "--output", "shortlists.csv",
+                       "--best-fit", "best_fit.csv", "--no-cache", "-q"])
+
+    assert status == 0
+    with open("shortlists.csv", newline="") as file:
+        shortlists = list(csv.DictReader(file))
+    assert [(row["job"], row["rank"], row["candidate"]) for row in shortlists] == [
+        ("backend", "1", "bob.txt"), ("backend", "2", "ann.txt"),
+        ("frontend", "1", "bob.txt"), ("frontend", "2", "ann.txt"),
+    ]
+    with open("best_fit.csv", newline="") as file:
+        assert len(list(csv.DictReader(file))) == 2
+
+
+def test_ranking_breaks_ties_by_path():
+    results = [("/cvs/d.txt", 50.0), ("/cvs/b.txt", 90.0), ("/cvs/c.txt", 50.0), ("/cvs/a.txt", 50.0),
+               ("/cvs/e.txt", 10.0)]
+    expected = ["/cvs/b.txt", "/cvs/a.txt", "/cvs/c.txt", "/cvs/d.txt", "/cvs/e.txt"]
+    for order in (results, results[::-1]):
+        for top_k in (None, 1, 2, 3, 4):
+            ranking = Ranking(top_k)
+            for filepath, score in order:
+                ranking.add(filepath, (os.path.basename(filepath), score, []))
+            rows = list(ranking.ranked())
+            assert [row["path"] for row in rows] == expected[:top_k]
+            assert [row["rank"] for row in rows] == list(range(1, len(rows) + 1))
+
+
+def run_cli(tmp_path, monkeypatch, fake, *extra):
+    (tmp_path / "cvs").mkdir()
+    for name in ("ann.txt", "bob.txt"):
+        (tmp_path / "cvs" / name).write_text("Python")
+    (tmp_path / "job.txt").write_text("Python developer")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli, "analyze", fake)
+    return cli.main(["cvs", "--requirements", "job.txt", "--no-cache", "--output", "ranked.csv", *extra])
+
+
+def test_worker_setup_failure_is_fatal(tmp_path, monkeypatch, capsys):
+    def broken(files, job, **options):
+        raise WorkerError("worker setup failed: [E050] Can't find model 'nonexistent_model'")
+        yield
+
+    assert run_cli(tmp_path, monkeypatch, broken) == 1
+    err = capsys.readouterr().err
+    assert err.count("nonexistent_model") == 1
+    assert "warning" not in err
+
+
+def test_no_cv_scored_is_an_error(tmp_path, monkeypatch, capsys):
+    def unreadable(files, job, **options):
+        for filepath in sorted(files):
+            yield filepath, None, "not a PDF"
+
+    assert run_cli(tmp_path, monkeypatch, unreadable) == 1
+    lines = capsys.readouterr().err.splitlines()
+    # Every warning starts on a line of its own, after the progress line
+    assert [line for line in lines if "warning" in line] == [
+        f"warning: failed to read {os.path.join('cvs', name)}: not a PDF" for name in ("ann.txt", "bob.txt")
+    ]
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pytest
+
+from backend.dedup import MinHasher, find_duplicates, shingle_hashes, similarity
+
+CV = ("Jane Doe. Senior backend engineer with eight years of Python, PostgreSQL and AWS experience. "
+      "Led the migration of a payments platform to event sourcing and mentored four engineers. "
+      "Previously built data pipelines in Spark for a logistics company.")
+OTHER = ("John Smith. Pastry chef trained in Lyon, running a bakery of twelve people. "
+         "Designs seasonal menus, manages suppliers and teaches weekend bread courses.")
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert set(shingle_hashes("Python, SQL and AWS.")) == set(shingle_hashes("python sql AND aws"))
+    assert len(shingle_hashes("")) == 0
+
+
+def test_signatures_estimate_similarity():
+    hasher = MinHasher()
+    signature = hasher.signature(CV)
+    assert signature.dtype == np.uint32 and len(signature) == 128
+    np.testing.assert_array_equal(signature, MinHasher().signature(CV))
+    assert similarity(signature, hasher.signature(CV.upper())) == 1.0
+    assert similarity(signature, hasher.signature(OTHER)) < 0.1
+
+
+def test_first_file_of_a_cluster_represents_it():
+    hasher = MinHasher()
+    edited = CV.replace("four", "five")
+    texts = [("other.txt", OTHER), ("cv.docx", CV), ("cv.pdf", CV + " "), ("cv-edited.pdf", edited)]
+    kept, duplicates = find_duplicates([(key, hasher.signature(text)) for key, text in texts], threshold=0.7)
+    assert kept == ["other.txt", "cv.docx"]
+    assert duplicates == {"cv.pdf": "cv.docx", "cv-edited.pdf": "cv.docx"}
+
+
+def test_chains_join_one_cluster():
+    # a ~ b and b ~ c put c in a's cluster even when a and c are less alike
+    a = np.arange(128, dtype=np.uint32)
+    b = a.copy()
+    b[:20] += 1000
+    c = b.copy()
+    c[20:40] += 1000
+    assert similarity(a, c) < 0.8 <= similarity(a, b)
+    kept, duplicates = find_duplicates([("c", c), ("a", a), ("b", b)], threshold=0.8, bands=128)
+    assert kept == ["c"]
+    assert duplicates == {"a": "c", "b": "c"}
+
+
+def test_distinct_texts_are_all_kept():
+    hasher = MinHasher()
+    texts = [f"candidate {i} " + " ".join(f"skill{i * 10 + j}" for j in range(30)) for i in range(50)]
+    kept, duplicates = find_duplicates([(i, hasher.signature(text)) for i, text in enumerate(texts)])
+    assert kept == list(range(50)) and duplicates == {}
+    assert find_duplicates([]) == ([], {})
+
+
+def test_analysis_scores_the_first_file_of_each_cluster(tmp_path):
+    spacy = pytest.importorskip("spacy")
+    from backend.engine import analyze
+    model = str(tmp_path / "blank_en")
+    spacy.blank("en").to_disk(model)
+    paths = []
+    for name, text in (("b_copy.txt", CV), ("a.txt", CV), ("other.txt", OTHER)):
+        path = tmp_path / name
+        path.write_text(text)
+        paths.append(str(path))
+    duplicates = {}
+    outcomes = analyze(paths, "python engineer", model_name=model, cache_path=None, max_workers=1, dedupe=True,
+                       duplicates=duplicates)
+    scored = sorted(os.path.basename(path) for path, result, _ in outcomes if result is not None)
+    assert scored == ["b_copy.txt", "other.txt"]
+    assert duplicates == {paths[1]: paths[0]}
@@ -0,0 +1,15 @@
+import os
+
+from backend.embeddings import model_files_digest
+
+
+def test_model_digest_changes_when_a_file_is_rewritten_in_place(tmp_path):
+    (tmp_path / "config.json").write_text("{}")
+    (tmp_path / "0_Transformer").mkdir()
+    weights = tmp_path / "0_Transformer" / "model.safetensors"
+    weights.write_bytes(b"\0" * 16)
+    before = model_files_digest(str(tmp_path))
+    directory_mtime = os.stat(tmp_path).st_mtime_ns
+    weights.write_bytes(b"\1" * 32)
+    assert os.stat(tmp_path).st_mtime_ns == directory_mtime
+    assert model_files_digest(str(tmp_path)) != before
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import pytest
+
+from backend import engine
+from backend.scorers import TfidfScorer, parse_scorers
+
+
+def fake_analyze(paths, job, **options):
+    scores = {"d.txt": 50.0, "c.txt": 90.0, "b.txt": 50.0, "a.txt": 50.0, "e.txt": 10.0}
+    for path in paths:
+        yield path, (path.upper(), scores[path], []), None
+    yield "empty.txt", None, None
+
+
+@pytest.fixture
+def paths(monkeypatch):
+    monkeypatch.setattr(engine, "analyze", fake_analyze)
+    return ["d.txt", "c.txt", "b.txt", "a.txt", "e.txt"]
+
+
+def test_rank_breaks_ties_by_path(paths):
+    assert [item[0] for item in engine.rank(paths, "job")] == ["c.txt", "a.txt", "b.txt", "d.txt", "e.txt"]
+
+
+@pytest.mark.parametrize("top_k", [0, 1, 2, 3, 4, 5, 9])
+def test_rank_top_k_is_a_prefix_of_the_full_ranking(paths, top_k):
+    assert engine.rank(paths, "job", top_k=top_k) == engine.rank(paths, "job")[:top_k]
+
+
+def test_tfidf_scorer():
+    jobs = SimpleNamespace(profiles=[SimpleNamespace(requirements="python developer"),
+                                     SimpleNamespace(requirements="pastry chef")])
+    scorer = parse_scorers("tfidf:0.5")[0]
+    assert isinstance(scorer, TfidfScorer)
+    scores = scorer.score(jobs, {"texts": ["Python developer", "Senior pastry chef", ""]})
+    assert scores.shape == (3, 2)
+    assert scores[0, 0] == pytest.approx(50.0)
+    assert scores[1, 1] > 0 and scores[0, 1] == 0 and scores[1, 0] == 0
+    assert not scores[2].any()
+
+
+def test_parse_scorers_reads_a_candidate_index(tmp_path):
+    from backend.index import CandidateIndex
+    index = CandidateIndex(str(tmp_path / "pool"), n_features=2 ** 12)
+    index.add("ann", "python developer")
+    index.flush()
+    scorer, = parse_scorers(f"tfidf:0.5@{index.path}")
+    assert scorer.weight == 0.5 and scorer.index_path == index.path
+    with pytest.raises(ValueError, match="not a candidate index"):
+        parse_scorers(f"tfidf@{tmp_path / 'typo'}")
+    assert not (tmp_path / "typo").exists()
+    with pytest.raises(ValueError, match="does not use a candidate index"):
+        parse_scorers(f"semantic@{index.path}")
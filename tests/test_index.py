@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from backend.index import CandidateIndex
+
+CVS = {
+    "ann": "python developer building data pipelines in sql",
+    "bob": "pastry chef and baker",
+    "cat": "senior python developer",
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = CandidateIndex(str(tmp_path / "index"), n_features=2 ** 12)
+    for candidate_id, text in CVS.items():
+        index.add(candidate_id, text)
+    index.flush()
+    return index
+
+
+def ids(results):
+    return [candidate_id for candidate_id, _, _ in results]
+
+
+def test_query_ranks_by_similarity(index):
+    results = index.query("python developer")
+    assert ids(results) == ["cat", "ann", "bob"]
+    assert results[2][2] == 0
+    assert ids(index.query("python developer", top_k=1)) == ["cat"]
+
+
+def test_remove_tombstones_the_row_and_updates_df(index):
+    df = index.df.copy()
+    assert index.remove("cat")
+    assert not index.remove("cat")
+    assert "cat" not in index and len(index) == 2
+    terms = index.term_frequencies([CVS["cat"]]).indices
+    np.testing.assert_array_equal(index.df[terms], df[terms] - 1)
+    assert index.rows[2] is None
+    assert ids(index.query("python developer")) == ["ann", "bob"]
+
+
+def test_replacing_a_candidate_keeps_one_row(index):
+    index.add("bob", "python developer")
+    index.flush()
+    assert len(index) == 3
+    assert sum(row is not None and row[0] == "bob" for row in index.rows) == 1
+    assert ids(index.query("python developer"))[:2] == ["bob", "cat"]
+
+
+def test_compact_drops_tombstones_and_survives_reopening(index):
+    index.add("dan", "python sql")
+    index.flush()
+    index.remove("ann")
+    before = index.query("python sql developer")
+    df = index.df.copy()
+    index.compact()
+    assert len(index.segments) == 1 and None not in index.rows
+    assert index.query("python sql developer") == pytest.approx(before)
+    reopened = CandidateIndex(index.path)
+    assert len(reopened) == 3
+    np.testing.assert_array_equal(reopened.df, df)
+    assert reopened.query("python sql developer") == pytest.approx(before)
+
+
+def test_opening_a_missing_index_read_only_fails(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        CandidateIndex(str(tmp_path / "typo"), create=False)
+    assert not (tmp_path / "typo").exists()
@@ -0,0 +1,12 @@
+import pytest
+
+from backend import pipeline
+
+
+def test_worker_setup_errors_are_raised_by_every_task(monkeypatch):
+    pytest.importorskip("spacy")
+    monkeypatch.setattr(pipeline, "_init_error", None)
+    pipeline.start_worker(["Must have: Python"], "nonexistent_model", None)
+    for task in (pipeline.analyze_files, pipeline.sketch_files):
+        with pytest.raises(pipeline.WorkerError, match="nonexistent_model"):
+            task(["cv.txt"])
@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+from backend.skills import load_taxonomy
+from backend.prefilter import SkillFilter, PruneStats, skill_requirements
+
+POSTING = """Backend Engineer
+
+Must have: Python, SQL
+- Nice-to-have: Docker; kubernetes.
+Must have: 3+ years of experience
+Nice to have: strong communication skills
+Must have experience with AWS: EC2, S3
+"""
+
+
+@pytest.fixture(scope="module")
+def taxonomy():
+    return load_taxonomy()
+
+
+def test_only_strict_requirement_lines_are_parsed():
+    must_have, nice_to_have = skill_requirements(POSTING)
+    assert must_have == ["python", "sql", "3+ years of experience"]
+    assert nice_to_have == ["docker", "kubernetes", "strong communication skills"]
+
+
+def test_free_text_posting_has_no_requirements(taxonomy):
+    skill_filter = SkillFilter(["We need someone who must have shipped Python services.\nAWS: EC2, S3"], taxonomy)
+    assert skill_filter.must_have == [[]]
+    assert not skill_filter.active
+
+
+def test_unknown_terms_are_skipped(taxonomy):
+    skill_filter = SkillFilter([POSTING], taxonomy)
+    assert skill_filter.must_have == [["python", "sql"]]
+    assert skill_filter.nice_to_have == [["docker", "kubernetes"]]
+    assert skill_filter.unknown == ["3+ years of experience", "strong communication skills"]
+    assert "3+ years of experience" in skill_filter.format_unknown()
+
+
+def test_synonyms_resolve_to_canonical_skills(taxonomy):
+    skill_filter = SkillFilter(["Must have: Python3, python, nodejs"], taxonomy)
+    assert skill_filter.must_have == [["python", "node.js"]]
+
+
+def test_possible_skills_use_word_sets(taxonomy):
+    skill_filter = SkillFilter(["Must have: python, node.js"], taxonomy)
+    assert skill_filter.possible_skills("Built APIs in Node.js and Python.") == {"python", "node.js"}
+    # Every word of a surface form must be present, not a substring
+    assert skill_filter.possible_skills("pythonic node") == set()
+
+
+def test_qualified_per_posting(taxonomy):
+    skill_filter = SkillFilter(["Must have: python, node.js", "Must have: java", "No hard requirements"], taxonomy)
+    qualified = skill_filter.qualified([{"python": 2, "node.js": 1}, {"java": 1}, {"python": 1}, {}])
+    assert qualified.tolist() == [
+        [True, False, True],
+        [False, True, True],
+        [False, False, True],
+        [False, False, True],
+    ]
+
+
+def test_prune_stats_merge_and_time_saved():
+    total = PruneStats()
+    for filepath, stage in (("a", "tokens"), ("b", "skills")):
+        stats = PruneStats()
+        stats.prune(filepath, stage)
+        stats.seconds = {"tokens": 0.1, "parse": 2.0, "embed": 1.0, "score": 0.5}
+        stats.docs = {"tokens": 2, "parse": 1, "embed": 1, "score": 1}
+        total.merge(stats)
+    assert total.counts() == {"tokens": 1, "skills": 1}
+    assert total.docs["parse"] == 2
+    # Per CV: parse 2s, embed 1s, score 0.5s. A CV pruned on tokens saves all
+    # three, one pruned on skills embed and score; 0.2s went to filtering.
+    assert total.time_saved() == pytest.approx((2.0 + 1.0 + 0.5) + (1.0 + 0.5) - 0.2)
+
+
+def test_must_have_pruning_in_worker(tmp_path):
+    spacy = pytest.importorskip("spacy")
+    from backend import pipeline
+    model = str(tmp_path / "blank_en")
+    spacy.blank("en").to_disk(model)
+    texts = {
+        "match.txt": "Python developer, administers SQL Server.",
+        "synonym.txt": "python3 scripts against MSSQL",
+        "sql_only.txt": "Python developer who writes SQL every day.",
+        "pythonic.txt": "Wrote sql server queries; pythonic style.",
+        "words_not_phrase.txt": "python and server, sql",
+        "neither.txt": "Chef and sommelier.",
+        "empty.txt": "",
+    }
+    paths = []
+    for name, text in texts.items():
+        path = tmp_path / name
+        path.write_text(text)
+        paths.append(str(path))
+
+    pipeline.init_worker(["Must have: Python, SQL Server"], model_name=model, cache_path=None)
+    outcomes, _, stats = pipeline.analyze_files(paths)
+
+    results = {os.path.basename(filepath): result for filepath, result, _ in outcomes}
+    assert set(results) == set(texts)
+    assert results["empty.txt"] is None
+    pruned = {os.path.basename(filepath): stage for filepath, stage in stats.pruned.items()}
+    # Dropped on words before spaCy ran, or on the matched skills after it
+    assert pruned == {"sql_only.txt": "tokens", "pythonic.txt": "tokens", "neither.txt": "tokens",
+                      "words_not_phrase.txt": "skills"}
+    assert all(results[name] is None for name in pruned)
+    assert results["match.txt"][2][:2] == ["python", "sql server"]
+    assert results["synonym.txt"] is not None
+    assert stats.docs["parse"] == 3
@@ -0,0 +1,128 @@
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtCore = pytest.importorskip("PyQt5.QtCore")
+from PyQt5.QtCore import Qt, QCoreApplication
+
+from ui.result_model import ResultStore, ResultTableModel, RankedResults, NAME_COLUMN, SCORE_COLUMN
+
+
+@pytest.fixture(scope="module", autouse=True)
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def names(model):
+    return [model.store.names[row] for row in model.order]
+
+
+def test_store_remove_shifts_rows():
+    store = ResultStore(capacity=2)
+    for i, skills in enumerate([["python"], ["sql", "java"], [], ["go"]]):
+        store.append(f"cv{i}", float(i), skills, f"/cvs/cv{i}.pdf")
+    store.remove(1)
+    assert store.names == ["cv0", "cv2", "cv3"]
+    assert [store.skills(row) for row in range(3)] == [["python"], [], ["go"]]
+    assert store.score_column().tolist() == [0.0, 2.0, 3.0]
+    assert store.rows_by_path == {"/cvs/cv0.pdf": 0, "/cvs/cv2.pdf": 1, "/cvs/cv3.pdf": 2}
+    assert store.rows_with_skill("go").tolist() == [2]
+    assert store.rows_with_skill("java").tolist() == []
+
+
+def test_streamed_order_matches_a_full_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 20, 300).astype(float)
+    one_by_one, batched = ResultTableModel(), ResultTableModel()
+    for i, score in enumerate(scores):
+        one_by_one.append(f"cv{i}", score, [])
+    for start in range(0, len(scores), 37):
+        batched.append_many([(f"cv{i}", scores[i], [], None) for i in range(start, min(start + 37, len(scores)))])
+    expected = names(one_by_one)
+    assert names(batched) == expected
+    one_by_one.refresh()
+    assert names(one_by_one) == expected
+    assert batched.best == int(np.argmax(scores))
+    assert [name for name, _, _ in RankedResults(batched)] == expected
+
+
+def test_ranking_follows_replaced_and_removed_files():
+    rng = np.random.default_rng(1)
+    model = ResultTableModel()
+    model.sort(NAME_COLUMN, Qt.AscendingOrder)
+    model.set_filter(min_score=5)
+    model.append_many([(f"cv{i}", float(rng.integers(0, 10)), [], f"/cvs/cv{i}.pdf") for i in range(50)])
+    before = RankedResults(model)
+    snapshot = before.order.copy()
+    for i in rng.permutation(50)[:20]:
+        if i % 2:
+            model.remove_file(f"/cvs/cv{i}.pdf")
+        else:
+            model.set_file_result(f"/cvs/cv{i}.pdf", f"cv{i}", float(rng.integers(0, 10)), [])
+    assert model.ranking.tolist() == model.store.ranked().tolist()
+    assert model.best == model.store.best_row()
+    assert model.store.rows_by_path == {path: row for row, path in enumerate(model.store.paths)}
+    # Rankings taken before keep their order; the model never edits it in place
+    assert before.order.tolist() == snapshot.tolist()
+
+
+def test_append_many_keeps_filter_sort_and_selection():
+    model = ResultTableModel()
+    model.sort(NAME_COLUMN, Qt.AscendingOrder)
+    model.set_filter(min_score=50)
+    model.append_many([("bob", 60.0, [], None), ("dan", 70.0, [], None), ("eve", 10.0, [], None)])
+    selected = QtCore.QPersistentModelIndex(model.index(1, NAME_COLUMN))
+    model.append_many([("amy", 90.0, [], None), ("cat", 55.0, [], None)])
+    assert names(model) == ["amy", "bob", "cat", "dan"]
+    assert model.data(model.index(selected.row(), NAME_COLUMN)) == "dan"
+    assert model.best == 3
+
+
+def test_removal_keeps_order_and_best():
+    model = ResultTableModel()
+    model.sort(SCORE_COLUMN, Qt.DescendingOrder)
+    for name, score in (("a", 10.0), ("b", 90.0), ("c", 50.0), ("d", 90.0)):
+        model.set_file_result(f"/cvs/{name}", name, score, [])
+    assert names(model) == ["b", "d", "c", "a"]
+    assert model.store.names[model.best] == "b"
+    model.remove_file("/cvs/b")
+    assert names(model) == ["d", "c", "a"]
+    assert model.store.names[model.best] == "d"
+    model.set_file_result("/cvs/a", "a", 95.0, [])
+    assert names(model) == ["a", "d", "c"]
+    assert model.store.names[model.best] == "a"
+    model.append("e", 60.0, [])
+    assert names(model) == ["a", "d", "e", "c"]
+
+
+def test_duplicates_are_linked_once_by_full_path():
+    model = ResultTableModel()
+    model.set_file_result("/cvs/a.pdf", "a.pdf", 70.0, [])
+    model.set_file_result("/other/a.pdf", "a.pdf", 60.0, [])
+    model.link_duplicate("/cvs/a.docx", "/cvs/a.pdf")
+    model.link_duplicate("/cvs/a.docx", "/cvs/a.pdf")
+    assert model.data(model.index(0, NAME_COLUMN)) == "a.pdf (+1 duplicate)"
+    assert model.data(model.index(0, NAME_COLUMN), Qt.ToolTipRole) == "Also submitted as:\n/cvs/a.docx"
+    assert model.data(model.index(1, NAME_COLUMN)) == "a.pdf"
+
+
+def test_duplicate_links_follow_watched_files():
+    model = ResultTableModel()
+    model.set_file_result("/cvs/a.pdf", "a.pdf", 70.0, [])
+    for duplicate in ("/cvs/b.pdf", "/cvs/c.pdf", "/cvs/d.pdf"):
+        model.link_duplicate(duplicate, "/cvs/a.pdf")
+    # Deleted, then edited into a distinct CV and scored on its own row
+    model.remove_file("/cvs/b.pdf")
+    model.set_file_result("/cvs/c.pdf", "c.pdf", 50.0, [])
+    assert model.store.duplicates == {"/cvs/a.pdf": ["/cvs/d.pdf"]}
+    assert model.data(model.index(0, NAME_COLUMN)) == "a.pdf (+1 duplicate)"
+    # Rescoring the representative keeps its links; deleting it drops them
+    model.set_file_result("/cvs/a.pdf", "a.pdf", 75.0, [])
+    assert model.store.duplicates == {"/cvs/a.pdf": ["/cvs/d.pdf"]}
+    model.link_duplicate("/cvs/d.pdf", "/cvs/c.pdf")
+    assert model.store.duplicates == {"/cvs/c.pdf": ["/cvs/d.pdf"]}
+    model.remove_file("/cvs/c.pdf")
+    assert model.store.duplicates == {} and model.store.representatives == {}
+    assert names(model) == ["a.pdf"]
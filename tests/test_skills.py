@@ -0,0 +1,10 @@
+from backend.skills import load_taxonomy
+
+
+def test_bundled_taxonomy_gives_each_surface_form_one_skill():
+    taxonomy = load_taxonomy()
+    assert len(taxonomy) > 1000
+    owners = {}
+    for canonical, terms in taxonomy.items():
+        for term in terms:
+            assert owners.setdefault(term, canonical) == canonical, f"{term!r} is listed under {owners[term]!r} and {canonical!r}"
@@ -0,0 +1,105 @@
+import json
+import os
+
+from backend import cli, watch
+
+
+def fake_analysis(filepaths, job, duplicates=None, prune_stats=None, **options):
+    for filepath in filepaths:
+        name = os.path.basename(filepath)
+        if name == "copy.txt":
+            duplicates[filepath] = filepath.replace("copy.txt", "cv.txt")
+            yield filepath, None, None
+        elif name == "chef.txt":
+            prune_stats.prune(filepath, "tokens")
+            yield filepath, None, None
+        elif name == "empty.txt":
+            yield filepath, None, None
+        else:
+            yield filepath, (name, 80.0, ["python"]), None
+
+
+def test_watch_reports_duplicates_and_filtered_files(tmp_path, monkeypatch):
+    for name in ("cv.txt", "copy.txt", "chef.txt", "empty.txt"):
+        (tmp_path / name).write_text(name)
+    monkeypatch.setattr(watch, "iter_analysis", fake_analysis)
+    events = watch.iter_watch([str(tmp_path)], "Must have: python", polling=True, cache_path=None)
+    first_batch = []
+    for event in events:
+        first_batch.append(event)
+        if event[0] == "batch":
+            break
+    events.close()
+    path = str(tmp_path)
+    assert sorted(first_batch[:-1]) == sorted([
+        ("scored", os.path.join(path, "cv.txt"), ("cv.txt", 80.0, ["python"])),
+        ("duplicate", os.path.join(path, "copy.txt"), os.path.join(path, "cv.txt")),
+        ("filtered", os.path.join(path, "chef.txt"), "tokens"),
+        ("removed", os.path.join(path, "empty.txt"), None),
+    ])
+    assert first_batch[-1] == ("batch", None, (4, 0))
+
+
+def test_cli_watch_prints_no_removal_for_skipped_files(tmp_path, monkeypatch, capsys):
+    def fake_watch(directories, job, **options):
+        yield "scored", "/cvs/a.txt", ("a.txt", 70.0, [])
+        yield "scored", "/cvs/b.txt", ("b.txt", 60.0, [])
+        yield "batch", None, (2, 0)
+        # b.txt edited into a copy of a.txt, then a.txt edited to drop a must-have skill
+        yield "duplicate", "/cvs/b.txt", "/cvs/a.txt"
+        yield "filtered", "/cvs/a.txt", "skills"
+        yield "batch", None, (2, 0)
+
+    requirements = tmp_path / "job.txt"
+    requirements.write_text("Must have: python")
+    monkeypatch.setattr(cli, "iter_watch", fake_watch)
+    monkeypatch.setattr(cli, "warm_up", lambda model: None)
+    assert cli.main(["--requirements", str(requirements), "--watch", str(tmp_path), "--no-cache", "-q"]) == 0
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [event["event"] for event in events] == ["scored", "scored", "duplicate", "filtered"]
+    assert events[2] == {"event": "duplicate", "path": "/cvs/b.txt", "of": "/cvs/a.txt"}
+    assert events[3] == {"event": "filtered", "path": "/cvs/a.txt", "stage": "skills"}
+
+
+def dedupe_by_content(filepaths, job, duplicates=None, prune_stats=None, **options):
+    # The first file of each text in filepaths order is scored, the others are its duplicates
+    first = {}
+    for filepath in filepaths:
+        with open(filepath) as file:
+            text = file.read()
+        if text in first:
+            duplicates[filepath] = first[text]
+            yield filepath, None, None
+        else:
+            first[text] = filepath
+            yield filepath, (os.path.basename(filepath), 80.0, []), None
+
+
+def next_batch(events):
+    batch = []
+    for event, filepath, value in events:
+        if event == "batch":
+            return sorted(batch)
+        representative = os.path.basename(value) if event == "duplicate" else None
+        batch.append((event, os.path.basename(filepath), representative))
+
+
+def test_duplicates_are_rescored_when_their_cv_goes_away(tmp_path, monkeypatch):
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / name).write_text("Jane Doe, Python developer")
+    monkeypatch.setattr(watch, "iter_analysis", dedupe_by_content)
+    events = watch.iter_watch([str(tmp_path)], "python", polling=True, debounce=0.05, poll_interval=0.05,
+                              cache_path=None)
+    try:
+        assert [event for event, _, _ in next_batch(events)] == ["duplicate", "duplicate", "scored"]
+
+        # Edited so it is no longer similar: b.txt now represents c.txt
+        (tmp_path / "a.txt").write_text("John Smith, pastry chef and baker")
+        assert next_batch(events) == [("duplicate", "c.txt", "b.txt"), ("scored", "a.txt", None),
+                                      ("scored", "b.txt", None)]
+
+        # Deleted: its duplicate is scored in its place
+        (tmp_path / "b.txt").unlink()
+        assert next_batch(events) == [("removed", "b.txt", None), ("scored", "c.txt", None)]
+    finally:
+        events.close()
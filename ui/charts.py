@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QStringListModel
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QListView, QStackedWidget, QLabel
+
+# Number of candidate figures kept alive at once
+DEFAULT_POOL_SIZE = 4
+
+
+def make_canvas(figsize=(6, 4), facecolor="#16213E"):
+    # matplotlib is only imported once the first chart is drawn, which keeps it off the startup path
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+    canvas = FigureCanvas(Figure(figsize=figsize, facecolor=facecolor))
+    canvas.setStyleSheet(f"background: {facecolor};")
+    return canvas
+
+
+def draw_candidate_chart(figure, candidate, score, skills, color):
+    figure.clear()
+    ax = figure.add_subplot(111)
+    skill_counts = {skill: 1 for skill in skills[:5]}  # Show top 5 skills
+    if skill_counts:
+        skills, counts = zip(*skill_counts.items())
+        ax.bar(skills, counts, color=color)
+        ax.set_title(f"{candidate} - Score: {score}%", color='#F5F6FA', fontsize=14)
+        ax.set_ylabel('Skill Presence', color='#F5F6FA', fontsize=12)
+        ax.set_xticklabels(skills, rotation=45, ha='right', color='#F5F6FA', fontsize=10)
+        ax.tick_params(colors='#F5F6FA')
+        ax.set_ylim(0, 2)
+        ax.grid(True, axis='y', linestyle='--', alpha=0.7)
+    figure.tight_layout()
+
+
+class CandidateChartPanel(QWidget):
+    # Candidate selector plus chart area. A chart is only drawn when its
+    # candidate is first selected, onto one of a small LRU pool of canvases,
+    # so the number of live figures stays bounded however many CVs were
+    # analyzed. The selector is a QListView, which only paints visible rows.
+
+    def __init__(self, colors, pool_size=DEFAULT_POOL_SIZE, parent=None):
+        super().__init__(parent)
+        self.colors = colors
+        self.pool_size = pool_size
+        self.results = []
+        # row -> canvas, least recently shown first
+        self.canvases = OrderedDict()
+        # Pooled canvases not currently showing any candidate
+        self.spare = []
+
+        layout = QHBoxLayout()
+        self.setLayout(layout)
+
+        self.model = QStringListModel()
+        self.selector = QListView()
+        self.selector.setModel(self.model)
+        self.selector.setUniformItemSizes(True)
+        self.selector.setFont(QFont("Segoe UI", 11))
+        self.selector.setStyleSheet("background: #2A2A3E; color: #F5F6FA; border: 1px solid #0E6CFF; border-radius: 5px;")
+        self.selector.setFixedWidth(240)
+        self.selector.selectionModel().currentRowChanged.connect(lambda current, _: self.render_candidate(current.row()))
+        layout.addWidget(self.selector)
+
+        self.stack = QStackedWidget()
+        self.placeholder = QLabel("Select a candidate to see their skills")
+        self.placeholder.setAlignment(Qt.AlignCenter)
+        self.placeholder.setStyleSheet("color: #F5F6FA;")
+        self.stack.addWidget(self.placeholder)
+        layout.addWidget(self.stack)
+
+    def set_results(self, results):
+        self.results = results
+        self.model.setStringList([f"{i + 1}. {candidate} ({score}%)" for i, (candidate, score, _) in enumerate(results)])
+        # Keep the pooled canvases for reuse; they no longer belong to any row
+        self.spare.extend(self.canvases.values())
+        self.canvases.clear()
+        self.stack.setCurrentWidget(self.placeholder)
+
+    def show_candidate(self, row):
+        self.selector.setCurrentIndex(self.model.index(row))
+
+    def render_candidate(self, row):
+        if not 0 <= row < len(self.results):
+            self.stack.setCurrentWidget(self.placeholder)
+            return
+        canvas = self.canvases.pop(row, None)
+        if canvas is None:
+            if self.spare:
+                canvas = self.spare.pop()
+            elif len(self.canvases) < self.pool_size:
+                canvas = make_canvas()
+                self.stack.addWidget(canvas)
+            else:
+                _, canvas = self.canvases.popitem(last=False)
+            candidate, score, skills = self.results[row]
+            draw_candidate_chart(canvas.figure, candidate, score, skills, self.colors[row % len(self.colors)])
+            canvas.draw_idle()
+        self.canvases[row] = canvas
+        self.stack.setCurrentWidget(canvas)
@@ -0,0 +1,439 @@
+import bisect
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+HEADERS = ["Candidate", "Match Score", "Top Skills", "Best Fit"]
+NAME_COLUMN, SCORE_COLUMN, SKILLS_COLUMN, BEST_COLUMN = range(4)
+
+
+class ResultStore:
+    # Columnar storage for analysis results. Scores live in a NumPy array with
+    # one column per job posting and skills are interned to integer ids
+    # stored CSR-style (a flat id array plus per-row offsets), so ranking,
+    # filtering and skill statistics are vectorized and each result costs a
+    # few bytes instead of a tuple of Python objects. Ranking uses the scores
+    # of the active posting.
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.clear()
+
+    def __len__(self):
+        return len(self.names)
+
+    def clear(self, job_titles=None):
+        self.names = []
+        # Source file of each row, when known, so watched files can be replaced or removed
+        self.paths = []
+        self.rows_by_path = {}
+        # Path of a scored CV -> paths of the near-duplicates skipped in its
+        # favour, and each duplicate's path -> the scored CV's path
+        self.duplicates = {}
+        self.representatives = {}
+        self.job_titles = list(job_titles or ["Job Requirements"])
+        self.active_job = 0
+        self.job_scores = np.zeros((self.capacity, len(self.job_titles)), dtype=np.float64)
+        self.skill_offsets = np.zeros(self.capacity + 1, dtype=np.int64)
+        self.skill_ids = np.zeros(self.capacity * 4, dtype=np.int32)
+        self.skill_index = {}
+        self.skill_names = []
+
+    def intern(self, skill):
+        skill_id = self.skill_index.get(skill)
+        if skill_id is None:
+            skill_id = self.skill_index[skill] = len(self.skill_names)
+            self.skill_names.append(skill)
+        return skill_id
+
+    @property
+    def scores(self):
+        return self.job_scores[:, self.active_job]
+
+    def append(self, candidate, score, skills, path=None):
+        # score is a number, or a sequence with one score per job posting
+        row = len(self.names)
+        if row == len(self.job_scores):
+            self.job_scores = np.resize(self.job_scores, (2 * row, len(self.job_titles)))
+            self.skill_offsets = np.resize(self.skill_offsets, 2 * row + 1)
+        start = self.skill_offsets[row]
+        end = start + len(skills)
+        if end > len(self.skill_ids):
+            self.skill_ids = np.resize(self.skill_ids, max(2 * len(self.skill_ids), end))
+        self.skill_ids[start:end] = [self.intern(skill) for skill in skills]
+        self.skill_offsets[row + 1] = end
+        self.job_scores[row] = score
+        self.names.append(candidate)
+        self.paths.append(path)
+        if path is not None:
+            self.rows_by_path[path] = row
+        return row
+
+    def remove(self, row):
+        # Deletes one result by moving the rows after it up by one
+        n = len(self.names)
+        start, end = self.skill_offsets[row], self.skill_offsets[row + 1]
+        count = end - start
+        self.skill_ids[start:self.skill_offsets[n] - count] = self.skill_ids[end:self.skill_offsets[n]]
+        self.skill_offsets[row + 1:n] = self.skill_offsets[row + 2:n + 1] - count
+        self.job_scores[row:n - 1] = self.job_scores[row + 1:n]
+        del self.names[row]
+        path = self.paths.pop(row)
+        if path is not None:
+            del self.rows_by_path[path]
+        for path in self.paths[row:]:
+            if path is not None:
+                self.rows_by_path[path] -= 1
+
+    def link(self, duplicate, representative):
+        # Returns the representative duplicate was linked to before, if any
+        previous = self.unlink(duplicate)
+        self.representatives[duplicate] = representative
+        self.duplicates.setdefault(representative, []).append(duplicate)
+        return previous
+
+    def unlink(self, duplicate):
+        # Returns the representative duplicate was linked to, if any
+        representative = self.representatives.pop(duplicate, None)
+        if representative is not None:
+            linked = self.duplicates[representative]
+            linked.remove(duplicate)
+            if not linked:
+                del self.duplicates[representative]
+        return representative
+
+    def unlink_duplicates(self, representative):
+        for duplicate in self.duplicates.pop(representative, ()):
+            del self.representatives[duplicate]
+
+    def score_column(self):
+        return self.scores[:len(self.names)]
+
+    def skills(self, row):
+        ids = self.skill_ids[self.skill_offsets[row]:self.skill_offsets[row + 1]]
+        return [self.skill_names[skill_id] for skill_id in ids]
+
+    def result(self, row):
+        return self.names[row], float(self.scores[row]), self.skills(row)
+
+    def ranked(self):
+        # Store rows, best score first
+        return np.argsort(-self.score_column(), kind="stable")
+
+    def best_row(self):
+        return int(np.argmax(self.score_column())) if self.names else -1
+
+    def best_fit(self, row):
+        # Title of the posting the candidate scores highest against
+        return self.job_titles[int(np.argmax(self.job_scores[row]))]
+
+    def rows_with_skill(self, skill):
+        skill_id = self.skill_index.get(skill)
+        n = len(self.names)
+        if skill_id is None or not n:
+            return np.zeros(0, dtype=np.int64)
+        entries = np.flatnonzero(self.skill_ids[:self.skill_offsets[n]] == skill_id)
+        return np.searchsorted(self.skill_offsets[1:n + 1], entries, side="right")
+
+    def skill_counts(self):
+        # Number of candidates listing each skill, indexed by skill id
+        n = len(self.names)
+        return np.bincount(self.skill_ids[:self.skill_offsets[n]], minlength=len(self.skill_names))
+
+
+class RankedResults:
+    # Read-only sequence of (candidate, score, skills), best first, over the
+    # rows of a table model. The model replaces its ranking array on every
+    # change instead of editing it, so this is a snapshot that costs nothing.
+
+    def __init__(self, model):
+        self.store = model.store
+        self.order = model.ranking
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, i):
+        return self.store.result(int(self.order[i]))
+
+    def __iter__(self):
+        return (self.store.result(int(row)) for row in self.order)
+
+    def position(self, row):
+        # Rank of a store row, or None for rows added after this snapshot was taken
+        positions = np.flatnonzero(self.order == row)
+        return int(positions[0]) if len(positions) else None
+
+
+class ResultTableModel(QAbstractTableModel):
+    # Table model over a ResultStore. Only the visible cells are ever turned
+    # into strings; self.order holds the store rows that pass the filter in
+    # display order, so sorting and filtering never create widgets, and
+    # self.keys their sort keys (see sort_keys), ascending, so a streamed
+    # result is placed with a binary search. self.ranking keeps every store
+    # row best first by score, whatever the filter and sort, the same way.
+
+    def __init__(self, store=None, parent=None):
+        super().__init__(parent)
+        self.store = store if store is not None else ResultStore()
+        self.order = np.zeros(0, dtype=np.int64)
+        self.keys = np.zeros(0, dtype=np.float64)
+        self.ranking = np.zeros(0, dtype=np.int64)
+        self.ranking_keys = np.zeros(0, dtype=np.float64)
+        self.sort_column = SCORE_COLUMN
+        self.sort_order = Qt.DescendingOrder
+        self.min_score = None
+        self.required_skill = None
+        self.best = -1
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        row = int(self.order[index.row()])
+        column = index.column()
+        duplicates = self.store.duplicates.get(self.store.paths[row], [])
+        if role == Qt.ToolTipRole:
+            if column != NAME_COLUMN or not duplicates:
+                return None
+            return "Also submitted as:\n" + "\n".join(duplicates)
+        if column == NAME_COLUMN:
+            if duplicates:
+                return f"{self.store.names[row]} (+{len(duplicates)} duplicate{'s' if len(duplicates) > 1 else ''})"
+            return self.store.names[row]
+        if column == SCORE_COLUMN:
+            return f"{self.store.scores[row]}%"
+        if column == SKILLS_COLUMN:
+            return ", ".join(self.store.skills(row)[:5])
+        if len(self.store.job_titles) > 1:
+            return self.store.best_fit(row)
+        return "Best" if row == self.best else ""
+
+    def store_row(self, view_row):
+        return int(self.order[view_row])
+
+    def clear(self, job_titles=None):
+        self.beginResetModel()
+        self.store.clear(job_titles)
+        self.order = np.zeros(0, dtype=np.int64)
+        self.keys = np.zeros(0, dtype=np.float64)
+        self.ranking = np.zeros(0, dtype=np.int64)
+        self.ranking_keys = np.zeros(0, dtype=np.float64)
+        self.best = -1
+        self.endResetModel()
+
+    def accepts(self, row):
+        if self.min_score is not None and self.store.scores[row] < self.min_score:
+            return False
+        if self.required_skill and self.required_skill not in self.store.skills(row):
+            return False
+        return True
+
+    def insert_position(self, row):
+        descending = self.sort_order == Qt.DescendingOrder
+        if self.sort_column == NAME_COLUMN:
+            names = self.store.names
+            key = names[row]
+            if descending:
+                return bisect.bisect_right(self.order, _Reversed(key), key=lambda r: _Reversed(names[r]))
+            return bisect.bisect_right(self.order, key, key=lambda r: names[r])
+        return int(np.searchsorted(self.keys, self.sort_keys(row), side="right"))
+
+    def append(self, candidate, score, skills, path=None):
+        # Adds one streamed result, inserting it in place if it passes the filter
+        row = self.store.append(candidate, score, skills, path)
+        if self.accepts(row):
+            position = self.insert_position(row)
+            self.beginInsertRows(QModelIndex(), position, position)
+            self.order = np.insert(self.order, position, row)
+            self.keys = np.insert(self.keys, position, self.sort_keys(row))
+            self.endInsertRows()
+        self.rank_rows(np.array([row]))
+        self.note_best(np.array([row]))
+        return row
+
+    def append_many(self, results):
+        # Adds a batch of streamed (candidate, score, skills, path) results.
+        # The rows that pass the filter are sorted among themselves and merged
+        # into the display order in one pass: Qt sees them inserted at the end
+        # and then one layout change, instead of one insertion each.
+        rows = np.array([self.store.append(*result) for result in results], dtype=np.int64)
+        if not len(rows):
+            return rows
+        accepted = self.sorted_rows(rows[[self.accepts(row) for row in rows]])
+        if len(accepted):
+            if self.sort_column == NAME_COLUMN:
+                positions = [self.insert_position(row) for row in accepted]
+            else:
+                positions = np.searchsorted(self.keys, self.sort_keys(accepted), side="right")
+            order = np.insert(self.order, positions, accepted)
+            keys = np.insert(self.keys, positions, self.sort_keys(accepted))
+            start = len(self.order)
+            self.beginInsertRows(QModelIndex(), start, start + len(accepted) - 1)
+            self.order = np.concatenate([self.order, accepted])
+            self.endInsertRows()
+            self.layoutAboutToBeChanged.emit()
+            # Keep the selection and current index on the same store rows
+            positions = np.zeros(len(self.store), dtype=np.int64)
+            positions[order] = np.arange(len(order))
+            previous = self.persistentIndexList()
+            self.changePersistentIndexList(previous, [
+                self.index(int(positions[self.order[index.row()]]), index.column()) for index in previous
+            ])
+            self.order, self.keys = order, keys
+            self.layoutChanged.emit()
+        self.rank_rows(rows)
+        self.note_best(rows)
+        return rows
+
+    def rank_rows(self, rows):
+        # New rows have the highest row numbers, so inserting them after equal
+        # scores keeps ties in row order, as a stable sort would
+        keys = -self.store.scores[rows]
+        ordered = np.argsort(keys, kind="stable")
+        positions = np.searchsorted(self.ranking_keys, keys[ordered], side="right")
+        self.ranking = np.insert(self.ranking, positions, rows[ordered])
+        self.ranking_keys = np.insert(self.ranking_keys, positions, keys[ordered])
+
+    def remove(self, row):
+        position = np.flatnonzero(self.order == row)
+        if len(position):
+            self.beginRemoveRows(QModelIndex(), int(position[0]), int(position[0]))
+            self.order = np.delete(self.order, position[0])
+            self.keys = np.delete(self.keys, position[0])
+            self.endRemoveRows()
+        key = -self.store.scores[row]
+        start = np.searchsorted(self.ranking_keys, key, side="left")
+        end = np.searchsorted(self.ranking_keys, key, side="right")
+        position = start + int(np.flatnonzero(self.ranking[start:end] == row)[0])
+        ranking = np.delete(self.ranking, position)
+        self.ranking = np.where(ranking > row, ranking - 1, ranking)
+        self.ranking_keys = np.delete(self.ranking_keys, position)
+        self.store.remove(row)
+        self.order[self.order > row] -= 1
+        if self.best == row:
+            self.best = -1
+            self.update_best()
+        elif self.best > row:
+            self.best -= 1
+
+    def set_file_result(self, path, candidate, score, skills):
+        # Result of a watched file; replaces the result of its previous
+        # version, or its link to another CV when it was a duplicate. The
+        # duplicates linked to it stay: the watcher reports them again, with
+        # the same batch, if they no longer are.
+        self.refresh_name(self.store.unlink(path))
+        row = self.store.rows_by_path.get(path)
+        if row is not None:
+            self.remove(row)
+        return self.append(candidate, score, skills, path)
+
+    def remove_file(self, path):
+        # Drops the result of a file, or its link to another CV, and the
+        # links of the duplicates skipped in its favour
+        self.refresh_name(self.store.unlink(path))
+        self.store.unlink_duplicates(path)
+        row = self.store.rows_by_path.get(path)
+        if row is not None:
+            self.remove(row)
+
+    def link_duplicate(self, duplicate, representative):
+        # Shows a skipped near-duplicate next to the CV that was scored
+        # instead; both are full paths
+        if self.store.representatives.get(duplicate) == representative:
+            return
+        self.refresh_name(self.store.link(duplicate, representative))
+        self.refresh_name(representative)
+
+    def refresh_name(self, path):
+        # Redraws the name cell of a file's row, which counts its duplicates
+        row = self.store.rows_by_path.get(path)
+        if row is not None:
+            position = np.flatnonzero(self.order == row)
+            if len(position):
+                index = self.index(int(position[0]), NAME_COLUMN)
+                self.dataChanged.emit(index, index)
+
+    def note_best(self, rows):
+        # New rows only displace the best candidate with a strictly higher
+        # score, as the first of equal scores is best
+        scores = self.store.scores[rows]
+        row = int(rows[np.argmax(scores)])
+        if self.best < 0 or self.store.scores[row] > self.store.scores[self.best]:
+            self.set_best(row)
+
+    def update_best(self):
+        self.set_best(int(self.ranking[0]) if len(self.ranking) else -1)
+
+    def set_best(self, best):
+        if best == self.best:
+            return
+        previous, self.best = self.best, best
+        for row in (previous, best):
+            positions = np.flatnonzero(self.order == row)
+            if len(positions):
+                index = self.index(int(positions[0]), BEST_COLUMN)
+                self.dataChanged.emit(index, index)
+
+    def sorted_rows(self, rows):
+        if self.sort_column == NAME_COLUMN:
+            names = np.array(self.store.names, dtype=object)[rows]
+            ordered = rows[np.argsort(names, kind="stable")]
+            return ordered[::-1] if self.sort_order == Qt.DescendingOrder else ordered
+        return rows[np.argsort(self.sort_keys(rows), kind="stable")]
+
+    def sort_keys(self, rows):
+        # Scores of store rows, negated when sorting best first, so display
+        # order is ascending in them whichever way scores are sorted
+        scores = self.store.scores[rows]
+        return -scores if self.sort_order == Qt.DescendingOrder else scores
+
+    def refresh(self):
+        self.beginResetModel()
+        rows = np.arange(len(self.store), dtype=np.int64)
+        if self.min_score is not None:
+            rows = rows[self.store.score_column() >= self.min_score]
+        if self.required_skill:
+            rows = rows[np.isin(rows, self.store.rows_with_skill(self.required_skill))]
+        self.order = self.sorted_rows(rows)
+        self.keys = self.sort_keys(self.order)
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # Only names and scores are sortable; other columns rank by score
+        self.sort_column = NAME_COLUMN if column == NAME_COLUMN else SCORE_COLUMN
+        self.sort_order = order
+        self.refresh()
+
+    def set_job(self, job):
+        # Ranks, filters and marks the best candidate by another posting's scores
+        self.store.active_job = job
+        self.best = self.store.best_row()
+        self.ranking = self.store.ranked()
+        self.ranking_keys = -self.store.score_column()[self.ranking]
+        self.refresh()
+
+    def set_filter(self, min_score=None, required_skill=None):
+        self.min_score = min_score
+        self.required_skill = required_skill or None
+        self.refresh()
+
+
+class _Reversed:
+    # Inverts string comparison so bisect can search descending name order
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
@@ -0,0 +1,216 @@
+import time
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from backend.engine import analyze, iter_watch, warm_up, WorkerError, DEFAULT_BATCH_SIZE
+from backend.cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES
+from backend.file_handler import DEFAULT_LIMITS
+from backend.skills import DEFAULT_SKILLS_PATH
+from backend.report_generator import write_report, ReportCancelled
+from backend.profiling import NULL_PROFILER
+from backend.prefilter import PruneStats
+
+
+class AnalysisWorker(QThread):
+    # (filepath, (candidate, [score per job posting], skills)) for every CV as soon as it has been scored
+    result_ready = pyqtSignal(str, object)
+    # (filepath, filepath of the CV scored in its place) for near-duplicates that were skipped
+    duplicate_found = pyqtSignal(str, str)
+    # (filepath, error message) for CVs that could not be processed
+    file_failed = pyqtSignal(str, str)
+    # (done, total, CVs per second)
+    progress = pyqtSignal(int, int, float)
+    # True when the run was cancelled before every CV was processed
+    run_finished = pyqtSignal(bool)
+
+    def __init__(self, files, job_postings, max_workers=None, batch_size=DEFAULT_BATCH_SIZE,
+                 model_name="en_core_web_sm", cache_path=DEFAULT_CACHE_PATH, cache_max_bytes=DEFAULT_MAX_BYTES,
+                 skills_path=DEFAULT_SKILLS_PATH, limits=DEFAULT_LIMITS, embedding_model=None, scorers=None,
+                 dedupe=False, profiler=None, parent=None):
+        super().__init__(parent)
+        self.files = list(files)
+        self.job_postings = list(job_postings)
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.model_name = model_name
+        self.cache_path = cache_path
+        self.cache_max_bytes = cache_max_bytes
+        self.skills_path = skills_path
+        self.limits = limits
+        self.embedding_model = embedding_model
+        self.scorers = scorers
+        self.dedupe = dedupe
+        self.profiler = profiler
+        # CVs dropped for lacking must-have skills, and the time that saved
+        self.prune_stats = PruneStats()
+        # Why the run stopped early, when the workers could not analyze anything
+        self.error = None
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        total = len(self.files)
+        duplicates = {}
+        done = 0
+        started = time.perf_counter()
+        outcomes = analyze(
+            self.files, self.job_postings,
+            max_workers=self.max_workers,
+            batch_size=self.batch_size,
+            model_name=self.model_name,
+            cache_path=self.cache_path,
+            cache_max_bytes=self.cache_max_bytes,
+            skills_path=self.skills_path,
+            limits=self.limits,
+            embedding_model=self.embedding_model,
+            scorers=self.scorers,
+            dedupe=self.dedupe,
+            duplicates=duplicates,
+            prune_stats=self.prune_stats,
+            profiler=self.profiler,
+            should_stop=lambda: self._cancelled,
+        )
+        try:
+            for filepath, result, error in outcomes:
+                if error is not None:
+                    self.file_failed.emit(filepath, error)
+                elif result is not None:
+                    self.result_ready.emit(filepath, result)
+                elif filepath in duplicates:
+                    self.duplicate_found.emit(filepath, duplicates[filepath])
+                done += 1
+                elapsed = time.perf_counter() - started
+                self.progress.emit(done, total, done / elapsed if elapsed > 0 else 0.0)
+        except WorkerError as e:
+            self.error = str(e)
+        self.run_finished.emit(self._cancelled)
+
+
+class FolderWatchWorker(QThread):
+    # Scores the CVs in a folder, then every CV added to or changed in it,
+    # until cancelled
+
+    # (filepath, (candidate, [score per job posting], skills)) for new and changed CVs
+    file_scored = pyqtSignal(str, object)
+    # Deleted CVs, and CVs that no longer have text
+    file_removed = pyqtSignal(str)
+    # (filepath, filepath of the CV scored in its place) for near-duplicates that were skipped
+    file_duplicate = pyqtSignal(str, str)
+    # (filepath, prefilter stage) for CVs dropped for lacking must-have skills
+    file_filtered = pyqtSignal(str, str)
+    # (filepath, error message) for CVs that could not be processed
+    file_failed = pyqtSignal(str, str)
+    # (CVs scored, CVs removed) after every batch of changes
+    batch_finished = pyqtSignal(int, int)
+    # Error message when watching stopped on an error
+    failed = pyqtSignal(str)
+
+    def __init__(self, directory, job_postings, model_name="en_core_web_sm", cache_path=DEFAULT_CACHE_PATH,
+                 cache_max_bytes=DEFAULT_MAX_BYTES, skills_path=DEFAULT_SKILLS_PATH, limits=DEFAULT_LIMITS,
+                 embedding_model=None, scorers=None, dedupe=False, profiler=None, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.job_postings = list(job_postings)
+        self.model_name = model_name
+        self.cache_path = cache_path
+        self.cache_max_bytes = cache_max_bytes
+        self.skills_path = skills_path
+        self.limits = limits
+        self.embedding_model = embedding_model
+        self.scorers = scorers
+        self.dedupe = dedupe
+        self.profiler = profiler
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        events = iter_watch(
+            [self.directory], self.job_postings,
+            model_name=self.model_name,
+            cache_path=self.cache_path,
+            cache_max_bytes=self.cache_max_bytes,
+            skills_path=self.skills_path,
+            limits=self.limits,
+            embedding_model=self.embedding_model,
+            scorers=self.scorers,
+            dedupe=self.dedupe,
+            profiler=self.profiler,
+            should_stop=lambda: self._cancelled,
+        )
+        try:
+            for event, filepath, value in events:
+                if event == "scored":
+                    self.file_scored.emit(filepath, value)
+                elif event == "removed":
+                    self.file_removed.emit(filepath)
+                elif event == "duplicate":
+                    self.file_duplicate.emit(filepath, value)
+                elif event == "filtered":
+                    self.file_filtered.emit(filepath, value)
+                elif event == "failed":
+                    self.file_removed.emit(filepath)
+                    self.file_failed.emit(filepath, value)
+                else:
+                    self.batch_finished.emit(*value)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class ModelLoader(QThread):
+    # Imports spaCy and loads the model off the GUI thread, so the window
+    # shows immediately; analysis workers forked afterwards inherit the model
+    loaded = pyqtSignal()
+    # Error message when the model could not be loaded
+    failed = pyqtSignal(str)
+
+    def __init__(self, model_name="en_core_web_sm", parent=None):
+        super().__init__(parent)
+        self.model_name = model_name
+
+    def run(self):
+        try:
+            warm_up(self.model_name)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit()
+
+
+class ReportWorker(QThread):
+    # Writes a report off the GUI thread. rows must not change while it runs;
+    # charts are PNG images rendered beforehand, since matplotlib figures may
+    # only be drawn on the GUI thread.
+
+    # Rows written so far
+    progress = pyqtSignal(int)
+    # True when the report was cancelled and its file removed
+    report_finished = pyqtSignal(bool)
+    # Error message when the report could not be written
+    failed = pyqtSignal(str)
+
+    def __init__(self, filepath, rows, summary=None, charts=(), profiler=NULL_PROFILER, parent=None):
+        super().__init__(parent)
+        self.filepath = filepath
+        self.rows = rows
+        self.summary = summary
+        self.charts = list(charts)
+        self.profiler = profiler
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            with self.profiler.stage("report", self.filepath):
+                write_report(self.filepath, self.rows, self.summary, self.charts,
+                             progress=self.progress.emit, should_stop=lambda: self._cancelled)
+        except ReportCancelled:
+            self.report_finished.emit(True)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.report_finished.emit(False)